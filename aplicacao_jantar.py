@@ -1,92 +1,49 @@
 import tkinter as tk
 from tkinter import font as tkfont
+from tkinter import filedialog, messagebox
+import argparse
 import threading
-import queue
 import time
-import random
-from threading import Barrier
-
-# Fila para comunicação entre as threads dos filósofos e a GUI
-update_queue = queue.Queue()
-
-
-class ControllablePhilosopher(threading.Thread):
-    """
-    Uma classe de Filósofo que pode ser parada e pausada externamente.
-    """
-    def __init__(self, p_id, left_fork, right_fork, pause_event, **kwargs):
-        super().__init__()
-        self.p_id = p_id
-        self.left_fork = left_fork
-        self.right_fork = right_fork
-        self.pause_event = pause_event
-        self.running = True
-        self.status = "pensando"
-        self.fork_count = 0
-
-        self.waiter = kwargs.get('waiter')
-        self.barrier = kwargs.get('barrier')
-        self.sleep_between_forks = kwargs.get('sleep_between_forks', 0)
-        
-        self._send_update()
-
-    def _send_update(self):
-        update_queue.put(('status_update', self.p_id, self.status, self.fork_count))
-
-    def set_status(self, new_status):
-        self.status = new_status
-        self._send_update()
-
-    def pickup_forks(self):
-        if self.waiter:
-            update_queue.put(('call_waiter', self.p_id))
-            self.waiter.acquire()
-            update_queue.put(('end_call', self.p_id))
-            
-            self.left_fork.acquire(); self.fork_count = 1; self._send_update()
-            self.right_fork.acquire(); self.fork_count = 2; self.set_status("comendo")
-            self.waiter.release()
-        else: 
-            if self.barrier:
-                # ALTERAÇÃO CRÍTICA AQUI: Removido o timeout de 1 segundo.
-                # Agora as threads esperam o tempo que for necessário.
-                try: self.barrier.wait() 
-                except (threading.BrokenBarrierError, RuntimeError): return
-
-            self.left_fork.acquire(); self.fork_count = 1; self._send_update()
-            time.sleep(self.sleep_between_forks)
-            if not self.running: 
-                self.left_fork.release(); self.fork_count = 0; self._send_update(); return
-
-            self.right_fork.acquire(); self.fork_count = 2; self.set_status("comendo")
-
-    def release_forks(self):
-        self.right_fork.release(); self.fork_count = 1; self._send_update()
-        self.left_fork.release(); self.fork_count = 0; self.set_status("pensando")
-
-    def run(self):
-        while self.running:
-            self.pause_event.wait()
-            
-            if self.status == "pensando":
-                time.sleep(random.uniform(1, 3)); self.set_status("com fome")
-            elif self.status == "com fome":
-                self.pickup_forks()
-            elif self.status == "comendo":
-                time.sleep(random.uniform(2, 4)); self.release_forks()
-            
-            if not self.running: break
-
+import math
+
+from metricas import MetricsCollector, format_summary
+from atualizacoes import CoalescingUpdates
+from estrategias import STRATEGIES, get_strategy
+from perfis_carga import PROFILES, get_profile
+from painel_metricas import RollingWindow, MetricsServer, format_dashboard
+from recuperacao_deadlock import VICTIM_POLICIES
+from registro_eventos import EventLogReader, LogReplayer
+from mesa import Table
+
+# Intervalo entre quadros da interface e limite de itens redesenhados por quadro
+FRAME_MS = 40
+MAX_UPDATES_PER_FRAME = 500
+METRICS_INTERVAL = 0.5
+# Mapa de calor das disputas: garfos por linha e lado de cada célula (px)
+HEATMAP_COLUMNS = 10
+HEATMAP_CELL = 14
+# Posições do desenho original, usadas na mesa de 5 lugares
+CLASSIC_COORDS = [(250, 50), (400, 150), (350, 300), (150, 300), (100, 150)]
 
 class App(tk.Tk):
-    # (Esta classe não sofreu alterações nesta versão)
     def __init__(self, *args, **kwargs):
         tk.Tk.__init__(self, *args, **kwargs)
         self.title("Jantar dos Filósofos - Simulação")
-        self.geometry("700x600")
+        self.geometry("760x700")
 
-        self.active_threads = []
+        # Mesa em execução (mesa.Table) e canal de onde a tela lê as
+        # atualizações: o da mesa ou o da reprodução de um registro
+        self.table = None
+        self.updates = None
         self.simulation_type = None
+        self.num_philosophers = 5
+        self.metrics = None
+        # Janela das taxas ao vivo (painel e exportação) e servidor /metrics opcional
+        self.metrics_window = None
+        self.metrics_server = None
+        # Reprodução de um registro gravado
+        self.replayer = None
+        self.replay_path = None
         self.pause_event = threading.Event()
         self.pause_event.set()
 
@@ -113,88 +70,169 @@ class App(tk.Tk):
     def start_simulation(self, sim_type):
         self.stop_simulation()
         self.simulation_type = sim_type
+        self.replay_path = None
         
-        forks = [threading.Lock() for _ in range(5)]
-        kwargs = {'pause_event': self.pause_event}
-
-        if sim_type == "deadlock_rapido":
-            kwargs['barrier'] = Barrier(5)
-            kwargs['sleep_between_forks'] = 0.1
-        elif sim_type == "solucao_garcom":
-            kwargs['waiter'] = threading.Lock()
+        n = self.num_philosophers
+        menu = self.frames["MenuFrame"]
+        options = {'path': menu.workload_path} if menu.workload_var.get() == "registro" else {}
+        try:
+            workload = get_profile(menu.workload_var.get())(n, **options)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Perfil de carga inválido", str(e)); return
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        policy = menu.recovery_var.get()
+        self.table = Table(sim_type, n, workload=workload, recovery=policy if policy in VICTIM_POLICIES else None,
+                           log_path=f"registro_{sim_type}_{stamp}.jlog" if menu.record_var.get() else None,
+                           profile_prefix=f"perfil_locks_{sim_type}_{stamp}" if menu.profile_var.get() else None)
+        self.updates, self.metrics = self.table.updates, self.table.metrics
+        self.metrics_window = RollingWindow(self.metrics, sim_type)
         
         # ALTERADO: Prepara a tela de simulação e passa os garfos para ela
-        self.frames["SimulationFrame"].prepare_for_simulation(sim_type, forks)
+        self.frames["SimulationFrame"].prepare_for_simulation(self.table.strategy, self.table.forks)
         self.show_frame("SimulationFrame")
+        # Começa pausada se a simulação anterior estava pausada
+        if not self.pause_event.is_set(): self.table.pause()
+        self.table.start()
 
-        for i in range(5):
-            left_fork_idx, right_fork_idx = i, (i + 1) % 5
-            
-            if sim_type == "solucao_hierarquia" and left_fork_idx > right_fork_idx:
-                p = ControllablePhilosopher(i, forks[right_fork_idx], forks[left_fork_idx], **kwargs)
-            else:
-                p = ControllablePhilosopher(i, forks[left_fork_idx], forks[right_fork_idx], **kwargs)
-            
-            self.active_threads.append(p)
-            p.start()
+    def start_replay(self, path):
+        """Reproduz na tela um registro gravado, sem criar filósofos."""
+        self.stop_simulation()
+        try:
+            reader = EventLogReader(path)
+            strategy = get_strategy(reader.sim_type)(reader.num_philosophers)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Registro inválido", str(e)); return
+        self.simulation_type, self.replay_path = reader.sim_type, path
+        self.metrics = MetricsCollector(reader.num_philosophers, clock=None)
+        self.metrics_window = RollingWindow(self.metrics, reader.sim_type)
+        self.updates = CoalescingUpdates()
+        frame = self.frames["SimulationFrame"]
+        frame.prepare_for_simulation(strategy, [None] * reader.num_philosophers)
+        frame.title_label.config(text=f"Reprodução: {strategy.label}")
+        self.show_frame("SimulationFrame")
+        self.replayer = LogReplayer(reader, self.updates.put, speed=frame.speed_var.get(),
+                                    pause_event=self.pause_event, metrics=self.metrics)
+        self.replayer.start()
+
+    def serve_metrics(self, port, host="127.0.0.1"):
+        """Publica as métricas da simulação atual em http://host:port/metrics."""
+        self.metrics_server = MetricsServer(lambda: self.metrics_window, port, host)
+
+    def set_replay_speed(self, speed):
+        if self.replayer: self.replayer.speed = max(0.1, float(speed))
 
     def stop_simulation(self):
-        # ... (sem alterações aqui)
-        for t in self.active_threads: t.running = False
-        if self.simulation_type and "deadlock" in self.simulation_type:
-             for t in self.active_threads:
-                if t.left_fork.locked(): t.left_fork.release()
-                if t.right_fork.locked(): t.right_fork.release()
-        for t in self.active_threads: t.join(timeout=0.1)
-        self.active_threads = []
-        while not update_queue.empty(): update_queue.get()
+        if self.table:
+            self.table.stop()
+            if self.table.profile_paths: print("Perfil dos locks gravado em", " e ".join(self.table.profile_paths))
+            self.table = None
+        if self.replayer: self.replayer.stop(); self.replayer = None
+        if self.updates: self.updates.clear(); self.updates = None
 
     def return_to_menu(self):
         self.stop_simulation()
+        self.replay_path = None
         self.show_frame("MenuFrame")
 
     def toggle_pause(self):
-        # ... (sem alterações aqui)
+        # O evento do App vale para a reprodução; a mesa tem o seu próprio
         if self.pause_event.is_set():
             self.pause_event.clear(); self.frames["SimulationFrame"].pause_btn.config(text="Continuar")
+            if self.table: self.table.pause()
         else:
             self.pause_event.set(); self.frames["SimulationFrame"].pause_btn.config(text="Pausar")
+            if self.table: self.table.resume()
+
+    def add_philosopher(self):
+        # Só a mesa com threads muda em execução; a reprodução segue o registro
+        if not self.table: return
+        try: self.table.join()
+        except ValueError as e: messagebox.showinfo("Mesa dinâmica", str(e))
+
+    def remove_philosopher(self):
+        if not self.table: return
+        try: self.table.leave()
+        except ValueError as e: messagebox.showinfo("Mesa dinâmica", str(e))
 
     def restart_simulation(self):
         # ... (sem alterações aqui)
         sim_type = self.simulation_type
         self.stop_simulation()
-        self.start_simulation(sim_type)
+        if self.replay_path: self.start_replay(self.replay_path)
+        else: self.start_simulation(sim_type)
         if not self.pause_event.is_set(): self.toggle_pause()
 
 
 class MenuFrame(tk.Frame):
-    # (Esta classe não sofreu alterações)
     def __init__(self, parent, controller):
         tk.Frame.__init__(self, parent)
         self.controller = controller
         label = tk.Label(self, text="Escolha uma Simulação", font=tkfont.Font(family='Helvetica', size=18, weight="bold"))
         label.pack(side="top", fill="x", pady=20)
-        simulations = {
-            "Deadlock (Lento)": "deadlock_lento",
-            "Deadlock (Rápido/Garantido)": "deadlock_rapido",
-            "Solução com Hierarquia": "solucao_hierarquia",
-            "Solução com Garçom": "solucao_garcom"
-        }
-        for text, sim_type in simulations.items():
-            btn = tk.Button(self, text=text, command=lambda st=sim_type: controller.start_simulation(st))
-            btn.pack(pady=10, padx=50, fill="x")
+        # Um botão para cada estratégia registrada em estrategias.py
+        for sim_type, strategy in STRATEGIES.items():
+            btn = tk.Button(self, text=strategy.label, command=lambda st=sim_type: self.start(st))
+            btn.pack(pady=6, padx=50, fill="x")
+
+        # Número de filósofos (e de garfos) na mesa
+        size_frame = tk.Frame(self)
+        size_frame.pack(pady=10)
+        tk.Label(size_frame, text="Número de Filósofos:").pack(side="left")
+        self.size_var = tk.IntVar(value=controller.num_philosophers)
+        tk.Spinbox(size_frame, from_=2, to=100, width=5, textvariable=self.size_var).pack(side="left", padx=5)
+
+        # Perfil de carga dos tempos de pensar e comer; 'registro' pede um arquivo gravado
+        workload_frame = tk.Frame(self)
+        workload_frame.pack(pady=4)
+        tk.Label(workload_frame, text="Carga:").pack(side="left")
+        self.workload_var = tk.StringVar(value="uniforme")
+        self.workload_path = None
+        tk.OptionMenu(workload_frame, self.workload_var, *PROFILES, command=self.choose_workload).pack(side="left", padx=5)
+
+        # Recuperação de deadlock: política de escolha da vítima
+        recovery_frame = tk.Frame(self)
+        recovery_frame.pack(pady=4)
+        tk.Label(recovery_frame, text="Recuperação de deadlock:").pack(side="left")
+        self.recovery_var = tk.StringVar(value="desligada")
+        tk.OptionMenu(recovery_frame, self.recovery_var, "desligada", *VICTIM_POLICIES).pack(side="left", padx=5)
+
+        # Gravação da execução em registro binário e reprodução de um registro
+        self.record_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self, text="Gravar registro de eventos", variable=self.record_var).pack()
+        # Perfil de disputa dos locks, gravado em perfil_locks_*.txt/.folded ao parar
+        self.profile_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self, text="Perfil dos locks", variable=self.profile_var).pack()
+        replay_btn = tk.Button(self, text="Reproduzir Registro...", command=self.open_replay)
+        replay_btn.pack(pady=6, padx=50, fill="x")
+
+    def start(self, sim_type):
+        try: self.controller.num_philosophers = max(2, self.size_var.get())
+        except tk.TclError: self.size_var.set(self.controller.num_philosophers)
+        self.controller.start_simulation(sim_type)
+
+    def choose_workload(self, name):
+        if name != "registro": return
+        path = filedialog.askopenfilename(title="Registro com os tempos", filetypes=[("Registro do jantar", "*.jlog"), ("Todos", "*")])
+        if path: self.workload_path = path
+        elif not self.workload_path: self.workload_var.set("uniforme")
+
+    def open_replay(self):
+        path = filedialog.askopenfilename(title="Registro de eventos", filetypes=[("Registro do jantar", "*.jlog"), ("Todos", "*")])
+        if path: self.controller.start_replay(path)
 
 
 class SimulationFrame(tk.Frame):
     def __init__(self, parent, controller):
         tk.Frame.__init__(self, parent)
         self.controller = controller
-        self.philosopher_coords = [(250, 50), (400, 150), (350, 300), (150, 300), (100, 150)]
+        self.philosopher_coords = {}
+        self.detailed = True
         self.waiter_coords = (250, 225)
         self.waiter_lines = {}
         self.fork_objects = [] # NOVO: Guarda os objetos Lock dos garfos
         self.fork_shapes = {}  # NOVO: Guarda os IDs dos desenhos dos garfos
+        self.busy_forks = set()  # Garfos em uso, mantidos pelas mensagens 'fork_update'
+        self.last_metrics_update = 0.0
 
         main_frame = tk.Frame(self)
         main_frame.pack(fill="both", expand=True)
@@ -215,6 +253,25 @@ class SimulationFrame(tk.Frame):
         table_info_frame.pack(pady=20, anchor="n", fill="x")
         self.available_forks_label = tk.Label(table_info_frame, text="Garfos Disponíveis: 5", font=tkfont.Font(size=10))
         self.available_forks_label.pack(anchor="w", padx=5, pady=2)
+        self.metrics_label = tk.Label(table_info_frame, text="", font=tkfont.Font(size=9), justify="left", wraplength=150)
+        self.metrics_label.pack(anchor="w", padx=5, pady=2)
+        self.deadlock_label = tk.Label(table_info_frame, text="", fg="red", font=tkfont.Font(size=9, weight="bold"), justify="left", wraplength=150)
+        self.deadlock_label.pack(anchor="w", padx=5, pady=2)
+        self.starvation_label = tk.Label(table_info_frame, text="", fg="darkorange3", font=tkfont.Font(size=9, weight="bold"), justify="left", wraplength=150)
+        self.starvation_label.pack(anchor="w", padx=5, pady=2)
+        self.membership_label = tk.Label(table_info_frame, text="", fg="blue", font=tkfont.Font(size=9), justify="left", wraplength=150)
+        self.membership_label.pack(anchor="w", padx=5, pady=2)
+
+        # Painel ao vivo: taxas da janela deslizante e mapa de calor das
+        # disputas por garfo (branco: nenhuma; vermelho: o garfo mais disputado)
+        dashboard_frame = tk.LabelFrame(right_frame, text="Desempenho", font=tkfont.Font(family='Helvetica', size=10, weight="bold"))
+        dashboard_frame.pack(pady=(0, 10), anchor="n", fill="x")
+        self.dashboard_label = tk.Label(dashboard_frame, text="", font=tkfont.Font(size=9), justify="left")
+        self.dashboard_label.pack(anchor="w", padx=5, pady=2)
+        tk.Label(dashboard_frame, text="Disputas por garfo:", font=tkfont.Font(size=9)).pack(anchor="w", padx=5)
+        self.heatmap = tk.Canvas(dashboard_frame, width=HEATMAP_COLUMNS * HEATMAP_CELL, height=HEATMAP_CELL, highlightthickness=0)
+        self.heatmap.pack(anchor="w", padx=5, pady=2)
+        self.heatmap_cells = []
         
         legend_frame = tk.LabelFrame(right_frame, text="Legenda dos Filósofos", font=tkfont.Font(family='Helvetica', size=10, weight="bold"))
         legend_frame.pack(pady=20, anchor="n")
@@ -227,74 +284,185 @@ class SimulationFrame(tk.Frame):
         self.pause_btn = tk.Button(controls_frame, text="Pausar", command=controller.toggle_pause); self.pause_btn.pack(fill="x", padx=5, pady=2)
         restart_btn = tk.Button(controls_frame, text="Reiniciar", command=controller.restart_simulation); restart_btn.pack(fill="x", padx=5, pady=2)
         menu_btn = tk.Button(controls_frame, text="Voltar ao Menu", command=controller.return_to_menu); menu_btn.pack(fill="x", padx=5, pady=2)
+        # Entradas e saídas com a mesa rodando (estratégias com 'dynamic')
+        add_btn = tk.Button(controls_frame, text="Adicionar Filósofo", command=controller.add_philosopher); add_btn.pack(fill="x", padx=5, pady=2)
+        remove_btn = tk.Button(controls_frame, text="Remover Filósofo", command=controller.remove_philosopher); remove_btn.pack(fill="x", padx=5, pady=2)
+        # Só tem efeito na reprodução de um registro
+        self.speed_var = tk.DoubleVar(value=1.0)
+        tk.Scale(controls_frame, label="Velocidade (reprodução)", from_=0.1, to=20, resolution=0.1, orient="horizontal",
+                 variable=self.speed_var, command=controller.set_replay_speed).pack(fill="x", padx=5, pady=2)
 
         self.update_canvas()
 
     # ALTERADO: Recebe a lista de garfos do controlador
-    def prepare_for_simulation(self, sim_type, forks):
-        self.title_label.config(text=sim_type.replace("_", " ").title())
+    def prepare_for_simulation(self, strategy, forks, seating=None):
+        """
+        'seating' são os pares (filósofo, garfo à sua direita) na ordem dos
+        lugares (mesa.Table.ring); sem ele, o anel fixo de 0 a N-1.
+        """
+        self.title_label.config(text=strategy.label)
+        self.deadlock_label.config(text=""); self.starvation_label.config(text=""); self.membership_label.config(text="")
         self.canvas.delete("all")
         self.fork_objects = forks # Guarda a referência aos Locks
         self.philosopher_shapes, self.fork_count_texts, self.fork_shapes = {}, {}, {}
+        self.busy_forks, self.waiter_lines = set(), {}
+        if seating is None: seating = [(i, (i + 1) % len(forks)) for i in range(len(forks))]
+        n = len(seating)
+        self.available_forks_label.config(text=f"Garfos Disponíveis: {n}")
+
+        # Uma célula do mapa de calor por garfo, em linhas de HEATMAP_COLUMNS
+        # (os garfos que saíram da mesa continuam com a sua célula)
+        self.heatmap.delete("all"); self.dashboard_label.config(text="")
+        rows = (len(forks) + HEATMAP_COLUMNS - 1) // HEATMAP_COLUMNS
+        self.heatmap.config(height=rows * HEATMAP_CELL)
+        self.heatmap_cells = []
+        for i in range(len(forks)):
+            x, y = (i % HEATMAP_COLUMNS) * HEATMAP_CELL, (i // HEATMAP_COLUMNS) * HEATMAP_CELL
+            self.heatmap_cells.append(self.heatmap.create_rectangle(x, y, x + HEATMAP_CELL - 1, y + HEATMAP_CELL - 1, fill="white", outline="gray"))
+
+        # Filósofos distribuídos em círculo ao redor do garçom; com 5 lugares,
+        # nas posições fixas do desenho original
+        cx, cy = self.waiter_coords
+        radius = 150 if n <= 12 else 170
+        if n == len(CLASSIC_COORDS):
+            self.philosopher_coords = {p_id: CLASSIC_COORDS[k] for k, (p_id, _) in enumerate(seating)}
+        else:
+            self.philosopher_coords = {
+                p_id: (cx + radius * math.sin(2 * math.pi * k / n), cy - radius * math.cos(2 * math.pi * k / n))
+                for k, (p_id, _) in enumerate(seating)
+            }
+        # Tamanho dos desenhos diminui conforme a mesa cresce
+        r = max(4, min(20, int(math.pi * radius / n) - 2))
+        self.detailed = detailed = n <= 12
 
         # Desenha os garfos e suas prioridades
-        fork_positions = []
-        for i in range(5):
-            p1 = self.philosopher_coords[i]
-            p2 = self.philosopher_coords[(i + 1) % 5]
+        for k, (p_id, fork_id) in enumerate(seating):
+            p1 = self.philosopher_coords[p_id]
+            p2 = self.philosopher_coords[seating[(k + 1) % n][0]]
             # Ponto médio entre dois filósofos
             fork_pos = ((p1[0] + p2[0]) / 2, (p1[1] + p2[1]) / 2)
-            fork_positions.append(fork_pos)
             
-            shape = self.canvas.create_rectangle(fork_pos[0]-5, fork_pos[1]-15, fork_pos[0]+5, fork_pos[1]+15, fill="gray", tags=f"f_shape_{i}")
-            self.fork_shapes[i] = shape
+            w, h = max(2, r // 4), max(3, (3 * r) // 4)
+            shape = self.canvas.create_rectangle(fork_pos[0]-w, fork_pos[1]-h, fork_pos[0]+w, fork_pos[1]+h, fill="gray", tags=f"f_shape_{fork_id}")
+            self.fork_shapes[fork_id] = shape
             
             # NOVO: Mostra a prioridade (índice) do garfo na solução de hierarquia
-            if sim_type == "solucao_hierarquia":
-                self.canvas.create_text(fork_pos[0], fork_pos[1], text=str(i), fill="white", font=tkfont.Font(size=10, weight="bold"))
+            if strategy.ordered and detailed:
+                self.canvas.create_text(fork_pos[0], fork_pos[1], text=str(fork_id), fill="white", font=tkfont.Font(size=10, weight="bold"))
 
-        if sim_type == "solucao_garcom":
+        if strategy.uses_waiter:
             x, y = self.waiter_coords; self.canvas.create_rectangle(x-15, y-15, x+15, y+15, fill="lightblue", outline="black", tags="waiter"); self.canvas.create_text(x, y, text="Garçom")
 
-        for i in range(5):
-            x, y = self.philosopher_coords[i]
-            self.philosopher_shapes[i] = self.canvas.create_oval(x-20, y-20, x+20, y+20, fill="gray", tags=f"p_shape_{i}")
-            self.canvas.create_text(x, y-30, text=f"Filósofo {i}")
-            self.fork_count_texts[i] = self.canvas.create_text(x, y, text="0", font=tkfont.Font(size=12, weight="bold"))
+        for p_id, _ in seating:
+            x, y = self.philosopher_coords[p_id]
+            self.philosopher_shapes[p_id] = self.canvas.create_oval(x-r, y-r, x+r, y+r, fill="gray", tags=f"p_shape_{p_id}")
+            if detailed:
+                self.canvas.create_text(x, y-30, text=f"Filósofo {p_id}")
+            self.fork_count_texts[p_id] = self.canvas.create_text(x, y, text="0" if detailed else "", font=tkfont.Font(size=12, weight="bold"))
+
+    def relayout(self):
+        """Redesenha a mesa depois de uma entrada ou saída, com o estado atual de cada filósofo."""
+        table = self.controller.table
+        if not table: return
+        alerts = self.deadlock_label.cget("text"), self.starvation_label.cget("text")
+        seating = table.ring()
+        self.prepare_for_simulation(table.strategy, table.forks, seating)
+        self.deadlock_label.config(text=alerts[0]); self.starvation_label.config(text=alerts[1])
+        for p_id, _ in seating:
+            ph = table.philosophers[p_id]
+            fork_count = ph.fork_count
+            self.show_status(p_id, ph.status, fork_count)
+            # Os garfos na mão são os primeiros da ordem de aquisição
+            for fork_id in (ph.left_fork_id, ph.right_fork_id)[:fork_count]: self.show_fork(fork_id, True)
+        self.available_forks_label.config(text=f"Garfos Disponíveis: {len(seating) - len(self.busy_forks)}")
+
+    def show_status(self, p_id, status, fork_count):
+        colors = {"pensando": "yellow", "com fome": "orange", "comendo": "green"}
+        self.canvas.itemconfig(self.philosopher_shapes[p_id], fill=colors.get(status, "gray"))
+        # O contorno vermelho do alarme de inanição some quando ele come
+        if status == "comendo": self.canvas.itemconfig(self.philosopher_shapes[p_id], outline="black", width=1)
+        if self.detailed:
+            self.canvas.itemconfig(self.fork_count_texts[p_id], text=str(fork_count))
+
+    def show_fork(self, fork_id, busy):
+        """Pinta o garfo; devolve True se o estado dele mudou."""
+        if fork_id in self.busy_forks and not busy:
+            self.busy_forks.discard(fork_id)
+            self.canvas.itemconfig(self.fork_shapes[fork_id], fill="gray"); return True
+        if fork_id not in self.busy_forks and busy:
+            self.busy_forks.add(fork_id)
+            self.canvas.itemconfig(self.fork_shapes[fork_id], fill="red"); return True
+        return False
 
     def update_canvas(self):
         try:
-            # NOVO: Atualiza a cor dos garfos com base no estado .locked()
-            available_forks = 0
-            if self.fork_objects:
-                for i, fork_lock in enumerate(self.fork_objects):
-                    if fork_lock.locked():
-                        self.canvas.itemconfig(self.fork_shapes[i], fill="red")
-                    else:
-                        self.canvas.itemconfig(self.fork_shapes[i], fill="gray")
-                        available_forks += 1
-                self.available_forks_label.config(text=f"Garfos Disponíveis: {available_forks}")
-
-            # Processa a fila de mensagens da thread
-            while not update_queue.empty():
-                message = update_queue.get_nowait()
+            # Aplica só o que mudou desde o último quadro, com um limite de
+            # itens por quadro; o que sobrar fica no canal para o próximo
+            forks_changed = False
+            updates = self.controller.updates
+            for message in updates.drain(MAX_UPDATES_PER_FRAME) if updates else ():
                 msg_type, p_id = message[0], message[1]
 
+                if msg_type == 'membership':
+                    # Redesenha com o estado atual; o que ainda está no canal chega depois
+                    self.relayout(); self.membership_label.config(text=message[2])
+                    forks_changed = False
+                    continue
+
+                # Mensagens atrasadas de quem já saiu da mesa (ou de um garfo retirado)
+                if msg_type == 'fork_update':
+                    if p_id not in self.fork_shapes: continue
+                elif p_id is not None and p_id not in self.philosopher_shapes: continue
+
                 if msg_type == 'status_update':
-                    status, fork_count = message[2], message[3]
-                    colors = {"pensando": "yellow", "com fome": "orange", "comendo": "green"}
-                    self.canvas.itemconfig(self.philosopher_shapes[p_id], fill=colors.get(status, "gray"))
-                    self.canvas.itemconfig(self.fork_count_texts[p_id], text=str(fork_count))
+                    self.show_status(p_id, message[2], message[3])
+
+                elif msg_type == 'fork_update':
+                    if self.show_fork(p_id, message[2] is not None): forks_changed = True
                 
                 elif msg_type == 'call_waiter':
-                    px, py = self.philosopher_coords[p_id]; wx, wy = self.waiter_coords
-                    self.waiter_lines[p_id] = self.canvas.create_line(px, py, wx, wy, fill="blue", dash=(4, 2), tags=f"line_{p_id}")
+                    if p_id not in self.waiter_lines:
+                        px, py = self.philosopher_coords[p_id]; wx, wy = self.waiter_coords
+                        self.waiter_lines[p_id] = self.canvas.create_line(px, py, wx, wy, fill="blue", dash=(4, 2), tags=f"line_{p_id}")
                 
                 elif msg_type == 'end_call':
                     if p_id in self.waiter_lines: self.canvas.delete(self.waiter_lines[p_id]); del self.waiter_lines[p_id]
+
+                elif msg_type == 'deadlock':
+                    self.deadlock_label.config(text=message[2])
+
+                elif msg_type == 'starvation':
+                    self.canvas.itemconfig(self.philosopher_shapes[p_id], outline="red", width=3)
+                    self.starvation_label.config(text=message[2])
+
+            if forks_changed:
+                self.available_forks_label.config(text=f"Garfos Disponíveis: {len(self.fork_shapes) - len(self.busy_forks)}")
+
+            # O resumo das métricas percorre todos os histogramas, então é
+            # recalculado com menos frequência que o desenho
+            now = time.monotonic()
+            if self.controller.metrics and now - self.last_metrics_update >= METRICS_INTERVAL:
+                self.last_metrics_update = now
+                # Pega também quem espera sem que os vizinhos comam
+                self.controller.metrics.check_starvation()
+                self.metrics_label.config(text=format_summary(self.controller.metrics.summary()).replace(" | ", "\n"))
+                if self.controller.metrics_window: self.update_dashboard(self.controller.metrics_window.update())
         finally:
-            self.controller.after(100, self.update_canvas)
+            self.controller.after(FRAME_MS, self.update_canvas)
+
+    def update_dashboard(self, stats):
+        self.dashboard_label.config(text=format_dashboard(stats))
+        contention = stats['fork_contention']
+        top = max(contention, default=0.0)
+        for cell, rate in zip(self.heatmap_cells, contention):
+            level = 255 - int(255 * rate / top) if top else 255
+            self.heatmap.itemconfig(cell, fill=f"#ff{level:02x}{level:02x}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aplicação gráfica do Jantar dos Filósofos.")
+    parser.add_argument("--metricas", type=int, default=None, metavar="PORTA",
+                        help="publica as métricas no formato do Prometheus em http://127.0.0.1:PORTA/metrics")
+    args = parser.parse_args()
     app = App()
+    if args.metricas is not None: app.serve_metrics(args.metricas)
     app.mainloop()
\ No newline at end of file
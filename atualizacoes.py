@@ -0,0 +1,87 @@
+"""
+Canal de atualizações entre as threads dos filósofos e a interface gráfica.
+
+Em vez de uma fila que cresce sem limite, o canal guarda só o estado mais
+recente de cada item (filósofo, garfo, chamada ao garçom). Mensagens novas
+sobre o mesmo item substituem as antigas, então o tamanho do canal nunca
+passa de um registro por filósofo e por garfo, não importa a taxa de
+eventos. A interface retira as mudanças em lotes limitados a cada quadro.
+
+Mensagens aceitas por put():
+    ('status_update', p_id, status, fork_count)
+    ('fork_update', fork_id, holder)       holder é None quando o garfo está livre
+    ('call_waiter', p_id) / ('end_call', p_id)
+    ('deadlock', None, texto)
+    ('starvation', p_id, texto)
+"""
+import threading
+from collections import deque
+
+
+class CoalescingUpdates:
+    def __init__(self, max_events=32):
+        self._lock = threading.Lock()
+        # Chave -> mensagem mais recente; a ordem de inserção do dict faz
+        # com que itens sujos há mais tempo saiam primeiro
+        self._pending = {}
+        # Mensagens que não são estado (avisos de deadlock), com limite
+        self._events = deque(maxlen=max_events)
+        self.received = 0
+        self.merged = 0
+
+    def put(self, message):
+        msg_type = message[0]
+        if msg_type in ('call_waiter', 'end_call'):
+            key = ('call', message[1])
+        elif msg_type in ('status_update', 'fork_update'):
+            key = (msg_type, message[1])
+        else:
+            key = None
+        with self._lock:
+            self.received += 1
+            if key is None:
+                self._events.append(message)
+            else:
+                if key in self._pending:
+                    self.merged += 1
+                self._pending[key] = message
+
+    def drain(self, limit):
+        """Retira até 'limit' mensagens; o restante fica para o próximo quadro."""
+        with self._lock:
+            out = list(self._events)
+            self._events.clear()
+            if len(self._pending) <= limit:
+                out.extend(self._pending.values())
+                self._pending.clear()
+            else:
+                items = list(self._pending.items())
+                out.extend(msg for _, msg in items[:limit])
+                self._pending = dict(items[limit:])
+        return out
+
+    def empty(self):
+        return not self._pending and not self._events
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._events.clear()
+
+
+class DiscardUpdates:
+    """Canal das mesas sem ninguém olhando: descarta todas as mensagens."""
+    received = 0
+    merged = 0
+
+    def put(self, message):
+        pass
+
+    def drain(self, limit):
+        return []
+
+    def empty(self):
+        return True
+
+    def clear(self):
+        pass
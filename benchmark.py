@@ -0,0 +1,210 @@
+"""
+Benchmark em lote das estratégias do Jantar dos Filósofos.
+
+Varre estratégia x número de filósofos x distribuição dos tempos de pensar e
+comer x repetições. Cada célula roda no simulador por eventos discretos, sem
+interface, até um número fixo de refeições ou um tempo virtual fixo. As
+execuções são distribuídas em um pool de processos, e o resultado agregado
+por célula é gravado em CSV ou JSON.
+
+Exemplo:
+    python3 benchmark.py --filosofos 5 50 500 --repeticoes 10 --refeicoes 5000 --saida resultados.csv
+
+Com --comparar, duas estratégias rodam nas mesmas células e a saída traz,
+lado a lado, a vazão e a espera de cada uma e a razão entre elas:
+    python3 benchmark.py --comparar solucao_garcom solucao_garcom_trechos --filosofos 5 50 500
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from metricas import MetricsCollector
+from simulacao_eventos import SIM_TYPES, DiscreteEventSimulation
+from perfis_carga import get_profile
+from recuperacao_deadlock import DeadlockRecovery, VICTIM_POLICIES
+
+
+# Perfis de carga (perfis_carga.py) e suas opções. As médias são as mesmas
+# da aplicação; 'rapido' é a uniforme cem vezes mais curta.
+TIMINGS = {
+    'uniforme': ('uniforme', {}),
+    'exponencial': ('exponencial', {}),
+    'pareto': ('pareto', {}),
+    'bimodal': ('bimodal', {}),
+    'assimetrico': ('assimetrico', {}),
+    'constante': ('constante', {}),
+    'rapido': ('uniforme', {'scale': 0.01}),
+}
+
+FIELDS = (
+    'sim_type', 'num_philosophers', 'timing', 'runs',
+    'meals_per_second', 'wait_p50', 'wait_p95', 'wait_p99', 'wait_max', 'overtakes_max', 'fairness',
+    'deadlock_rate', 'time_to_deadlock', 'recoveries', 'recovery_lost_time', 'wall_time',
+)
+
+COMPARE_FIELDS = (
+    'num_philosophers', 'timing', 'baseline', 'candidate',
+    'baseline_meals_per_second', 'candidate_meals_per_second', 'speedup',
+    'baseline_wait_p95', 'candidate_wait_p95', 'baseline_wait_p99', 'candidate_wait_p99',
+    'baseline_wait_max', 'candidate_wait_max',
+)
+
+
+def run_cell(sim_type, num_philosophers, timing, seed, max_meals, max_time, sleep_between_forks,
+             max_overtakes=None, recovery=None):
+    """Executa uma repetição de uma célula. Roda dentro de um processo do pool."""
+    profile, options = TIMINGS[timing]
+    kwargs = {'workload': get_profile(profile)(num_philosophers, seed=seed, **options)}
+    if sleep_between_forks is not None:
+        kwargs['sleep_between_forks'] = sleep_between_forks
+    if max_overtakes is not None:
+        kwargs['max_overtakes'] = max_overtakes
+    metrics = MetricsCollector(num_philosophers, clock=None)
+    if recovery is not None:
+        kwargs['recovery'] = DeadlockRecovery(recovery, metrics=metrics, rng=random.Random(seed))
+    sim = DiscreteEventSimulation(sim_type, num_philosophers, seed=seed, metrics=metrics, **kwargs)
+    r = sim.run(max_meals=max_meals, max_time=max_time)
+    m = r.pop('metrics')
+    r.pop('meals')
+    r['timing'] = timing
+    r['meals_per_second'] = r['total_meals'] / r['virtual_time'] if r['virtual_time'] else 0.0
+    r['wait_p50'], r['wait_p95'], r['wait_p99'] = m['wait']['p50'], m['wait']['p95'], m['wait']['p99']
+    r['wait_max'] = m['wait']['max']
+    r['overtakes_max'] = m['overtakes_max']
+    r['fairness'] = m['fairness']
+    r['recovery_lost_time'] = m['recovery_lost_time']
+    return r
+
+
+def aggregate(runs):
+    """Junta as repetições de uma célula em uma linha da tabela."""
+    first = runs[0]
+    n = len(runs)
+    deadlocks = [r['deadlock_time'] for r in runs if r['deadlock']]
+    mean = lambda key: sum(r[key] for r in runs) / n
+    return {
+        'sim_type': first['sim_type'],
+        'num_philosophers': first['num_philosophers'],
+        'timing': first['timing'],
+        'runs': n,
+        'meals_per_second': mean('meals_per_second'),
+        'wait_p50': mean('wait_p50'),
+        'wait_p95': mean('wait_p95'),
+        'wait_p99': mean('wait_p99'),
+        'wait_max': max(r['wait_max'] for r in runs),
+        'overtakes_max': max(r['overtakes_max'] for r in runs),
+        'fairness': mean('fairness'),
+        'deadlock_rate': len(deadlocks) / n,
+        'time_to_deadlock': sum(deadlocks) / len(deadlocks) if deadlocks else None,
+        'recoveries': mean('recoveries'),
+        'recovery_lost_time': mean('recovery_lost_time'),
+        'wall_time': sum(r['wall_time'] for r in runs),
+    }
+
+
+def run_sweep(sim_types, sizes, timings, repetitions, max_meals=None, max_time=None,
+              seed=0, processes=None, sleep_between_forks=None, max_overtakes=None, recovery=None):
+    """
+    Executa a varredura completa e devolve uma linha agregada por célula.
+    A repetição k usa a semente seed + k em todas as células, para que as
+    estratégias sejam comparadas com a mesma sequência aleatória. Com
+    'recovery' (uma política de recuperacao_deadlock), os deadlocks são
+    desfeitos e cada execução vai até o fim.
+    """
+    cells = list(itertools.product(sim_types, sizes, timings))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = {
+            cell: [pool.submit(run_cell, *cell, seed + k, max_meals, max_time, sleep_between_forks, max_overtakes,
+                               recovery)
+                   for k in range(repetitions)]
+            for cell in cells
+        }
+        return [aggregate([f.result() for f in futures[cell]]) for cell in cells]
+
+
+def compare(rows, baseline, candidate):
+    """Uma linha por (filósofos, tempos) com as duas estratégias lado a lado."""
+    by_cell = {(r['sim_type'], r['num_philosophers'], r['timing']): r for r in rows}
+    out = []
+    for r in rows:
+        if r['sim_type'] != baseline:
+            continue
+        other = by_cell.get((candidate, r['num_philosophers'], r['timing']))
+        if other is None:
+            continue
+        base_rate, cand_rate = r['meals_per_second'], other['meals_per_second']
+        out.append({
+            'num_philosophers': r['num_philosophers'],
+            'timing': r['timing'],
+            'baseline': baseline,
+            'candidate': candidate,
+            'baseline_meals_per_second': base_rate,
+            'candidate_meals_per_second': cand_rate,
+            'speedup': cand_rate / base_rate if base_rate else None,
+            'baseline_wait_p95': r['wait_p95'],
+            'candidate_wait_p95': other['wait_p95'],
+            'baseline_wait_p99': r['wait_p99'],
+            'candidate_wait_p99': other['wait_p99'],
+            'baseline_wait_max': r['wait_max'],
+            'candidate_wait_max': other['wait_max'],
+        })
+    return out
+
+
+def write_results(rows, out, fmt, fields=FIELDS):
+    if fmt == 'json':
+        json.dump(rows, out, indent=2)
+        out.write("\n")
+    else:
+        writer = csv.DictWriter(out, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark em lote das estratégias do Jantar dos Filósofos.")
+    parser.add_argument("--estrategias", nargs="+", choices=SIM_TYPES, default=list(SIM_TYPES))
+    parser.add_argument("--comparar", nargs=2, choices=SIM_TYPES, metavar=("BASE", "OUTRA"),
+                        help="compara duas estratégias lado a lado (substitui --estrategias)")
+    parser.add_argument("--filosofos", nargs="+", type=int, default=[5, 50, 500])
+    parser.add_argument("--tempos", nargs="+", choices=sorted(TIMINGS), default=['uniforme', 'exponencial'])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--refeicoes", type=int, default=None, help="refeições por execução")
+    parser.add_argument("--tempo", type=float, default=None, help="tempo virtual por execução, em segundos")
+    parser.add_argument("--pausa-garfos", type=float, default=None,
+                        help="pausa entre o primeiro e o segundo garfo (padrão: a de cada estratégia)")
+    parser.add_argument("--ultrapassagens", type=int, default=None,
+                        help="máximo de vezes que um vizinho pode passar na frente (solucao_garcom_justo)")
+    parser.add_argument("--recuperacao", choices=VICTIM_POLICIES, default=None,
+                        help="desfaz cada deadlock escolhendo uma vítima por esta política")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--processos", type=int, default=os.cpu_count())
+    parser.add_argument("--formato", choices=("csv", "json"), default="csv")
+    parser.add_argument("--saida", default=None, help="arquivo de saída (padrão: terminal)")
+    args = parser.parse_args()
+    if args.refeicoes is None and args.tempo is None:
+        args.tempo = 3600.0
+    if args.comparar:
+        args.estrategias = args.comparar
+
+    rows = run_sweep(args.estrategias, args.filosofos, args.tempos, args.repeticoes,
+                     max_meals=args.refeicoes, max_time=args.tempo, seed=args.semente,
+                     processes=args.processos, sleep_between_forks=args.pausa_garfos,
+                     max_overtakes=args.ultrapassagens, recovery=args.recuperacao)
+    fields = FIELDS
+    if args.comparar:
+        rows, fields = compare(rows, *args.comparar), COMPARE_FIELDS
+
+    if args.saida:
+        with open(args.saida, "w", newline="") as out:
+            write_results(rows, out, args.formato, fields)
+    else:
+        write_results(rows, sys.stdout, args.formato, fields)
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,31 @@
+import sys
 import threading
 import time
 import random
 
-# NOVO: Importamos a classe Barrier
-from threading import Barrier
+from estrategias import get_strategy
+from perfil_locks import LockProfiler
+from registro_eventos import (EventLogWriter, record_or_print, NO_FORK, EV_PENSANDO, EV_COM_FOME,
+                              EV_COMENDO, EV_FORK_TAKEN, EV_FORK_RELEASED)
 
 class Philosopher(threading.Thread):
     # ALTERADO: Adicionamos o 'barrier' no construtor
-    def __init__(self, name, left_fork, right_fork, barrier):
+    def __init__(self, name, left_fork, right_fork, barrier, p_id=0, fork_ids=(NO_FORK, NO_FORK), log=None):
         super().__init__()
         self.name = name
         self.left_fork = left_fork
         self.right_fork = right_fork
         self.barrier = barrier
+        # Índice na mesa e dos garfos, e registro de eventos opcional
+        self.p_id, (self.left_fork_id, self.right_fork_id) = p_id, fork_ids
+        self.log = log
 
     def run(self):
         while True:
-            print(f'{self.name} está pensando.')
+            record_or_print(self.log, self.p_id, f'{self.name} está pensando.', (EV_PENSANDO, NO_FORK))
             time.sleep(random.uniform(1, 3))
 
-            print(f'{self.name} está com fome e vai para a mesa.')
+            record_or_print(self.log, self.p_id, f'{self.name} está com fome e vai para a mesa.', (EV_COM_FOME, NO_FORK))
             
             # NOVO: Barreira de sincronização
             # Todas as threads vão parar aqui até que 5 delas chamem .wait()
@@ -31,44 +37,62 @@ class Philosopher(threading.Thread):
                 pass
 
             # A corrida pelos garfos começa AGORA
-            print(f'{self.name} vai pegar o garfo esquerdo.')
+            record_or_print(self.log, self.p_id, f'{self.name} vai pegar o garfo esquerdo.')
             self.left_fork.acquire()
-            print(f'{self.name} PEGOU o garfo esquerdo.')
+            record_or_print(self.log, self.p_id, f'{self.name} PEGOU o garfo esquerdo.', (EV_FORK_TAKEN, self.left_fork_id))
             
             # NOVO: Pequena pausa para garantir que os outros também peguem o primeiro garfo
             time.sleep(0.1) 
             
-            print(f'{self.name} vai pegar o garfo direito.')
+            record_or_print(self.log, self.p_id, f'{self.name} vai pegar o garfo direito.')
             self.right_fork.acquire() # <-- DEADLOCK ACONTECERÁ AQUI
             
-            print(f'{self.name} pegou os dois garfos e está comendo.')
+            record_or_print(self.log, self.p_id, f'{self.name} pegou os dois garfos e está comendo.',
+                            (EV_FORK_TAKEN, self.right_fork_id), (EV_COMENDO, NO_FORK))
             time.sleep(random.uniform(1, 3))
 
             self.right_fork.release()
             self.left_fork.release()
-            print(f'{self.name} terminou de comer e largou os garfos.')
+            record_or_print(self.log, self.p_id, f'{self.name} terminou de comer e largou os garfos.',
+                            (EV_FORK_RELEASED, self.right_fork_id), (EV_FORK_RELEASED, self.left_fork_id))
 
 def main():
-    num_philosophers = 5
-    forks = [threading.Lock() for _ in range(num_philosophers)]
+    # O número de filósofos pode ser passado na linha de comando (padrão: 5)
+    num_philosophers = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    # Um segundo argumento grava os eventos nesse arquivo em vez de imprimi-los ('-': sem registro)
+    log = EventLogWriter(sys.argv[2], num_philosophers, "deadlock_rapido") if len(sys.argv) > 2 and sys.argv[2] != "-" else None
+    # Um terceiro liga o perfil dos locks, gravado com esse prefixo ao interromper (Ctrl+C)
+    profiler = LockProfiler(enabled=len(sys.argv) > 3)
+    forks = [profiler.lock(f"garfo {i}") for i in range(num_philosophers)]
     
-    # NOVO: Cria uma barreira que espera por todas as 5 threads de filósofos
-    barrier = Barrier(num_philosophers)
+    # A estratégia cria uma barreira que espera por todas as threads de filósofos
+    strategy = get_strategy("deadlock_rapido")(num_philosophers, locks=profiler)
+    strategy.setup_threads()
+    barrier = strategy.barrier
     
     philosophers = []
     for i in range(num_philosophers):
-        left_fork = forks[i]
-        right_fork = forks[(i + 1) % num_philosophers]
+        left_fork_index, right_fork_index = strategy.fork_order(i)
+        left_fork = forks[left_fork_index]
+        right_fork = forks[right_fork_index]
         
         # ALTERADO: Passa a barreira para cada filósofo
-        philosopher = Philosopher(f'Filósofo {i}', left_fork, right_fork, barrier)
+        philosopher = Philosopher(f'Filósofo {i}', left_fork, right_fork, barrier,
+                                  p_id=i, fork_ids=(left_fork_index, right_fork_index), log=log)
         philosophers.append(philosopher)
 
     for p in philosophers:
         p.start()
 
-    for p in philosophers:
-        p.join()
+    try:
+        for p in philosophers:
+            p.join()
+    except KeyboardInterrupt:
+        # Grava o que ainda está na fila do registro antes de sair
+        if log: log.close()
+        if profiler.enabled:
+            print("Perfil dos locks gravado em", " e ".join(profiler.save(sys.argv[3])))
+        raise
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,49 +1,69 @@
+import sys
 import threading
 import time
 import random
 
+from estrategias import get_strategy
+from perfil_locks import LockProfiler
+from registro_eventos import (EventLogWriter, record_or_print, NO_FORK, EV_PENSANDO, EV_COM_FOME,
+                              EV_COMENDO, EV_FORK_TAKEN, EV_FORK_RELEASED)
+
 class Philosopher(threading.Thread):
-    def __init__(self, name, left_fork, right_fork):
+    def __init__(self, name, left_fork, right_fork, p_id=0, fork_ids=(NO_FORK, NO_FORK), log=None):
         super().__init__()
         self.name = name
         self.left_fork = left_fork
         self.right_fork = right_fork
+        # Índice na mesa e dos garfos, e registro de eventos opcional
+        self.p_id, (self.left_fork_id, self.right_fork_id) = p_id, fork_ids
+        self.log = log
 
     def run(self):
         while True:
             # Pensa
-            print(f'{self.name} está pensando.')
+            record_or_print(self.log, self.p_id, f'{self.name} está pensando.', (EV_PENSANDO, NO_FORK))
             time.sleep(random.uniform(1, 3))
 
             # Pega os garfos (aqui está o problema)
-            print(f'{self.name} está com fome e vai pegar o garfo esquerdo.')
+            record_or_print(self.log, self.p_id, f'{self.name} está com fome e vai pegar o garfo esquerdo.', (EV_COM_FOME, NO_FORK))
             self.left_fork.acquire()
-            print(f'{self.name} pegou o garfo esquerdo. Vai tentar pegar o direito.')
+            record_or_print(self.log, self.p_id, f'{self.name} pegou o garfo esquerdo. Vai tentar pegar o direito.', (EV_FORK_TAKEN, self.left_fork_id))
             # Um pequeno delay aqui aumenta a chance de deadlock
             time.sleep(0.5) 
             
             self.right_fork.acquire()
             
             # Come
-            print(f'{self.name} pegou os dois garfos e está comendo.')
+            record_or_print(self.log, self.p_id, f'{self.name} pegou os dois garfos e está comendo.',
+                            (EV_FORK_TAKEN, self.right_fork_id), (EV_COMENDO, NO_FORK))
             time.sleep(random.uniform(1, 3))
 
             # Larga os garfos
             self.right_fork.release()
             self.left_fork.release()
-            print(f'{self.name} terminou de comer e largou os garfos.')
+            record_or_print(self.log, self.p_id, f'{self.name} terminou de comer e largou os garfos.',
+                            (EV_FORK_RELEASED, self.right_fork_id), (EV_FORK_RELEASED, self.left_fork_id))
 
 def main():
-    num_philosophers = 5
-    forks = [threading.Lock() for _ in range(num_philosophers)]
+    # O número de filósofos pode ser passado na linha de comando (padrão: 5)
+    num_philosophers = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    # Um segundo argumento grava os eventos nesse arquivo em vez de imprimi-los ('-': sem registro)
+    log = EventLogWriter(sys.argv[2], num_philosophers, "deadlock_lento") if len(sys.argv) > 2 and sys.argv[2] != "-" else None
+    # Um terceiro liga o perfil dos locks, gravado com esse prefixo ao interromper (Ctrl+C)
+    profiler = LockProfiler(enabled=len(sys.argv) > 3)
+    forks = [profiler.lock(f"garfo {i}") for i in range(num_philosophers)]
+    strategy = get_strategy("deadlock_lento")(num_philosophers, locks=profiler)
     
     # Cria os filósofos
     philosophers = []
     for i in range(num_philosophers):
-        left_fork = forks[i]
-        right_fork = forks[(i + 1) % num_philosophers] # O vizinho à direita
+        # Garfo i à esquerda e o do vizinho à direita
+        left_fork_index, right_fork_index = strategy.fork_order(i)
+        left_fork = forks[left_fork_index]
+        right_fork = forks[right_fork_index]
         
-        philosopher = Philosopher(f'Filósofo {i}', left_fork, right_fork)
+        philosopher = Philosopher(f'Filósofo {i}', left_fork, right_fork,
+                                  p_id=i, fork_ids=(left_fork_index, right_fork_index), log=log)
         philosophers.append(philosopher)
 
     # Inicia as threads
@@ -51,8 +71,15 @@ def main():
         p.start()
 
     # Mantém a thread principal viva
-    for p in philosophers:
-        p.join()
+    try:
+        for p in philosophers:
+            p.join()
+    except KeyboardInterrupt:
+        # Grava o que ainda está na fila do registro antes de sair
+        if log: log.close()
+        if profiler.enabled:
+            print("Perfil dos locks gravado em", " e ".join(profiler.save(sys.argv[3])))
+        raise
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
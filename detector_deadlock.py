@@ -0,0 +1,154 @@
+"""
+Detector de deadlock por grafo de espera (wait-for graph).
+
+O grafo é mantido de forma incremental conforme os recursos (garfos e o
+garçom) são pedidos, obtidos e liberados:
+
+    filósofo --espera--> recurso --está com--> filósofo
+
+Cada filósofo espera no máximo um recurso e cada recurso tem no máximo um
+dono, então a partir de uma aresta nova basta seguir a cadeia
+espera -> dono -> espera ... Se ela volta ao ponto de partida, há um ciclo,
+e o custo da busca é o comprimento da cadeia (o do ciclo, quando há
+deadlock). Não há varredura periódica de todos os locks: o ciclo é
+encontrado na própria chamada que o fecha.
+"""
+import threading
+import time
+from collections import deque
+
+# Recurso que representa o garçom na solucao_garcom
+WAITER = "garcom"
+
+
+class DeadlockReport:
+    """Um ciclo encontrado no grafo de espera."""
+    def __init__(self, cycle, time, sequence):
+        # Lista de (filósofo, recurso que ele espera)
+        self.cycle = cycle
+        self.time = time
+        # Últimos eventos (tempo, filósofo, ação, recurso) dos filósofos do ciclo
+        self.sequence = sequence
+
+    @property
+    def philosophers(self):
+        return [p for p, _ in self.cycle]
+
+    def describe(self):
+        path = " -> ".join(f"F{p} espera {r}" for p, r in self.cycle)
+        return f"Deadlock em t={self.time:.3f}s: {path}"
+
+    def as_dict(self):
+        return {'cycle': self.cycle, 'time': self.time, 'sequence': list(self.sequence)}
+
+
+class WaitForGraph:
+    """
+    Grafo de espera com detecção de ciclos a cada aresta nova.
+
+    on_deadlock, se informado, é chamado com o DeadlockReport assim que o
+    ciclo se forma (na thread que o fechou). Todos os métodos aceitam 'now'
+    para que o simulador por eventos passe o relógio virtual; sem ele, o
+    tempo é contado a partir da criação do grafo.
+    """
+    def __init__(self, clock=None, history=256, on_deadlock=None, metrics=None):
+        if clock is None:
+            self._start = time.perf_counter()
+            clock = self._elapsed
+        self.clock = clock
+        self.on_deadlock = on_deadlock
+        self.metrics = metrics
+        self.holder = {}        # recurso -> filósofo que o tem
+        self.waiting_for = {}   # filósofo -> recurso que espera
+        self.waiters = {}       # recurso -> filósofos que o esperam
+        self.history = deque(maxlen=history)
+        self.deadlocks = []
+        self._lock = threading.Lock()
+
+    def _elapsed(self):
+        return time.perf_counter() - self._start
+
+    def __getstate__(self):
+        # Checkpoint (salvamento.py): o lock não é copiado, quem carrega cria outro
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def on_request(self, p_id, resource, now=None):
+        """O filósofo vai esperar pelo recurso. Devolve o relatório se fechou um ciclo."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            self.history.append((now, p_id, "pede", resource))
+            if self.holder.get(resource) == p_id:
+                return None
+            # A aresta é registrada mesmo se o recurso parece livre: com
+            # threads, o dono real pode ainda não ter chamado on_acquire
+            self.waiting_for[p_id] = resource
+            self.waiters.setdefault(resource, set()).add(p_id)
+            report = self._find_cycle(p_id, now)
+        return self._report(report)
+
+    def on_acquire(self, p_id, resource, now=None):
+        now = self.clock() if now is None else now
+        with self._lock:
+            self.history.append((now, p_id, "pega", resource))
+            if self.waiting_for.get(p_id) == resource:
+                del self.waiting_for[p_id]
+                self.waiters[resource].discard(p_id)
+            self.holder[resource] = p_id
+            # Quem já esperava o recurso agora espera o novo dono, o que
+            # pode fechar um ciclo
+            report = None
+            for w in self.waiters.get(resource, ()):
+                report = self._find_cycle(w, now)
+                if report:
+                    break
+        return self._report(report)
+
+    def on_release(self, p_id, resource, now=None):
+        now = self.clock() if now is None else now
+        with self._lock:
+            self.history.append((now, p_id, "larga", resource))
+            if self.holder.get(resource) == p_id:
+                del self.holder[resource]
+
+    def on_cancel(self, p_id, now=None):
+        """O filósofo desistiu de esperar (parado ou recuando)."""
+        with self._lock:
+            resource = self.waiting_for.pop(p_id, None)
+            if resource is not None:
+                self.waiters[resource].discard(p_id)
+
+    def _find_cycle(self, start, now):
+        # Segue espera -> dono a partir de 'start'; como cada nó tem no máximo
+        # uma saída, a cadeia volta a 'start' ou termina em alguém que não espera
+        cycle = []
+        p = start
+        seen = set()
+        while True:
+            resource = self.waiting_for.get(p)
+            if resource is None or p in seen:
+                return None
+            seen.add(p)
+            cycle.append((p, resource))
+            p = self.holder.get(resource)
+            if p is None:
+                return None
+            if p == start:
+                members = set(seen)
+                sequence = [e for e in self.history if e[1] in members]
+                return DeadlockReport(cycle, now, sequence)
+
+    def _report(self, report):
+        if report is None:
+            return None
+        self.deadlocks.append(report)
+        if self.metrics:
+            self.metrics.on_deadlock(report)
+        if self.on_deadlock:
+            self.on_deadlock(report)
+        return report
@@ -0,0 +1,774 @@
+"""
+Registro de estratégias do Jantar dos Filósofos.
+
+Cada estratégia é uma classe registrada com @register_strategy e usada por
+todas as formas de execução:
+  - a aplicação gráfica e os scripts de terminal (uma thread por filósofo),
+    pelos métodos setup_threads / pickup / release;
+  - o simulador por eventos discretos (simulacao_eventos.py) e o benchmark,
+    pelos métodos setup_events / on_hungry / on_granted / on_timer /
+    on_eating / on_done_eating.
+
+Uma instância é criada para cada mesa, então ela pode guardar o estado
+compartilhado da estratégia (garçom, barreira, semáforo, donos dos garfos).
+
+Para adicionar uma estratégia, basta criar uma subclasse de Strategy com
+'name' e 'label' e decorá-la com @register_strategy: ela aparece no menu da
+aplicação, na linha de comando do simulador e no benchmark.
+"""
+import random
+import threading
+import time
+from array import array
+from collections import deque
+from contextlib import ExitStack
+from types import SimpleNamespace
+
+from detector_deadlock import WAITER
+from perfil_locks import LockProfiler
+
+STRATEGIES = {}
+
+
+def register_strategy(cls):
+    """Decorador que adiciona a estratégia ao registro, pelo seu 'name'."""
+    if cls.name in STRATEGIES:
+        raise ValueError(f"Estratégia já registrada: {cls.name}")
+    STRATEGIES[cls.name] = cls
+    return cls
+
+
+def get_strategy(name):
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Tipo de simulação desconhecido: {name}") from None
+
+
+class Strategy:
+    """
+    Estratégia base: cada filósofo pega o garfo esquerdo e depois o direito,
+    sem nenhuma coordenação (é o deadlock_lento).
+    """
+    name = None
+    label = None
+    # Pega primeiro o garfo de menor índice (a GUI mostra as prioridades)
+    ordered = False
+    # Usa um árbitro central (a GUI desenha o garçom)
+    uses_waiter = False
+    # Largar os locks pegos desfaz a tentativa inteira, então a recuperação
+    # de deadlock (recuperacao_deadlock.py) pode interromper a espera
+    rollback_safe = True
+    # Aceita filósofos entrando e saindo com a mesa rodando (mesa.Table):
+    # o estado da estratégia não depende do número de lugares
+    dynamic = True
+    # Funciona em qualquer topologia (topologias.py), com qualquer número
+    # de garfos por refeição, e não só no anel
+    general_topology = True
+    # Pausa entre o primeiro e o segundo garfo
+    sleep_between_forks = 0
+
+    def __init__(self, num_philosophers, **options):
+        self.num_philosophers = num_philosophers
+        self.sleep_between_forks = options.get('sleep_between_forks', self.sleep_between_forks)
+        self.rng = options.get('rng') or random.Random()
+        # Fábrica dos locks da estratégia (perfil_locks.py); desligada, cria
+        # os objetos comuns do threading
+        self.locks = options.get('locks') or LockProfiler(enabled=False)
+        # Topologia da mesa (topologias.Topology); None é o anel de sempre
+        topology = options.get('topology')
+        self.topology = None if topology is None or topology.ring else topology
+        if self.topology is not None and not self.general_topology:
+            raise ValueError(f"A estratégia {self.name} só funciona no anel")
+
+    def fork_order(self, p_id):
+        """Primeiro e segundo garfo que o filósofo vai pegar."""
+        return self.order_forks(p_id, (p_id + 1) % self.num_philosophers)
+
+    def order_forks(self, left_fork_idx, right_fork_idx):
+        """
+        Ordem dos garfos de um lugar qualquer. Garfos novos recebem índices
+        novos, então a ordem por índice continua total quando a mesa muda.
+        """
+        if self.ordered and left_fork_idx > right_fork_idx:
+            return right_fork_idx, left_fork_idx
+        return left_fork_idx, right_fork_idx
+
+    def resource_order(self, p_id):
+        """Ordem de aquisição de todos os recursos do filósofo na topologia."""
+        if self.topology is None:
+            return self.fork_order(p_id)
+        resources = self.topology.needs[p_id]
+        return tuple(sorted(resources)) if self.ordered else resources
+
+    # ---- Threads (ControllablePhilosopher e scripts de terminal) ----
+
+    def setup_threads(self):
+        """Cria os objetos de sincronização compartilhados pela mesa."""
+
+    def pickup(self, ph):
+        ph._acquire_left()
+        if self.sleep_between_forks:
+            time.sleep(self.sleep_between_forks)
+        if not ph.running:
+            ph._release_left(); return
+        # Do segundo em diante, na ordem de fork_ids (dois no anel)
+        for k in range(1, len(ph.fork_ids)):
+            ph._acquire_fork(k)
+
+    def release(self, ph):
+        for k in reversed(range(len(ph.fork_ids))):
+            ph._release_fork(k)
+
+    def stop_threads(self):
+        """Libera quem espera em um objeto da estratégia sem timeout, ao parar a mesa."""
+
+    def on_join(self):
+        """Um lugar foi acrescentado à mesa em execução."""
+        self.num_philosophers += 1
+
+    def on_leave(self, running):
+        """
+        Um lugar vai ser retirado da mesa em execução, antes de o anel se
+        fechar; 'running()' diz se a mesa ainda está rodando.
+        """
+        self.num_philosophers -= 1
+
+    # ---- Eventos discretos (DiscreteEventSimulation) ----
+
+    def setup_events(self, sim):
+        """Prepara o estado da estratégia para uma simulação por eventos."""
+
+    def on_hungry(self, sim, p_id):
+        sim.acquire_first(p_id)
+
+    def on_granted(self, sim, p_id):
+        # Recebeu o que esperava; o número de garfos diz em que ponto estava
+        count = sim.fork_count[p_id]
+        if count == 0:
+            sim.acquire_first(p_id)
+        elif count == 1:
+            sim.got_first(p_id)
+        elif sim.ring:
+            sim.start_eating(p_id)
+        else:
+            # Fora do anel, pode faltar mais de um garfo
+            sim.acquire_second(p_id)
+
+    def on_timer(self, sim, p_id):
+        sim.acquire_second(p_id)
+
+    def on_eating(self, sim, p_id):
+        """Chamado quando o filósofo passa a comer."""
+
+    def on_done_eating(self, sim, p_id):
+        if sim.ring:
+            sim.release_fork(p_id, sim.second_fork[p_id])
+            sim.release_fork(p_id, sim.first_fork[p_id])
+        else:
+            sim.release_all(p_id)
+
+
+@register_strategy
+class SlowDeadlock(Strategy):
+    name = "deadlock_lento"
+    label = "Deadlock (Lento)"
+
+
+@register_strategy
+class FastDeadlock(Strategy):
+    """
+    Uma barreira obriga todos a tentar pegar o primeiro garfo ao mesmo
+    tempo, e a pausa antes do segundo garante o deadlock.
+    """
+    name = "deadlock_rapido"
+    label = "Deadlock (Rápido/Garantido)"
+    # A barreira é criada para um número fixo de filósofos
+    dynamic = False
+    sleep_between_forks = 0.1
+
+    def setup_threads(self):
+        self.barrier = self.locks.barrier("barreira", self.num_philosophers)
+
+    def pickup(self, ph):
+        # Sem timeout: as threads esperam o tempo que for necessário
+        try: self.barrier.wait()
+        except (threading.BrokenBarrierError, RuntimeError): return
+        super().pickup(ph)
+
+    def stop_threads(self):
+        self.barrier.abort()
+
+    def setup_events(self, sim):
+        self.barrier_waiting = []
+
+    def on_hungry(self, sim, p_id):
+        self.barrier_waiting.append(p_id)
+        if len(self.barrier_waiting) == self.num_philosophers:
+            released, self.barrier_waiting = self.barrier_waiting, []
+            for q in released:
+                sim.acquire_first(q)
+
+
+@register_strategy
+class ResourceHierarchy(Strategy):
+    """Sempre pega primeiro o garfo de menor índice."""
+    name = "solucao_hierarquia"
+    label = "Solução com Hierarquia"
+    ordered = True
+
+
+@register_strategy
+class Waiter(Strategy):
+    """
+    Um garçom (lock único) é chamado antes de pegar os garfos e liberado
+    assim que o filósofo tem os dois.
+    """
+    name = "solucao_garcom"
+    label = "Solução com Garçom"
+    uses_waiter = True
+
+    def setup_threads(self):
+        self.waiter = self.locks.lock("garçom")
+
+    def pickup(self, ph):
+        ph._call_waiter(self.waiter)
+        for k in range(len(ph.fork_ids)):
+            ph._acquire_fork(k)
+        ph._release(self.waiter, WAITER)
+
+    def setup_events(self, sim):
+        self.waiter_holder = None
+        self.waiter_queue = deque()
+
+    def on_hungry(self, sim, p_id):
+        if sim.metrics:
+            sim.metrics.on_waiter_enter(p_id, sim.clock)
+        if self.waiter_holder is None:
+            self._grant_waiter(sim, p_id)
+            sim.acquire_first(p_id)
+        else:
+            self.waiter_queue.append(p_id)
+            if sim.detector:
+                sim.detector.on_request(p_id, WAITER, sim.clock)
+
+    def _grant_waiter(self, sim, p_id):
+        self.waiter_holder = p_id
+        if sim.metrics:
+            sim.metrics.on_waiter_leave(p_id, sim.clock)
+        if sim.detector:
+            sim.detector.on_acquire(p_id, WAITER, sim.clock)
+
+    def on_eating(self, sim, p_id):
+        if self.waiter_holder != p_id:
+            return
+        if sim.detector:
+            sim.detector.on_release(p_id, WAITER, sim.clock)
+        if self.waiter_queue:
+            q = self.waiter_queue.popleft()
+            self._grant_waiter(sim, q)
+            sim.grant(q)
+        else:
+            self.waiter_holder = None
+
+
+@register_strategy
+class SegmentedWaiter(Strategy):
+    """
+    Garçons por trecho da mesa: cada trecho de 'segment_size' garfos tem o
+    seu garçom (um lock curto). O filósofo fala com os garçons dos seus dois
+    garfos; se os dois estão livres, ambos são reservados de uma vez, senão
+    o pedido fica anotado e ele espera fora do lock até um vizinho largar um
+    garfo. Nenhum garçom fica preso enquanto alguém come ou espera, então só
+    vizinhos em conflito esperam um pelo outro e a vazão cresce com a mesa.
+    """
+    name = "solucao_garcom_trechos"
+    label = "Solução com Garçons por Trecho"
+    uses_waiter = True
+    # A reserva feita pelo garçom do trecho não é desfeita ao largar os garfos
+    rollback_safe = False
+    # Trechos e usuários de cada garfo são calculados uma vez, a partir do anel inicial
+    dynamic = False
+    general_topology = False
+    segment_size = 4
+
+    def __init__(self, num_philosophers, **options):
+        super().__init__(num_philosophers, **options)
+        self.segment_size = options.get('segment_size', self.segment_size)
+        # Filósofos que usam cada garfo: são os únicos a avisar quando ele fica livre
+        self.users = [[] for _ in range(num_philosophers)]
+        for p_id in range(num_philosophers):
+            for fork in self.fork_order(p_id):
+                self.users[fork].append(p_id)
+
+    def setup_threads(self):
+        n = self.num_philosophers
+        self.segments = [self.locks.lock(f"garçom do trecho {s}") for s in range(-(-n // self.segment_size))]
+        self.reserved = [False] * n
+        self.pending = [False] * n
+        self.wakeups = [threading.Event() for _ in range(n)]
+
+    def _segment_locks(self, forks):
+        # Sempre em ordem crescente de trecho, para os garçons não se travarem
+        return [self.segments[s] for s in sorted({f // self.segment_size for f in forks})]
+
+    def _reserve(self, ph):
+        forks = (ph.left_fork_id, ph.right_fork_id)
+        locks = self._segment_locks(forks)
+        wakeup = self.wakeups[ph.p_id]
+        while ph.running:
+            for lock in locks: lock.acquire()
+            try:
+                if not (self.reserved[forks[0]] or self.reserved[forks[1]]):
+                    self.reserved[forks[0]] = self.reserved[forks[1]] = True
+                    self.pending[ph.p_id] = False
+                    return True
+                self.pending[ph.p_id] = True
+                wakeup.clear()
+            finally:
+                for lock in reversed(locks): lock.release()
+            wakeup.wait(0.5)
+        return False
+
+    def pickup(self, ph):
+        # A reserva não prende nenhum recurso, então não entra no grafo de espera
+        ph._call_waiter(SimpleNamespace(acquire=lambda: self._reserve(ph)), resource=None)
+        if not ph.running:
+            return
+        # Os garfos reservados já foram largados por quem os tinha
+        ph._acquire_left()
+        ph._acquire_right()
+
+    def release(self, ph):
+        super().release(ph)
+        forks = (ph.left_fork_id, ph.right_fork_id)
+        locks = self._segment_locks(forks)
+        for lock in locks: lock.acquire()
+        try:
+            for fork in forks:
+                self.reserved[fork] = False
+                for q in self.users[fork]:
+                    if self.pending[q]: self.wakeups[q].set()
+        finally:
+            for lock in reversed(locks): lock.release()
+
+    def setup_events(self, sim):
+        self.pending = bytearray(self.num_philosophers)
+
+    def _try_reserve(self, sim, p_id):
+        first, second = sim.first_fork[p_id], sim.second_fork[p_id]
+        if sim.is_free(first) and sim.is_free(second):
+            if sim.metrics:
+                sim.metrics.on_waiter_leave(p_id, sim.clock)
+            sim.take_fork(p_id, first)
+            sim.take_fork(p_id, second)
+            sim.start_eating(p_id)
+        else:
+            self.pending[p_id] = 1
+
+    def on_hungry(self, sim, p_id):
+        if sim.metrics:
+            sim.metrics.on_waiter_enter(p_id, sim.clock)
+        self._try_reserve(sim, p_id)
+
+    def on_granted(self, sim, p_id):
+        if sim.is_hungry(p_id):
+            self._try_reserve(sim, p_id)
+
+    def on_done_eating(self, sim, p_id):
+        super().on_done_eating(sim, p_id)
+        for fork in (sim.first_fork[p_id], sim.second_fork[p_id]):
+            for q in self.users[fork]:
+                if self.pending[q]:
+                    self.pending[q] = 0
+                    sim.grant(q)
+
+
+@register_strategy
+class FairWaiter(Strategy):
+    """
+    Garçom justo: quem fica com fome recebe uma ficha numerada. O garçom só
+    entrega os dois garfos se estão livres e nenhum vizinho com ficha mais
+    antiga já foi ultrapassado 'max_overtakes' vezes. Com 0 a ordem das
+    fichas é estrita entre vizinhos e a espera é limitada; valores maiores
+    deixam passar mais gente na frente, trocando justiça por vazão.
+
+    O garçom é um monitor (Condition): ninguém espera segurando o lock.
+    """
+    name = "solucao_garcom_justo"
+    label = "Solução com Garçom Justo (Fichas)"
+    uses_waiter = True
+    # A ficha e a reserva não são desfeitas ao largar os garfos
+    rollback_safe = False
+    # Fichas e vizinhos ficam em listas indexadas pelos lugares iniciais
+    dynamic = False
+    # A ficha é passada entre os dois vizinhos do anel
+    general_topology = False
+    max_overtakes = 0
+
+    def __init__(self, num_philosophers, **options):
+        super().__init__(num_philosophers, **options)
+        self.max_overtakes = options.get('max_overtakes', self.max_overtakes)
+        # Vizinhos de cada filósofo: os outros usuários dos seus garfos
+        users = [[] for _ in range(num_philosophers)]
+        for p_id in range(num_philosophers):
+            for fork in self.fork_order(p_id):
+                users[fork].append(p_id)
+        self.neighbors = [
+            sorted({q for fork in self.fork_order(p_id) for q in users[fork]} - {p_id})
+            for p_id in range(num_philosophers)
+        ]
+
+    def _reset(self, n):
+        self.ticket = [None] * n
+        self.overtaken = [0] * n
+        self.next_ticket = 0
+
+    def _can_eat(self, p_id, forks_free):
+        if not forks_free:
+            return False
+        mine = self.ticket[p_id]
+        for q in self.neighbors[p_id]:
+            ticket = self.ticket[q]
+            if ticket is not None and ticket < mine and self.overtaken[q] >= self.max_overtakes:
+                return False
+        return True
+
+    def _served(self, p_id):
+        # Os vizinhos com ficha mais antiga foram ultrapassados
+        mine = self.ticket[p_id]
+        for q in self.neighbors[p_id]:
+            ticket = self.ticket[q]
+            if ticket is not None and ticket < mine:
+                self.overtaken[q] += 1
+        self.ticket[p_id] = None
+        self.overtaken[p_id] = 0
+
+    def _take_ticket(self, p_id):
+        self.ticket[p_id] = self.next_ticket
+        self.next_ticket += 1
+
+    def setup_threads(self):
+        self._reset(self.num_philosophers)
+        self.monitor = threading.Condition()
+        self.reserved = [False] * self.num_philosophers
+
+    def _reserve(self, ph):
+        forks = (ph.left_fork_id, ph.right_fork_id)
+        with self.monitor:
+            self._take_ticket(ph.p_id)
+            while ph.running and not self._can_eat(ph.p_id, not any(self.reserved[f] for f in forks)):
+                self.monitor.wait(0.5)
+            if not ph.running:
+                self.ticket[ph.p_id] = None
+                return False
+            self._served(ph.p_id)
+            for f in forks:
+                self.reserved[f] = True
+        return True
+
+    def pickup(self, ph):
+        ph._call_waiter(SimpleNamespace(acquire=lambda: self._reserve(ph)), resource=None)
+        if not ph.running:
+            return
+        ph._acquire_left()
+        ph._acquire_right()
+
+    def release(self, ph):
+        super().release(ph)
+        with self.monitor:
+            self.reserved[ph.left_fork_id] = self.reserved[ph.right_fork_id] = False
+            self.monitor.notify_all()
+
+    def setup_events(self, sim):
+        self._reset(self.num_philosophers)
+
+    def _try_serve(self, sim, p_id):
+        first, second = sim.first_fork[p_id], sim.second_fork[p_id]
+        if not self._can_eat(p_id, sim.is_free(first) and sim.is_free(second)):
+            return
+        self._served(p_id)
+        if sim.metrics:
+            sim.metrics.on_waiter_leave(p_id, sim.clock)
+        sim.take_fork(p_id, first)
+        sim.take_fork(p_id, second)
+        sim.start_eating(p_id)
+
+    def on_hungry(self, sim, p_id):
+        if sim.metrics:
+            sim.metrics.on_waiter_enter(p_id, sim.clock)
+        self._take_ticket(p_id)
+        self._try_serve(sim, p_id)
+
+    def on_done_eating(self, sim, p_id):
+        super().on_done_eating(sim, p_id)
+        # Vizinhos esperando são atendidos pela ordem das fichas
+        waiting = [q for q in self.neighbors[p_id] if self.ticket[q] is not None]
+        for q in sorted(waiting, key=self.ticket.__getitem__):
+            if self.ticket[q] is not None:
+                self._try_serve(sim, q)
+
+
+@register_strategy
+class Footman(Strategy):
+    """
+    "Porteiro": um semáforo com N-1 vagas limita quantos filósofos disputam
+    os garfos ao mesmo tempo. Com no máximo N-1 na mesa, algum sempre
+    consegue os dois garfos, e quem não está em conflito não espera ninguém.
+    """
+    name = "solucao_porteiro"
+    label = "Solução com Porteiro (N-1)"
+    uses_waiter = True
+    # A vaga do porteiro (semáforo) não fica entre os recursos rastreados
+    rollback_safe = False
+    # N-1 vagas só impedem o deadlock no anel; num grafo qualquer, um ciclo
+    # menor que a mesa ainda pode se fechar
+    general_topology = False
+
+    def setup_threads(self):
+        self.footman = self.locks.semaphore("porteiro", self.num_philosophers - 1)
+
+    def on_join(self):
+        super().on_join()
+        # Um lugar a mais, uma vaga a mais: continua N-1
+        self.footman.release()
+
+    def on_leave(self, running):
+        super().on_leave(running)
+        # A vaga sai antes de o anel se fechar; com N-1 vagas para N-1
+        # lugares, todos poderiam pegar o primeiro garfo ao mesmo tempo
+        while running() and not self.footman.acquire(timeout=0.5):
+            pass
+
+    def pickup(self, ph):
+        # A vaga não tem um único dono, então não entra no grafo de espera
+        ph._call_waiter(self.footman, resource=None)
+        super().pickup(ph)
+
+    def release(self, ph):
+        super().release(ph)
+        self.footman.release()
+
+    def setup_events(self, sim):
+        self.permits = self.num_philosophers - 1
+        self.queue = deque()
+
+    def on_hungry(self, sim, p_id):
+        if sim.metrics:
+            sim.metrics.on_waiter_enter(p_id, sim.clock)
+        if self.permits:
+            self.permits -= 1
+            if sim.metrics:
+                sim.metrics.on_waiter_leave(p_id, sim.clock)
+            sim.acquire_first(p_id)
+        else:
+            self.queue.append(p_id)
+
+    def on_done_eating(self, sim, p_id):
+        super().on_done_eating(sim, p_id)
+        if self.queue:
+            # A vaga passa direto para o próximo da fila
+            q = self.queue.popleft()
+            if sim.metrics:
+                sim.metrics.on_waiter_leave(q, sim.clock)
+            sim.grant(q)
+        else:
+            self.permits += 1
+
+
+@register_strategy
+class TryLockBackoff(Strategy):
+    """
+    Tenta pegar todos os garfos sem bloquear; se falhar, larga o que pegou e
+    espera um tempo aleatório que cresce a cada tentativa (recuo exponencial).
+    Ninguém espera segurando garfo, então não há deadlock, e o sorteio do
+    recuo torna improvável que os vizinhos repitam a colisão.
+    """
+    name = "tentativa_recuo"
+    label = "Tentativa com Recuo Aleatório"
+    # Recuos para a refeição de 3 s em média da aplicação; com um perfil de
+    # carga ('workload'), crescem ou encolhem na proporção da refeição média
+    # dele, como os tempos de pensar e comer com --escala
+    base_backoff = 0.05
+    max_backoff = 1.0
+    eat_reference = 3.0
+
+    def __init__(self, num_philosophers, **options):
+        super().__init__(num_philosophers, **options)
+        workload = options.get('workload')
+        if workload is not None:
+            factor = workload.mean_times()[1] / self.eat_reference
+            self.base_backoff = self.base_backoff * factor
+            self.max_backoff = self.max_backoff * factor
+
+    def _backoff(self, attempt):
+        # Expoente limitado: num recurso disputado por muitos, as tentativas
+        # seguidas passam de mil e 2 ** attempt estouraria o float
+        return self.rng.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** min(attempt, 32)))
+
+    def pickup(self, ph):
+        attempt = 0
+        # Sem garfos entre as tentativas: um pedido de desistência só encerra o loop
+        while ph.running and not ph.abort_requested:
+            taken = 0
+            for fork in ph.forks:
+                if not fork.acquire(blocking=False): break
+                taken += 1
+            if taken == len(ph.forks):
+                for k, fork_id in enumerate(ph.fork_ids):
+                    ph._took_fork(fork_id, k + 1)
+                return
+            for fork in reversed(ph.forks[:taken]):
+                fork.release()
+            busy = ph.fork_ids[taken]
+            if ph.metrics: ph.metrics.on_fork_contended(ph.p_id, busy)
+            attempt += 1
+            time.sleep(self._backoff(attempt))
+
+    def setup_events(self, sim):
+        self.attempts = array('i', [0]) * self.num_philosophers
+
+    def on_hungry(self, sim, p_id):
+        forks = sim.forks_of(p_id)
+        busy = next((fork for fork in forks if not sim.is_free(fork)), None)
+        if busy is None:
+            self.attempts[p_id] = 0
+            for fork in forks:
+                sim.take_fork(p_id, fork)
+            sim.start_eating(p_id)
+        else:
+            if sim.metrics:
+                sim.metrics.on_fork_contended(p_id, busy, sim.clock)
+            self.attempts[p_id] += 1
+            sim.set_timer(self._backoff(self.attempts[p_id]), p_id)
+
+    def on_timer(self, sim, p_id):
+        self.on_hungry(sim, p_id)
+
+
+@register_strategy
+class ChandyMisra(Strategy):
+    """
+    Garfos limpos e sujos (Chandy–Misra). Cada garfo sempre tem um dono;
+    no início ele é do filósofo de menor índice e está sujo. Quem está com
+    fome pede os garfos que não tem: um garfo sujo é entregue (e limpo) se o
+    dono não está comendo; um garfo limpo fica com o dono até ele comer.
+    Depois de comer os dois garfos ficam sujos e vão para quem os pediu.
+
+    Não há árbitro nem ordem global: cada decisão envolve só os dois
+    vizinhos de um garfo, e o esquema é livre de deadlock e de inanição.
+    Vale para qualquer grafo de conflitos (um garfo por aresta), com
+    quantos garfos cada filósofo precisar.
+    """
+    name = "chandy_misra"
+    label = "Chandy–Misra (Garfos Limpos/Sujos)"
+    # Os garfos trocam de dono por mensagens, não por locks
+    rollback_safe = False
+    # O dono inicial de cada garfo depende do anel de 0 a N-1
+    dynamic = False
+
+    def __init__(self, num_philosophers, **options):
+        super().__init__(num_philosophers, **options)
+        if self.topology is not None and not self.topology.is_graph:
+            raise ValueError("Chandy–Misra precisa de recursos divididos por no máximo dois filósofos")
+
+    def _num_forks(self):
+        return self.num_philosophers if self.topology is None else self.topology.num_resources
+
+    def _initial_owner(self, fork):
+        # O garfo vai para o usuário de menor índice; no anel, o garfo f
+        # fica entre os filósofos f-1 e f
+        if self.topology is not None:
+            return min(self.topology.users[fork])
+        n = self.num_philosophers
+        return min(fork, (fork - 1) % n)
+
+    def setup_threads(self):
+        forks = self._num_forks()
+        self.conditions = [threading.Condition() for _ in range(forks)]
+        self.owner = [self._initial_owner(f) for f in range(forks)]
+        self.dirty = [True] * forks
+        self.eating = [False] * self.num_philosophers
+
+    def pickup(self, ph):
+        p_id = ph.p_id
+        forks = sorted(ph.fork_ids)
+        while ph.running:
+            for fork in forks:
+                cond = self.conditions[fork]
+                with cond:
+                    while self.owner[fork] != p_id and ph.running:
+                        owner = self.owner[fork]
+                        if self.dirty[fork] and not self.eating[owner]:
+                            # O dono entregaria este garfo; o pedido é
+                            # atendido aqui mesmo, sob o lock do garfo
+                            self.owner[fork] = p_id
+                            self.dirty[fork] = False
+                        else:
+                            cond.wait(0.5)
+            if not ph.running:
+                return
+            # Um garfo sujo que já era nosso pode ter sido levado enquanto
+            # esperávamos outro; confere todos sob os locks de todos, na
+            # ordem dos índices
+            with ExitStack() as stack:
+                for fork in forks:
+                    stack.enter_context(self.conditions[fork])
+                if all(self.owner[fork] == p_id for fork in forks):
+                    self.eating[p_id] = True
+                    break
+        else:
+            return
+        for k, fork_id in enumerate(ph.fork_ids):
+            ph._took_fork(fork_id, k + 1)
+
+    def release(self, ph):
+        p_id = ph.p_id
+        forks = sorted(ph.fork_ids)
+        with ExitStack() as stack:
+            for fork in forks:
+                stack.enter_context(self.conditions[fork])
+            self.eating[p_id] = False
+            for fork in forks:
+                self.dirty[fork] = True
+                self.conditions[fork].notify_all()
+        for k in reversed(range(len(ph.fork_ids))):
+            ph._dropped_fork(ph.fork_ids[k], k)
+
+    def setup_events(self, sim):
+        forks = self._num_forks()
+        self.dirty = bytearray(b'\x01') * forks
+        for fork in range(forks):
+            sim.take_fork(self._initial_owner(fork), fork)
+
+    def _try_eat(self, sim, p_id):
+        missing = False
+        for fork in sim.forks_of(p_id):
+            owner = sim.fork_holder[fork]
+            if owner == p_id:
+                continue
+            if self.dirty[fork] and not sim.is_eating(owner):
+                self.dirty[fork] = 0
+                sim.transfer_fork(owner, p_id, fork)
+            else:
+                sim.wait_fork(p_id, fork)
+                missing = True
+        if not missing:
+            sim.start_eating(p_id)
+
+    def on_hungry(self, sim, p_id):
+        self._try_eat(sim, p_id)
+
+    def on_granted(self, sim, p_id):
+        if sim.is_hungry(p_id):
+            self._try_eat(sim, p_id)
+
+    def on_done_eating(self, sim, p_id):
+        for fork in reversed(sim.forks_of(p_id)):
+            self.dirty[fork] = 1
+            q = sim.fork_waiter[fork]
+            if q != p_id and q >= 0:
+                # Atende o pedido pendente com o garfo limpo
+                self.dirty[fork] = 0
+                sim.transfer_fork(p_id, q, fork)
+                sim.grant(q)
@@ -0,0 +1,611 @@
+"""
+Núcleo da mesa com threads, sem interface gráfica.
+
+ControllablePhilosopher é a thread de um filósofo que pode ser pausada,
+parada e interrompida pela recuperação de deadlock. Table monta uma mesa
+completa: garfos, estratégia, métricas, detector de deadlock, registro de
+eventos, perfil dos locks e um canal de atualizações próprio. Nada aqui
+importa o Tkinter, e cada mesa guarda o seu próprio estado, então um mesmo
+processo pode rodar várias mesas independentes (e a interface gráfica em
+aplicacao_jantar.py é só uma das formas de olhar para elas):
+
+    table = Table("solucao_garcom", 5, workload=get_profile("uniforme")(5, scale=0.01))
+    summary = table.run(10.0)
+
+    python3 mesa.py solucao_garcom --filosofos 5 --mesas 8 --duracao 10 --escala 0.01
+
+Com estratégias 'dynamic', filósofos entram e saem sem parar a mesa:
+
+    table.join(after=2)      # um lugar novo à direita de F2
+    table.leave(0)           # F0 sai quando não estiver segurando garfos
+
+    python3 mesa.py solucao_hierarquia --duracao 20 --escala 0.01 --rotatividade 0.5
+"""
+import argparse
+import queue
+import random
+import threading
+import time
+from collections import namedtuple
+
+from metricas import MetricsCollector, format_summary
+from detector_deadlock import WaitForGraph, WAITER
+from atualizacoes import CoalescingUpdates, DiscardUpdates
+from estrategias import STRATEGIES, get_strategy
+from perfis_carga import PROFILES, get_profile
+from perfil_locks import LockProfiler
+from recuperacao_deadlock import DeadlockRecovery, RollbackRequested, Candidate, VICTIM_POLICIES, POLL_INTERVAL
+from topologias import TOPOLOGIES, get_topology, topology_options
+from registro_eventos import EventLogWriter, EV_FORK_TAKEN, EV_FORK_RELEASED, EV_WAITER_CALL, EV_WAITER_END
+
+# Alarme de inanição: espera (s) ou refeições dos vizinhos durante a espera
+STARVATION_AGE = 15.0
+STARVATION_OVERTAKES = 6
+# Fatia das esperas da thread que muda a mesa (desiste se a mesa parar)
+MEMBERSHIP_POLL = 0.1
+# Mudança pedida a um filósofo: sair da mesa (as outras são os garfos novos,
+# como (locks, índices))
+LEAVE = "sair"
+
+# Uma entrada ou saída concluída e quanto ela levou, do pedido até o anel
+# estar fechado de novo
+MembershipChange = namedtuple('MembershipChange', 'kind p_id latency')
+
+
+class ControllablePhilosopher(threading.Thread):
+    """
+    Uma classe de Filósofo que pode ser parada e pausada externamente.
+
+    Os garfos ficam em 'forks' (locks) e 'fork_ids' (índices), na ordem de
+    aquisição; no anel são dois, o esquerdo e o direito. Fora dele
+    (topologias.py), 'forks=' e 'fork_ids=' trazem todos os recursos.
+    """
+    def __init__(self, p_id, left_fork, right_fork, pause_event, **kwargs):
+        # O nome aparece como dono dos locks no perfil de disputa
+        super().__init__(name=f"Filósofo {p_id}")
+        self.p_id = p_id
+        self.forks = tuple(kwargs.get('forks', (left_fork, right_fork)))
+        self.pause_event = pause_event
+        self.running = True
+        self.status = "pensando"
+        self.fork_count = 0
+        self.hungry_since = None
+        self.meals = 0
+        # Recursos pegos na tentativa atual: (lock, recurso, instante)
+        self.held = []
+        self.abort_requested = False
+
+        # Estratégia (estrategias.Strategy) que decide como pegar e largar os garfos
+        self.strategy = kwargs['strategy']
+        # Coletor de métricas opcional e índices dos garfos na mesa
+        self.metrics = kwargs.get('metrics')
+        self.detector = kwargs.get('detector')
+        self.event_log = kwargs.get('event_log')
+        # Perfil de carga (perfis_carga.py) com os tempos de pensar e comer
+        self.workload = kwargs.get('workload')
+        self.fork_ids = tuple(kwargs.get('fork_ids', (None,) * len(self.forks)))
+        # Recuperação de deadlock opcional; só vale para estratégias em que
+        # largar os recursos pegos desfaz a tentativa inteira
+        self.recovery = kwargs.get('recovery') if self.strategy.rollback_safe else None
+        if self.recovery: self.recovery.register(self)
+        # Canal de atualizações da mesa (atualizacoes.py); sem ele, nada é enviado
+        self.updates = kwargs.get('updates') or DiscardUpdates()
+        # Mudança pedida pela mesa (novos garfos ou LEAVE), aplicada quando o
+        # filósofo não segura nada; 'wakeup' interrompe o tempo de pensar
+        self.change = None
+        self.change_done = threading.Event()
+        self.wakeup = threading.Event()
+        
+        self._send_update()
+
+    @property
+    def left_fork(self): return self.forks[0]
+
+    @property
+    def right_fork(self): return self.forks[1]
+
+    @property
+    def left_fork_id(self): return self.fork_ids[0]
+
+    @property
+    def right_fork_id(self): return self.fork_ids[1]
+
+    def _send_update(self):
+        self.updates.put(('status_update', self.p_id, self.status, self.fork_count))
+
+    def set_status(self, new_status):
+        self.status = new_status
+        if new_status == "com fome": self.hungry_since = time.monotonic()
+        elif new_status == "comendo": self.hungry_since = None
+        if self.metrics: self.metrics.on_status(self.p_id, new_status)
+        if self.event_log: self.event_log.record_status(self.p_id, new_status)
+        self._send_update()
+
+    def hunger_age(self):
+        """Segundos com fome na espera atual (0 se não está com fome)."""
+        since = self.hungry_since
+        return time.monotonic() - since if since is not None else 0.0
+
+    def candidate(self):
+        """Dados usados pela política de escolha da vítima."""
+        now = time.monotonic()
+        cost = sum(now - t for _, resource, t in self.held if isinstance(resource, int))
+        return Candidate(self.p_id, self.hungry_since or now, self.meals, cost)
+
+    # ---- Operações usadas pelas estratégias ----
+
+    def _acquire(self, lock, resource):
+        # O detector precisa saber da espera antes do acquire bloqueante
+        if self.detector and resource is not None: self.detector.on_request(self.p_id, resource)
+        # Nos garfos, tenta sem bloquear primeiro para contar as disputas
+        if isinstance(resource, int):
+            if not lock.acquire(blocking=False):
+                if self.metrics: self.metrics.on_fork_contended(self.p_id, resource)
+                self._wait_fork(lock)
+        else:
+            lock.acquire()
+        if resource is not None: self.held.append((lock, resource, time.monotonic()))
+        if self.detector and resource is not None: self.detector.on_acquire(self.p_id, resource)
+
+    def _wait_fork(self, lock):
+        # Espera em fatias para poder desistir sem que outra thread solte o
+        # lock: ao parar a simulação ou quando a recuperação escolhe a vítima
+        if self.recovery: self.recovery.wait(self, lock); return
+        while not lock.acquire(timeout=POLL_INTERVAL):
+            # abort_requested: a mesa pediu a saída de quem está esperando
+            if not self.running or self.abort_requested:
+                self.abort_requested = False
+                raise RollbackRequested()
+
+    def _release(self, lock, resource):
+        lock.release()
+        if resource is not None:
+            self.held = [h for h in self.held if h[1] != resource]
+        if self.detector and resource is not None: self.detector.on_release(self.p_id, resource)
+
+    def _rollback(self):
+        """Larga, na ordem inversa, tudo o que pegou na tentativa interrompida."""
+        if self.detector: self.detector.on_cancel(self.p_id)
+        lost = sum(time.monotonic() - t for _, resource, t in self.held if isinstance(resource, int))
+        while self.held:
+            lock, resource, _ = self.held[-1]
+            self._release(lock, resource)
+            if isinstance(resource, int): self._dropped_fork(resource, self.fork_count - 1)
+        if self.recovery and self.running and self.change != LEAVE:
+            self.recovery.on_rollback(self.p_id, lost)
+            time.sleep(self.recovery.backoff())
+
+    def _took_fork(self, fork_id, fork_count):
+        self.fork_count = fork_count
+        if self.metrics: self.metrics.on_fork_acquired(self.p_id, fork_id)
+        if self.event_log: self.event_log.record(self.p_id, EV_FORK_TAKEN, fork_id)
+        self.updates.put(('fork_update', fork_id, self.p_id))
+        self._send_update()
+
+    def _dropped_fork(self, fork_id, fork_count):
+        self.fork_count = fork_count
+        if self.metrics: self.metrics.on_fork_released(self.p_id, fork_id)
+        if self.event_log: self.event_log.record(self.p_id, EV_FORK_RELEASED, fork_id)
+        self.updates.put(('fork_update', fork_id, None))
+        self._send_update()
+
+    def _acquire_fork(self, k):
+        """Pega o k-ésimo garfo da ordem de aquisição (os anteriores já estão na mão)."""
+        self._acquire(self.forks[k], self.fork_ids[k]); self._took_fork(self.fork_ids[k], k + 1)
+
+    def _release_fork(self, k):
+        """Larga o k-ésimo garfo (os seguintes já foram largados)."""
+        self._release(self.forks[k], self.fork_ids[k]); self._dropped_fork(self.fork_ids[k], k)
+
+    def _acquire_left(self): self._acquire_fork(0)
+
+    def _acquire_right(self): self._acquire_fork(1)
+
+    def _release_left(self): self._release_fork(0)
+
+    def _release_right(self): self._release_fork(1)
+
+    def _call_waiter(self, waiter, resource=WAITER):
+        self.updates.put(('call_waiter', self.p_id))
+        if self.metrics: self.metrics.on_waiter_enter(self.p_id)
+        if self.event_log: self.event_log.record(self.p_id, EV_WAITER_CALL)
+        self._acquire(waiter, resource)
+        if self.metrics: self.metrics.on_waiter_leave(self.p_id)
+        if self.event_log: self.event_log.record(self.p_id, EV_WAITER_END)
+        self.updates.put(('end_call', self.p_id))
+
+    def pickup_forks(self):
+        try:
+            self.strategy.pickup(self)
+        except RollbackRequested:
+            # Continua com fome e tenta de novo no próximo ciclo do run
+            self._rollback(); return
+        self.abort_requested = False
+        if self.fork_count == len(self.forks): self.set_status("comendo")
+
+    def release_forks(self):
+        self.strategy.release(self)
+        self.held.clear()
+        self.meals += 1
+        self.set_status("pensando")
+
+    def _apply_change(self):
+        """Troca os garfos ou sai da mesa; só é chamado sem garfos na mão."""
+        change, self.change = self.change, None
+        if change is None: return
+        if change == LEAVE: self.running = False
+        else: self.forks, self.fork_ids = change
+        self.change_done.set()
+
+    def _think(self, duration):
+        # Acorda para aplicar as mudanças na mesa e volta a pensar pelo resto do tempo
+        end = time.monotonic() + duration
+        while self.wakeup.wait(max(0.0, end - time.monotonic())):
+            self.wakeup.clear()
+            self._apply_change()
+            if not self.running: return
+
+    def run(self):
+        while self.running:
+            self.pause_event.wait()
+            # Entre uma tentativa e outra ninguém segura garfos: é aqui que a
+            # mesa troca os garfos do filósofo ou o tira dela
+            if self.change is not None and self.fork_count == 0:
+                self._apply_change()
+                if not self.running: break
+            
+            if self.status == "pensando":
+                self._think(self.workload.think(self.p_id) if self.workload else random.uniform(1, 3))
+                if not self.running: break
+                self.set_status("com fome")
+            elif self.status == "com fome":
+                self.pickup_forks()
+            elif self.status == "comendo":
+                time.sleep(self.workload.eat(self.p_id) if self.workload else random.uniform(2, 4)); self.release_forks()
+            
+            if not self.running: break
+
+
+class Table:
+    """
+    Uma mesa com uma thread por filósofo. Tudo o que as threads tocam é da
+    própria mesa: canal de atualizações, evento de pausa, métricas e locks.
+
+    'recovery' é o nome de uma política de recuperacao_deadlock (ou None),
+    'log_path' grava o registro de eventos e 'profile_prefix' liga o perfil
+    dos locks, gravado com esse prefixo em stop().
+
+    Com uma estratégia 'dynamic', join() e leave() põem e tiram filósofos
+    com a mesa rodando. Uma thread da mesa faz as mudanças uma de cada vez:
+    cada filósofo afetado troca de garfos quando não segura nenhum, então os
+    outros continuam comendo e a ordem dos garfos da estratégia vale o tempo
+    todo. Os índices de filósofos e garfos nunca são reaproveitados.
+
+    'topology' (topologias.Topology) troca o anel por outra mesa: cada
+    filósofo pega todos os seus recursos, na ordem da estratégia. Essas
+    mesas têm tamanho fixo.
+    """
+    def __init__(self, sim_type, num_philosophers=5, workload=None, recovery=None, log_path=None,
+                 profile_prefix=None, updates=None, starvation_age=STARVATION_AGE,
+                 starvation_overtakes=STARVATION_OVERTAKES, topology=None):
+        n = num_philosophers
+        self.sim_type = sim_type
+        self.num_philosophers = n
+        # None é o anel, também quando a topologia pedida é 'anel'
+        self.topology = topology = None if topology is None or topology.ring else topology
+        if topology is not None and topology.num_philosophers != n:
+            raise ValueError("A topologia tem outro número de filósofos")
+        if topology is not None and log_path:
+            raise ValueError("O registro de eventos só grava mesas em anel")
+        num_forks = n if topology is None else topology.num_resources
+        self.updates = updates if updates is not None else CoalescingUpdates()
+        self.pause_event = threading.Event()
+        self.pause_event.set()
+        # Desligado, o perfil devolve threading.Lock comuns
+        self.profile_prefix = profile_prefix
+        self.lock_profiler = LockProfiler(enabled=profile_prefix is not None)
+        self.forks = [self.lock_profiler.lock(f"garfo {i}") for i in range(num_forks)]
+        self.workload = workload
+        self.metrics = MetricsCollector(n, starvation_age=starvation_age, starvation_overtakes=starvation_overtakes,
+                                        on_starvation=self._on_starvation, num_forks=num_forks)
+        if topology is not None: self.metrics.set_neighbors(topology.conflicts)
+        self.event_log = EventLogWriter(log_path, n, sim_type) if log_path else None
+        self.recovery = DeadlockRecovery(recovery, metrics=self.metrics) if recovery else None
+        self.detector = WaitForGraph(metrics=self.metrics, on_deadlock=self._on_deadlock)
+        # A estratégia cria o garçom, a barreira etc. e define a ordem dos garfos
+        self.strategy = get_strategy(sim_type)(n, locks=self.lock_profiler, topology=topology, workload=workload)
+        self.strategy.setup_threads()
+        self._philosopher_options = {
+            'pause_event': self.pause_event, 'metrics': self.metrics, 'detector': self.detector,
+            'strategy': self.strategy, 'event_log': self.event_log, 'workload': workload,
+            'recovery': self.recovery, 'updates': self.updates}
+        # Lugares em volta da mesa e os garfos de cada lado (esquerdo, direito);
+        # fora do anel não há lados, e cada um pega os recursos da topologia
+        self.seating = list(range(n))
+        if topology is None:
+            self.seats = {i: (i, (i + 1) % n) for i in range(n)}
+            self.philosophers = [self._new_philosopher(i, *self.seats[i]) for i in range(n)]
+        else:
+            self.seats = {}
+            self.philosophers = [self._new_philosopher(i) for i in range(n)]
+        self.profile_paths = None
+        self.running = False
+        # Mudanças já feitas (MembershipChange) e a fila das pedidas, que a
+        # thread da mesa só cria no primeiro pedido
+        self.changes = []
+        self._requests = queue.Queue()
+        self._membership = None
+        self._size_after = n
+        self._leaving = set()
+        self._membership_lock = threading.Lock()
+
+    def _new_philosopher(self, p_id, left_fork_id=None, right_fork_id=None):
+        # Sem os garfos de um lugar do anel, são os recursos da topologia
+        if left_fork_id is None: fork_ids = self.strategy.resource_order(p_id)
+        else: fork_ids = self.strategy.order_forks(left_fork_id, right_fork_id)
+        forks = tuple(self.forks[f] for f in fork_ids)
+        return ControllablePhilosopher(p_id, None, None, forks=forks, fork_ids=fork_ids, **self._philosopher_options)
+
+    def _on_starvation(self, p_id, age, overtakes):
+        self.updates.put(('starvation', p_id, f"Inanição: F{p_id} com fome há {age:.1f}s ({overtakes} ultrapassagens)"))
+
+    def _on_deadlock(self, report):
+        if self.event_log: self.event_log.record_deadlock(report)
+        text = report.describe()
+        victim = self.recovery.on_deadlock(report) if self.recovery else None
+        if victim is not None: text += f"\nRecuperação ({self.recovery.policy}): F{victim} recua ({self.recovery.recoveries + 1}ª vez)"
+        self.updates.put(('deadlock', None, text))
+
+    def start(self):
+        self.running = True
+        for p in self.philosophers: p.start()
+
+    # ---- Mesa que muda em execução ----
+
+    def _check_dynamic(self):
+        if not self.strategy.dynamic:
+            raise ValueError(f"A estratégia {self.sim_type} não aceita filósofos entrando e saindo com a mesa rodando")
+        if self.event_log:
+            raise ValueError("O registro de eventos tem um número fixo de filósofos")
+        if self.topology is not None:
+            raise ValueError("Só a mesa em anel aceita filósofos entrando e saindo")
+        if not self.running:
+            raise ValueError("A mesa não está rodando")
+
+    def join(self, after=None):
+        """
+        Pede um filósofo novo à direita de 'after' (padrão: o último lugar).
+        Volta na hora; a mudança é feita pela thread da mesa.
+        """
+        with self._membership_lock:
+            self._check_dynamic()
+            if after is not None and (after not in self.seats or after in self._leaving):
+                raise ValueError(f"F{after} não está na mesa")
+            self._size_after += 1
+            self._submit(("entra", after))
+
+    def leave(self, p_id=None):
+        """Pede a saída de 'p_id' (padrão: o último lugar). Volta na hora."""
+        with self._membership_lock:
+            self._check_dynamic()
+            if p_id is not None and (p_id not in self.seats or p_id in self._leaving):
+                raise ValueError(f"F{p_id} não está na mesa")
+            if self._size_after <= 2:
+                raise ValueError("A mesa precisa de pelo menos dois filósofos")
+            if p_id is None: p_id = next((p for p in reversed(self.seating) if p not in self._leaving), None)
+            if p_id is None:
+                raise ValueError("Todos os filósofos sentados já estão saindo")
+            self._size_after -= 1
+            self._leaving.add(p_id)
+            self._submit(("sai", p_id))
+
+    def ring(self):
+        """Pares (filósofo, garfo à sua direita) na ordem dos lugares."""
+        with self._membership_lock:
+            return [(p_id, self.seats[p_id][1]) for p_id in self.seating]
+
+    def _submit(self, request):
+        if self._membership is None:
+            self._membership = threading.Thread(target=self._membership_loop, name="Mesa", daemon=True)
+            self._membership.start()
+        self._requests.put(request)
+
+    def _membership_loop(self):
+        while self.running:
+            try: kind, p_id = self._requests.get(timeout=MEMBERSHIP_POLL)
+            except queue.Empty: continue
+            start = time.perf_counter()
+            # Só esta thread muda o contador; as esperas encerradas durante a
+            # mudança vão para um histograma à parte
+            self.metrics.changes_in_progress += 1
+            try: p_id = self._add_seat(p_id) if kind == "entra" else self._remove_seat(p_id)
+            finally: self.metrics.changes_in_progress -= 1
+            if p_id is None: return  # A mesa parou no meio da mudança
+            latency = time.perf_counter() - start
+            self.metrics.on_membership_change(latency)
+            self.changes.append(MembershipChange(kind, p_id, latency))
+            verb = "entrou na" if kind == "entra" else "saiu da"
+            self.updates.put(('membership', p_id, f"F{p_id} {verb} mesa em {latency * 1000:.1f}ms"))
+
+    def _wait_for(self, wait):
+        """Espera em fatias; False se a mesa parar antes."""
+        while self.running:
+            if wait(MEMBERSHIP_POLL): return True
+        return False
+
+    def _request_change(self, ph, change):
+        """Entrega a mudança ao filósofo e espera ele aplicá-la; False se a mesa parar."""
+        ph.change_done.clear()
+        ph.change = change
+        ph.wakeup.set()
+        # Com fome, ele desiste da tentativa atual em vez de esperar comer
+        # com os garfos antigos (só onde largar os recursos desfaz tudo)
+        if self.strategy.rollback_safe: ph.abort_requested = True
+        return self._wait_for(ph.change_done.wait)
+
+    def _rewire(self, p_id, left_fork_id, right_fork_id):
+        """Troca os garfos de um filósofo quando ele não segura nenhum."""
+        fork_ids = self.strategy.order_forks(left_fork_id, right_fork_id)
+        if not self._request_change(self.philosophers[p_id], (tuple(self.forks[f] for f in fork_ids), fork_ids)):
+            return False
+        with self._membership_lock: self.seats[p_id] = (left_fork_id, right_fork_id)
+        return True
+
+    def _add_seat(self, after):
+        # Sem 'after', ou se ele saiu antes de a entrada ser feita: no último lugar
+        i = self.seating.index(after) if after in self.seats else len(self.seating) - 1
+        neighbor = self.seating[(i + 1) % len(self.seating)]
+        # O garfo entre 'after' e o vizinho fica com o novo filósofo; o
+        # vizinho recebe um garfo novo do lado esquerdo
+        shared, neighbor_right = self.seats[self.seating[i]][1], self.seats[neighbor][1]
+        fork_id = self.metrics.add_fork()
+        self.forks.append(self.lock_profiler.lock(f"garfo {fork_id}"))
+        p_id = self.metrics.add_philosopher()
+        if self.workload: self.workload.add_philosopher()
+        ph = self._new_philosopher(p_id, shared, fork_id)
+        self.philosophers.append(ph)
+        if not self._rewire(neighbor, fork_id, neighbor_right): return None
+        with self._membership_lock:
+            self.seats[p_id] = (shared, fork_id)
+            self.seating.insert(i + 1, p_id)
+        self.metrics.set_seating(self.seating)
+        self.strategy.on_join()
+        ph.start()
+        return p_id
+
+    def _remove_seat(self, p_id):
+        i = self.seating.index(p_id)
+        neighbor = self.seating[(i + 1) % len(self.seating)]
+        left, right = self.seats[p_id]
+        ph = self.philosophers[p_id]
+        # O filósofo sai quando não segura nada; só então a estratégia e o
+        # vizinho se ajustam
+        if not self._request_change(ph, LEAVE): return None
+        ph.join()
+        if self.recovery: self.recovery.unregister(p_id)
+        self.strategy.on_leave(lambda: self.running)
+        # O vizinho da direita fecha o anel com o garfo esquerdo de quem saiu
+        if not self._rewire(neighbor, left, self.seats[neighbor][1]): return None
+        self.forks[right] = None
+        with self._membership_lock:
+            del self.seats[p_id]
+            self.seating.remove(p_id)
+            self._leaving.discard(p_id)
+        self.metrics.remove_philosopher(p_id)
+        self.metrics.set_seating(self.seating)
+        return p_id
+
+    def pause(self):
+        self.pause_event.clear()
+
+    def resume(self):
+        self.pause_event.set()
+
+    @property
+    def paused(self):
+        return not self.pause_event.is_set()
+
+    def stop(self, timeout=0.1):
+        """
+        Para as threads sem soltar locks de fora: quem espera um garfo
+        percebe a parada em até POLL_INTERVAL e larga os próprios garfos.
+        Fecha o registro e grava o perfil dos locks, se ligados.
+        """
+        self.running = False
+        for p in self.philosophers: p.running = False; p.wakeup.set()
+        self.strategy.stop_threads()
+        self.pause_event.set()
+        # Quem a mesa criou e ainda não pôs para rodar não tem o que esperar
+        for p in self.philosophers:
+            if p.ident is not None: p.join(timeout=timeout)
+        if self._membership: self._membership.join(timeout=timeout)
+        if self.event_log: self.event_log.close(); self.event_log = None
+        if self.lock_profiler.enabled and self.profile_paths is None:
+            self.profile_paths = self.lock_profiler.save(self.profile_prefix)
+        self.updates.clear()
+
+    def run(self, duration):
+        """Roda a mesa por 'duration' segundos e devolve o resumo das métricas."""
+        self.start()
+        try:
+            time.sleep(duration)
+        finally:
+            self.stop()
+        return self.metrics.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesas do Jantar dos Filósofos com threads, sem interface.")
+    parser.add_argument("sim_type", choices=STRATEGIES)
+    parser.add_argument("--filosofos", type=int, default=5, help="número de filósofos em cada mesa")
+    parser.add_argument("--mesas", type=int, default=1, help="mesas independentes rodando ao mesmo tempo")
+    parser.add_argument("--duracao", type=float, default=10.0, help="tempo real, em segundos")
+    parser.add_argument("--escala", type=float, default=1.0, help="fator aplicado aos tempos de pensar e comer")
+    parser.add_argument("--semente", type=int, default=None, help="semente do gerador aleatório")
+    parser.add_argument("--carga", choices=PROFILES, default="uniforme", help="perfil dos tempos de pensar e comer")
+    parser.add_argument("--recuperacao", choices=VICTIM_POLICIES, default=None,
+                        help="desfaz cada deadlock escolhendo uma vítima por esta política")
+    parser.add_argument("--perfil-locks", default=None, metavar="PREFIXO",
+                        help="grava o perfil dos locks de cada mesa em PREFIXO_<mesa>.txt/.folded")
+    parser.add_argument("--rotatividade", type=float, default=None, metavar="SEGUNDOS",
+                        help="a cada SEGUNDOS, um filósofo entra ou sai de cada mesa (estratégias dinâmicas)")
+    parser.add_argument("--topologia", choices=TOPOLOGIES, default="anel", help="quais recursos cada filósofo precisa")
+    parser.add_argument("--colunas", type=int, default=None, help="colunas da grade e do toro")
+    parser.add_argument("--grau", type=int, default=None, help="recursos por refeição (aleatoria, conjunto)")
+    parser.add_argument("--recursos", type=int, default=None, help="tamanho do conjunto de recursos")
+    args = parser.parse_args()
+    if args.rotatividade and not STRATEGIES[args.sim_type].dynamic:
+        parser.error(f"a estratégia {args.sim_type} não aceita filósofos entrando e saindo com a mesa rodando")
+    if args.rotatividade and args.topologia != "anel":
+        parser.error("só a mesa em anel aceita filósofos entrando e saindo")
+    try:
+        topology = get_topology(args.topologia)(args.filosofos, **topology_options(args))
+        get_strategy(args.sim_type)(args.filosofos, topology=topology)
+    except ValueError as e:
+        parser.error(str(e))
+    if not topology.ring:
+        print(topology.describe())
+
+    tables = []
+    for k in range(args.mesas):
+        seed = None if args.semente is None else args.semente + k
+        workload = get_profile(args.carga)(args.filosofos, seed=seed, scale=args.escala)
+        prefix = f"{args.perfil_locks}_{k}" if args.perfil_locks else None
+        tables.append(Table(args.sim_type, args.filosofos, workload=workload, recovery=args.recuperacao,
+                            profile_prefix=prefix, updates=DiscardUpdates(), topology=topology))
+    for table in tables:
+        table.start()
+    try:
+        if args.rotatividade:
+            churn = random.Random(args.semente)
+            end = time.monotonic() + args.duracao
+            while time.monotonic() + args.rotatividade < end:
+                time.sleep(args.rotatividade)
+                for table in tables:
+                    # Sai um aleatório ou entra um ao lado de um aleatório, sem
+                    # deixar a mesa encolher abaixo de dois lugares
+                    try:
+                        if churn.random() < 0.5: table.join(churn.choice(table.seating))
+                        else: table.leave(churn.choice(table.seating))
+                    except ValueError: pass
+            time.sleep(max(0.0, end - time.monotonic()))
+        else:
+            time.sleep(args.duracao)
+    finally:
+        for table in tables:
+            table.stop()
+    for k, table in enumerate(tables):
+        summary = table.metrics.summary()
+        print(f"Mesa {k}: {sum(table.metrics.meals)} refeições | {format_summary(summary)}")
+        if summary['deadlocks']:
+            print(f"  Deadlocks: {summary['deadlocks']} | Recuperações: {summary['recoveries']}")
+        if summary['membership_changes']:
+            latency, wait = summary['membership_latency'], summary['wait_during_changes']
+            print(f"  Mudanças na mesa: {summary['membership_changes']} ({len(table.seating)} lugares no fim) | "
+                  f"Duração p50/p99/máx: {latency['p50'] * 1000:.1f}/{latency['p99'] * 1000:.1f}/{latency['max'] * 1000:.1f}ms | "
+                  f"Espera durante as mudanças p50/p99: {wait['p50']:.3f}/{wait['p99']:.3f}s")
+        if table.profile_paths:
+            print(f"  Perfil dos locks em {' e '.join(table.profile_paths)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,531 @@
+"""
+Coleta de métricas de vazão e latência do Jantar dos Filósofos.
+
+O MetricsCollector recebe as transições de estado, a aquisição e a liberação
+de garfos e as chamadas ao garçom, e mantém:
+  - refeições por segundo;
+  - latência de espera (de "com fome" até "comendo") em histogramas no
+    estilo HDR, com percentis p50/p95/p99;
+  - tempo em que cada garfo fica em uso, com contadores por garfo de
+    aquisições, tempo ocupado e disputas (pedido com o garfo ocupado);
+  - profundidade da fila do garçom;
+  - justiça entre os filósofos (índice de Jain);
+  - inanição: há quanto tempo cada filósofo está com fome e quantas vezes
+    os vizinhos comeram nesse intervalo, com alarmes configuráveis;
+  - deadlocks informados pelo detector de grafo de espera e, no modo de
+    recuperação, as vítimas desfeitas e o tempo de garfo perdido com elas;
+  - entradas e saídas de filósofos com a mesa rodando: quanto cada mudança
+    levou e as esperas que terminaram enquanto alguma estava em andamento.
+
+Cada filósofo escreve só nos seus próprios contadores, então o caminho
+quente não precisa de locks: são algumas atribuições e um incremento de
+dicionário por evento. Os agregados só são calculados em summary().
+"""
+import threading
+import time
+
+# Histograma com 16 sub-faixas por potência de dois (erro relativo ~6%),
+# registrando valores inteiros em microssegundos
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_HALF = 1 << (SUB_BUCKET_BITS - 1)
+UNIT = 1e6
+
+MAX_DEADLOCK_REPORTS = 100
+
+
+def _bucket_index(v):
+    if v < 2 * SUB_BUCKET_HALF:
+        return v
+    shift = v.bit_length() - SUB_BUCKET_BITS
+    return shift * SUB_BUCKET_HALF + (v >> shift)
+
+
+def _bucket_high(index):
+    """Maior valor que cai na faixa 'index'."""
+    if index < 2 * SUB_BUCKET_HALF:
+        return index
+    shift = index // SUB_BUCKET_HALF - 1
+    top = index - shift * SUB_BUCKET_HALF
+    return ((top + 1) << shift) - 1
+
+
+class Histogram:
+    """Histograma esparso de faixas logarítmicas, para durações em segundos."""
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        i = _bucket_index(int(seconds * UNIT))
+        self.counts[i] = self.counts.get(i, 0) + 1
+        self.total += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def copy(self):
+        h = Histogram()
+        h.merge(self)
+        return h
+
+    def since(self, older):
+        """
+        Amostras registradas depois da cópia 'older' (janela deslizante). O
+        máximo da janela não é conhecido; fica o máximo geral como limite.
+        """
+        h = Histogram()
+        for i, c in self.counts.items():
+            c -= older.counts.get(i, 0)
+            if c:
+                h.counts[i] = c
+        h.total = self.total - older.total
+        h.sum = self.sum - older.sum
+        h.max = self.max if h.total else 0.0
+        return h
+
+    def merge(self, other):
+        for i, c in other.counts.items():
+            self.counts[i] = self.counts.get(i, 0) + c
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0.0
+
+    def percentile(self, q):
+        """Valor (em segundos) abaixo do qual estão q% das amostras."""
+        if not self.total:
+            return 0.0
+        rank = max(1, round(q / 100 * self.total))
+        seen = 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen >= rank:
+                return min(_bucket_high(i) / UNIT, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.total,
+            'mean': self.mean(),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+
+def jain_index(values):
+    """Índice de justiça de Jain: 1.0 quando todos recebem o mesmo."""
+    values = list(values)
+    total = sum(values)
+    squares = sum(v * v for v in values)
+    if not squares:
+        return 1.0
+    return total * total / (len(values) * squares)
+
+
+class MetricsCollector:
+    """
+    Recebe os eventos de uma mesa. Todos os métodos aceitam 'now' para que o
+    simulador por eventos passe o relógio virtual; nas threads e corrotinas
+    o relógio padrão é time.perf_counter.
+
+    Alarme de inanição: on_starvation(p_id, idade, ultrapassagens) é chamado
+    uma vez por espera quando o filósofo passa de starvation_age segundos
+    com fome ou vê os vizinhos comerem starvation_overtakes vezes enquanto
+    espera (qualquer um dos dois; None desliga o critério).
+    """
+    # Ficam de fora dos checkpoints (salvamento.py); quem carrega cria outros
+    _LOCKS = ('_waiter_lock', '_recovery_lock', '_alarm_lock', '_membership_lock', '_totals_lock')
+
+    def __init__(self, num_philosophers, clock=time.perf_counter, starvation_age=None,
+                 starvation_overtakes=None, on_starvation=None, num_forks=None):
+        n = num_philosophers
+        # No anel há um garfo por lugar; em outras topologias (topologias.py), não
+        forks = n if num_forks is None else num_forks
+        self.num_philosophers = n
+        self.clock = clock
+        self.start_time = None
+        self.last_time = None
+
+        self.meals = [0] * n
+        self.eating = bytearray(n)
+        self.hungry_since = [None] * n
+        self.fork_since = [{} for _ in range(n)]
+        self.wait_histograms = [Histogram() for _ in range(n)]
+        self.hold_histograms = [Histogram() for _ in range(n)]
+        # Contadores por garfo. Aquisições e tempo ocupado só são escritos
+        # por quem está com o garfo, e as disputas por quem o encontrou
+        # ocupado, então também dispensam lock
+        self.fork_acquisitions = [0] * forks
+        self.fork_busy_time = [0.0] * forks
+        self.fork_contended = [0] * forks
+
+        # Totais da mesa, mantidos a cada evento para que o painel ao vivo
+        # (painel_metricas.py) só leia números, sem percorrer filósofos,
+        # histogramas e garfos. São escritos por todos os filósofos, então
+        # têm um lock próprio, tomado só pelo tempo de somar (abertos no
+        # fim, depois de todos os contadores)
+        self._totals_lock = threading.Lock()
+
+        self.waiter_depth = 0
+        self.waiter_depth_max = 0
+        self.waiter_calls = 0
+        self._waiter_lock = threading.Lock()
+
+        # Relatórios do detector_deadlock.WaitForGraph. Com recuperação podem
+        # ser muitos; só os primeiros MAX_DEADLOCK_REPORTS são guardados
+        self.deadlocks = []
+        self.deadlock_count = 0
+        # Recuperação (recuperacao_deadlock.py): vítimas desfeitas e segundos
+        # de garfo devolvidos sem refeição
+        self.recoveries = 0
+        self.recovery_lost_time = 0.0
+        self._recovery_lock = threading.Lock()
+
+        # Inanição. As refeições dos vizinhos no início da espera ficam
+        # guardadas; as ultrapassagens são a diferença, então cada filósofo
+        # só lê os contadores dos outros e o caminho quente continua sem locks
+        self.starvation_age = starvation_age
+        self.starvation_overtakes = starvation_overtakes
+        self.on_starvation = on_starvation
+        self.neighbor_meals_at_hunger = [0] * n
+        self.alarmed = bytearray(n)
+        self.overtakes_max = 0
+        self.starvation_alarms = []
+        self._alarm_lock = threading.Lock()
+
+        # Vizinhos de cada filósofo (None: o anel fixo de 0 a N-1), dados
+        # pela ordem dos lugares de uma mesa que muda em execução
+        # (mesa.Table) ou pelos conflitos de uma topologia. Na mesa que
+        # muda: quem já saiu, duração de cada mudança e as esperas
+        # encerradas durante uma delas
+        self.neighbors = None
+        self.departed = set()
+        self.changes_in_progress = 0
+        self.membership_changes = 0
+        self.membership_latency = Histogram()
+        self.wait_during_changes = Histogram()
+        self._membership_lock = threading.Lock()
+        self._reset_totals()
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if k not in self._LOCKS}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for name in self._LOCKS:
+            setattr(self, name, threading.Lock())
+        if 'wait_total' not in state:
+            # Checkpoint de antes dos totais: refeitos a partir dos contadores
+            self._reset_totals()
+
+    def _reset_totals(self):
+        """Recalcula os totais a partir dos contadores por filósofo e por garfo."""
+        self.total_meals = sum(self.meals)
+        self.wait_total = Histogram()
+        for h in self.wait_histograms:
+            self.wait_total.merge(h)
+        self.forks_held = sum(len(held) for held in self.fork_since)
+        # Tempo ocupado dos garfos já largados, e a soma dos instantes em que
+        # os garfos em uso foram pegos: o tempo ocupado até 'now' é
+        # busy_time_total + forks_held * now - held_since_sum
+        self.busy_time_total = sum(self.fork_busy_time)
+        self.held_since_sum = sum(since for held in self.fork_since for since in held.values())
+        self.acquisitions_total = sum(self.fork_acquisitions)
+        self.contended_total = sum(self.fork_contended)
+        # Soma e soma dos quadrados das refeições de quem está na mesa (Jain)
+        seated = [m for p, m in enumerate(self.meals) if p not in self.departed]
+        self.seated_meals = sum(seated)
+        self.seated_meals_squares = sum(m * m for m in seated)
+
+    def _now(self, now):
+        if now is None:
+            now = self.clock()
+        if self.start_time is None:
+            self.start_time = now
+        self.last_time = now
+        return now
+
+    def on_status(self, p_id, status, now=None):
+        now = self._now(now)
+        if status == "com fome":
+            self.hungry_since[p_id] = now
+            self.neighbor_meals_at_hunger[p_id] = self._neighbor_meals(p_id)
+            self.alarmed[p_id] = 0
+        elif status == "comendo":
+            self.eating[p_id] = 1
+            since = self.hungry_since[p_id]
+            if since is not None:
+                self.wait_histograms[p_id].record(now - since)
+                with self._totals_lock:
+                    self.wait_total.record(now - since)
+                if self.changes_in_progress:
+                    # Caminho raro, e o histograma é compartilhado
+                    with self._membership_lock:
+                        self.wait_during_changes.record(now - since)
+                self.hungry_since[p_id] = None
+                overtakes = self.overtakes(p_id)
+                if overtakes > self.overtakes_max:
+                    self.overtakes_max = overtakes
+        elif status == "pensando" and self.eating[p_id]:
+            # Uma refeição conta quando o filósofo volta a pensar
+            self.eating[p_id] = 0
+            meals = self.meals[p_id]
+            self.meals[p_id] = meals + 1
+            with self._totals_lock:
+                self.total_meals += 1
+                if p_id not in self.departed:
+                    self.seated_meals += 1
+                    self.seated_meals_squares += 2 * meals + 1
+            # Quem espera ao lado acabou de ser ultrapassado mais uma vez
+            if self.starvation_age is not None or self.starvation_overtakes is not None:
+                for q in self._neighbors(p_id):
+                    if self.hungry_since[q] is not None:
+                        self._check_starvation(q, now)
+
+    # ---- Inanição ----
+
+    def _neighbors(self, p_id):
+        if self.neighbors is not None:
+            return self.neighbors.get(p_id, ())
+        n = self.num_philosophers
+        return ((p_id - 1) % n, (p_id + 1) % n)
+
+    def set_neighbors(self, conflicts):
+        """Vizinhos de uma topologia qualquer: quem divide algum recurso com cada filósofo."""
+        self.neighbors = dict(enumerate(conflicts))
+
+    def _neighbor_meals(self, p_id):
+        return sum(self.meals[q] for q in self._neighbors(p_id))
+
+    def hunger_age(self, p_id, now=None):
+        """Há quanto tempo o filósofo está com fome (0 se não está)."""
+        since = self.hungry_since[p_id]
+        if since is None:
+            return 0.0
+        return (self.now() if now is None else now) - since
+
+    def overtakes(self, p_id):
+        """Refeições dos vizinhos desde que o filósofo ficou com fome."""
+        return self._neighbor_meals(p_id) - self.neighbor_meals_at_hunger[p_id]
+
+    def _check_starvation(self, p_id, now):
+        if self.alarmed[p_id]:
+            return
+        age = self.hunger_age(p_id, now)
+        overtakes = self.overtakes(p_id)
+        if (self.starvation_age is not None and age >= self.starvation_age) or \
+                (self.starvation_overtakes is not None and overtakes >= self.starvation_overtakes):
+            # Caminho raro: o lock só evita que dois vizinhos alarmem juntos
+            with self._alarm_lock:
+                if self.alarmed[p_id]:
+                    return
+                self.alarmed[p_id] = 1
+                self.starvation_alarms.append((now, p_id, age, overtakes))
+            if self.on_starvation:
+                self.on_starvation(p_id, age, overtakes)
+
+    def check_starvation(self, now=None):
+        """
+        Confere todos os filósofos com fome. Pega também quem espera sem
+        que os vizinhos comam (num deadlock, por exemplo); a GUI chama
+        periodicamente.
+        """
+        now = self.now() if now is None else now
+        for p_id in range(self.num_philosophers):
+            if self.hungry_since[p_id] is not None:
+                self._check_starvation(p_id, now)
+
+    def on_fork_acquired(self, p_id, fork_id, now=None):
+        now = self._now(now)
+        self.fork_since[p_id][fork_id] = now
+        self.fork_acquisitions[fork_id] += 1
+        with self._totals_lock:
+            self.forks_held += 1
+            self.held_since_sum += now
+            self.acquisitions_total += 1
+
+    def on_fork_released(self, p_id, fork_id, now=None):
+        now = self._now(now)
+        since = self.fork_since[p_id].pop(fork_id, None)
+        if since is not None:
+            self.hold_histograms[p_id].record(now - since)
+            self.fork_busy_time[fork_id] += now - since
+            with self._totals_lock:
+                self.forks_held -= 1
+                self.held_since_sum -= since
+                self.busy_time_total += now - since
+
+    def on_fork_contended(self, p_id, fork_id, now=None):
+        """O filósofo pediu o garfo e o encontrou ocupado."""
+        self._now(now)
+        self.fork_contended[fork_id] += 1
+        with self._totals_lock:
+            self.contended_total += 1
+
+    def now(self):
+        """Instante atual: o relógio, ou o último evento com relógio virtual."""
+        if self.clock:
+            return self.clock()
+        return self.last_time or 0.0
+
+    def fork_busy(self, now=None):
+        """Tempo ocupado de cada garfo, incluindo quem está com ele agora."""
+        now = self.now() if now is None else now
+        busy = list(self.fork_busy_time)
+        for held in self.fork_since:
+            # Cópia: o dono pode largar o garfo durante a leitura
+            for fork_id, since in list(held.items()):
+                # Um garfo aberto depois da cópia ainda não tem tempo ocupado
+                if fork_id < len(busy):
+                    busy[fork_id] += now - since
+        return busy
+
+    def forks_in_use(self):
+        return self.forks_held
+
+    def totals(self, now=None):
+        """
+        Instantâneo dos totais sem percorrer a mesa: (refeições, cópia do
+        histograma de espera, tempo ocupado dos garfos, disputas).
+        """
+        now = self.now() if now is None else now
+        with self._totals_lock:
+            busy = self.busy_time_total + self.forks_held * now - self.held_since_sum
+            return self.total_meals, self.wait_total.copy(), busy, self.contended_total
+
+    def fairness(self):
+        """Índice de Jain das refeições de quem está na mesa, pelos totais."""
+        with self._totals_lock:
+            total, squares = self.seated_meals, self.seated_meals_squares
+        if not squares:
+            return 1.0
+        return total * total / (self.seated() * squares)
+
+    # ---- Mesa que muda em execução ----
+
+    def add_philosopher(self):
+        """Abre os contadores de um filósofo novo e devolve o seu índice."""
+        p_id = self.num_philosophers
+        self.meals.append(0)
+        self.eating.append(0)
+        self.hungry_since.append(None)
+        self.fork_since.append({})
+        self.wait_histograms.append(Histogram())
+        self.hold_histograms.append(Histogram())
+        self.neighbor_meals_at_hunger.append(0)
+        self.alarmed.append(0)
+        self.num_philosophers += 1
+        return p_id
+
+    def add_fork(self):
+        """Abre os contadores de um garfo novo e devolve o seu índice."""
+        fork_id = len(self.fork_busy_time)
+        # fork_busy_time por último: quem lê o tamanho dela encontra as outras prontas
+        self.fork_acquisitions.append(0)
+        self.fork_contended.append(0)
+        self.fork_busy_time.append(0.0)
+        return fork_id
+
+    def remove_philosopher(self, p_id):
+        """O filósofo saiu: os contadores ficam, mas ele deixa de contar na justiça."""
+        with self._totals_lock:
+            if p_id not in self.departed:
+                meals = self.meals[p_id]
+                self.seated_meals -= meals
+                self.seated_meals_squares -= meals * meals
+            self.departed.add(p_id)
+        self.hungry_since[p_id] = None
+
+    def seated(self):
+        """Filósofos que ainda estão na mesa."""
+        return self.num_philosophers - len(self.departed)
+
+    def set_seating(self, seating):
+        """Ordem dos filósofos ao redor da mesa, para saber quem é vizinho de quem."""
+        k = len(seating)
+        self.neighbors = {p: (seating[i - 1], seating[(i + 1) % k]) for i, p in enumerate(seating)}
+
+    def on_membership_change(self, latency, now=None):
+        self._now(now)
+        with self._membership_lock:
+            self.membership_changes += 1
+            self.membership_latency.record(latency)
+
+    def on_waiter_enter(self, p_id, now=None):
+        self._now(now)
+        with self._waiter_lock:
+            self.waiter_depth += 1
+            self.waiter_calls += 1
+            if self.waiter_depth > self.waiter_depth_max:
+                self.waiter_depth_max = self.waiter_depth
+
+    def on_waiter_leave(self, p_id, now=None):
+        self._now(now)
+        with self._waiter_lock:
+            self.waiter_depth -= 1
+
+    def on_deadlock(self, report):
+        self.deadlock_count += 1
+        if len(self.deadlocks) < MAX_DEADLOCK_REPORTS:
+            self.deadlocks.append(report)
+
+    def on_recovery(self, p_id, lost, now=None):
+        self._now(now)
+        with self._recovery_lock:
+            self.recoveries += 1
+            self.recovery_lost_time += lost
+
+    def elapsed(self):
+        if self.start_time is None:
+            return 0.0
+        return self.last_time - self.start_time
+
+    def wait_histogram(self):
+        """Histograma de espera somado de todos os filósofos."""
+        with self._totals_lock:
+            return self.wait_total.copy()
+
+    def hold_histogram(self):
+        h = Histogram()
+        for ph in self.hold_histograms:
+            h.merge(ph)
+        return h
+
+    def summary(self):
+        elapsed = self.elapsed()
+        total_meals = self.total_meals
+        return {
+            'total_meals': total_meals,
+            'elapsed': elapsed,
+            'meals_per_second': total_meals / elapsed if elapsed else 0.0,
+            'wait': self.wait_histogram().summary(),
+            'fork_hold': self.hold_histogram().summary(),
+            'waiter_calls': self.waiter_calls,
+            'waiter_depth_max': self.waiter_depth_max,
+            'fairness': self.fairness(),
+            'deadlocks': self.deadlock_count,
+            'first_deadlock_time': self.deadlocks[0].time if self.deadlocks else None,
+            'recoveries': self.recoveries,
+            'recovery_lost_time': self.recovery_lost_time,
+            'overtakes_max': self.overtakes_max,
+            'starvation_alarms': len(self.starvation_alarms),
+            'membership_changes': self.membership_changes,
+            'membership_latency': self.membership_latency.summary(),
+            'wait_during_changes': self.wait_during_changes.summary(),
+        }
+
+
+def format_summary(s):
+    """Texto curto com os números principais de summary()."""
+    w = s['wait']
+    return (
+        f"Refeições/s: {s['meals_per_second']:.3f} | "
+        f"Espera p50/p95/p99: {w['p50']:.3f}/{w['p95']:.3f}/{w['p99']:.3f}s | "
+        f"Justiça (Jain): {s['fairness']:.3f}"
+    )
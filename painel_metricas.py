@@ -0,0 +1,207 @@
+"""
+Painel de desempenho ao vivo e exportação para o Prometheus.
+
+RollingWindow guarda instantâneos dos contadores do MetricsCollector e
+calcula, nos últimos 'window' segundos, refeições por segundo, uso de cada
+garfo, disputas por garfo e percentis de espera. Os totais (refeições,
+histograma de espera, tempo ocupado dos garfos, disputas) são mantidos
+pelo MetricsCollector a cada evento; aqui só se fazem diferenças entre dois
+instantâneos, sem percorrer os filósofos nem os garfos. Os números de cada
+garfo só entram em mesas de até PER_FORK_LIMIT garfos.
+
+MetricsServer publica os mesmos números em http://host:porta/metrics no
+formato de texto do Prometheus, em uma thread de fundo:
+
+    python3 simulacao_asyncio.py solucao_garcom --filosofos 1000 --duracao 3600 --metricas 9100
+    python3 aplicacao_jantar.py --metricas 9100
+    curl http://127.0.0.1:9100/metrics
+"""
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from metricas import Histogram
+
+# Janela das taxas e percentis ao vivo, em segundos
+WINDOW = 10.0
+QUANTILES = (0.5, 0.95, 0.99)
+# Acima deste número de garfos, o painel e a exportação trazem só os
+# totais, sem números por garfo
+PER_FORK_LIMIT = 256
+
+
+class RollingWindow:
+    """
+    Taxas dos últimos 'window' segundos de uma mesa. update() pode ser
+    chamado pela GUI e pelo servidor ao mesmo tempo.
+    """
+    def __init__(self, metrics, sim_type=None, window=WINDOW):
+        self.metrics = metrics
+        self.sim_type = sim_type
+        self.window = window
+        self._snapshots = deque()
+        self._lock = threading.Lock()
+        self.last = None
+
+    def _snapshot(self, now):
+        m = self.metrics
+        meals, wait, busy, contended = m.totals(now)
+        per_fork = None
+        if len(m.fork_busy_time) <= PER_FORK_LIMIT:
+            per_fork = (m.fork_busy(now), list(m.fork_contended))
+        return now, meals, wait, busy, contended, per_fork
+
+    def update(self, now=None):
+        """Tira um instantâneo e devolve os números da janela."""
+        now = self.metrics.now() if now is None else now
+        with self._lock:
+            current = self._snapshot(now)
+            snapshots = self._snapshots
+            snapshots.append(current)
+            # Fica o instantâneo mais recente que ainda cobre a janela inteira
+            while len(snapshots) > 2 and snapshots[1][0] <= now - self.window:
+                snapshots.popleft()
+            self.last = self._stats(snapshots[0], current)
+            return self.last
+
+    def _stats(self, old, new):
+        t0, meals0, wait0, busy0, contended0, per_fork0 = old
+        t1, meals1, wait1, busy1, contended1, per_fork1 = new
+        span = t1 - t0
+        forks = len(self.metrics.fork_busy_time)
+        if span <= 0:
+            # Primeiro instantâneo: sem janela ainda
+            zeros = [0.0] * forks if per_fork1 else []
+            return {'span': 0.0, 'meals_per_second': 0.0, 'wait': Histogram().summary(),
+                    'fork_utilization': zeros, 'fork_contention': zeros, 'contention': 0.0,
+                    'utilization': 0.0, 'forks_in_use': self.metrics.forks_in_use()}
+        fork_utilization, fork_contention = [], []
+        if per_fork0 and per_fork1:
+            (fork_busy0, fork_contended0), (fork_busy1, fork_contended1) = per_fork0, per_fork1
+            fork_utilization = [min(1.0, (b1 - b0) / span) for b0, b1 in zip(fork_busy0, fork_busy1)]
+            fork_contention = [(c1 - c0) / span for c0, c1 in zip(fork_contended0, fork_contended1)]
+        return {
+            'span': span,
+            'meals_per_second': (meals1 - meals0) / span,
+            'wait': wait1.since(wait0).summary(),
+            'fork_utilization': fork_utilization,
+            'fork_contention': fork_contention,
+            'contention': (contended1 - contended0) / span,
+            'utilization': min(1.0, (busy1 - busy0) / (span * forks)) if forks else 0.0,
+            'forks_in_use': self.metrics.forks_in_use(),
+        }
+
+
+def format_dashboard(stats):
+    """Texto curto do painel da GUI."""
+    w = stats['wait']
+    return (
+        f"Refeições/s ({stats['span']:.0f}s): {stats['meals_per_second']:.2f}\n"
+        f"Uso dos garfos: {stats['utilization']:.0%} ({stats['forks_in_use']} em uso)\n"
+        f"Espera p50/p95/p99:\n{w['p50']:.2f}/{w['p95']:.2f}/{w['p99']:.2f}s"
+    )
+
+
+def _series(lines, name, kind, help_text, samples):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        label_text = "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}" if labels else ""
+        lines.append(f"{name}{label_text} {value}")
+
+
+def format_prometheus(window):
+    """Métricas da mesa no formato de texto do Prometheus (versão 0.0.4)."""
+    stats = window.update()
+    m = window.metrics
+    now = m.now()
+    lines = []
+    if window.sim_type:
+        _series(lines, "jantar_info", "gauge", "Estratégia em execução.", [((("estrategia", window.sim_type),), 1)])
+    _series(lines, "jantar_philosophers", "gauge", "Filósofos na mesa.", [((), m.seated())])
+    _series(lines, "jantar_meals_total", "counter", "Refeições completadas.", [((), m.total_meals)])
+    _series(lines, "jantar_meals_per_second", "gauge", f"Refeições por segundo na janela de {window.window:.0f}s.",
+            [((), stats['meals_per_second'])])
+
+    wait = m.wait_histogram()
+    samples = [((("quantile", q),), wait.percentile(q * 100)) for q in QUANTILES]
+    _series(lines, "jantar_wait_seconds", "summary", "Espera de com fome até comendo.", samples)
+    lines.append(f"jantar_wait_seconds_sum {wait.sum}")
+    lines.append(f"jantar_wait_seconds_count {wait.total}")
+    samples = [((("quantile", q),), stats['wait'][f"p{round(q * 100)}"]) for q in QUANTILES]
+    _series(lines, "jantar_wait_window_seconds", "gauge",
+            f"Percentis da espera na janela de {window.window:.0f}s.", samples)
+
+    _series(lines, "jantar_forks_in_use", "gauge", "Garfos em uso agora.", [((), stats['forks_in_use'])])
+    _series(lines, "jantar_fork_utilization", "gauge", "Fração do tempo com o garfo em uso, na janela.",
+            [((), stats['utilization'])])
+    if len(m.fork_busy_time) <= PER_FORK_LIMIT:
+        busy = m.fork_busy(now)
+        forks = range(len(busy))
+        _series(lines, "jantar_fork_acquisitions_total", "counter", "Aquisições de cada garfo.",
+                [((("garfo", f),), m.fork_acquisitions[f]) for f in forks])
+        _series(lines, "jantar_fork_contended_total", "counter", "Pedidos que encontraram o garfo ocupado.",
+                [((("garfo", f),), m.fork_contended[f]) for f in forks])
+        _series(lines, "jantar_fork_busy_seconds_total", "counter", "Tempo com o garfo em uso.",
+                [((("garfo", f),), busy[f]) for f in forks])
+    else:
+        _series(lines, "jantar_fork_acquisitions_total", "counter", "Aquisições de garfos.",
+                [((), m.acquisitions_total)])
+        _series(lines, "jantar_fork_contended_total", "counter", "Pedidos que encontraram o garfo ocupado.",
+                [((), m.contended_total)])
+        _series(lines, "jantar_fork_busy_seconds_total", "counter", "Tempo com garfos em uso.",
+                [((), m.totals(now)[2])])
+
+    _series(lines, "jantar_waiter_calls_total", "counter", "Chamadas ao garçom.", [((), m.waiter_calls)])
+    _series(lines, "jantar_waiter_queue_depth", "gauge", "Filósofos esperando o garçom.", [((), m.waiter_depth)])
+    _series(lines, "jantar_fairness", "gauge", "Índice de Jain das refeições.",
+            [((), m.fairness())])
+    _series(lines, "jantar_overtakes_max", "gauge", "Maior número de ultrapassagens em uma espera.",
+            [((), m.overtakes_max)])
+    _series(lines, "jantar_starvation_alarms_total", "counter", "Alarmes de inanição.",
+            [((), len(m.starvation_alarms))])
+    _series(lines, "jantar_deadlocks_total", "counter", "Deadlocks detectados.", [((), m.deadlock_count)])
+    if m.membership_changes:
+        latency = m.membership_latency
+        _series(lines, "jantar_membership_change_seconds", "summary", "Duração das entradas e saídas de filósofos.",
+                [((("quantile", q),), latency.percentile(q * 100)) for q in QUANTILES])
+        lines.append(f"jantar_membership_change_seconds_sum {latency.sum}")
+        lines.append(f"jantar_membership_change_seconds_count {latency.total}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Servidor HTTP local com GET /metrics. 'source' é uma função que devolve
+    a RollingWindow da mesa atual (ou None), para que a GUI possa trocar de
+    simulação sem reiniciar o servidor.
+    """
+    def __init__(self, source, port=9100, host="127.0.0.1"):
+        self.source = source
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404); return
+                window = server.source()
+                body = (format_prometheus(window) if window else "").encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metricas-http", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
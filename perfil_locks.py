@@ -0,0 +1,363 @@
+"""
+Perfil de disputa dos locks da mesa.
+
+ProfiledLock envolve um threading.Lock e conta, por lock, as tentativas,
+as aquisições disputadas, a espera total e máxima, o tempo de posse e os
+últimos donos. Nas aquisições disputadas também guarda a pilha de chamadas
+de quem esperou, para gerar um flame graph no formato "collapsed" (uma
+linha 'thread;quadro;...;lock microssegundos' por pilha), aceito pelo
+flamegraph.pl e pelo speedscope. ProfiledSemaphore e ProfiledBarrier fazem
+o mesmo para o porteiro e para a barreira do deadlock_rapido.
+
+LockProfiler é a fábrica usada pela aplicação, pelos scripts e pelas
+estratégias. Desligado, ele devolve os próprios objetos do threading, sem
+nenhuma camada a mais:
+
+    profiler = LockProfiler(enabled=True)
+    forks = [profiler.lock(f"garfo {i}") for i in range(n)]
+    strategy = get_strategy("solucao_garcom")(n, locks=profiler)
+    ...
+    print(profiler.report())
+    profiler.save("perfil_locks")   # perfil_locks.txt e perfil_locks.folded
+
+    python3 aplicacao_jantar.py          (opção "Perfil dos locks" no menu)
+    python3 solution_waiter.py 5 - perfil_garcom
+"""
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+
+# Donos guardados por lock (os mais recentes)
+HISTORY = 32
+# Quadros de pilha guardados por espera, a partir de quem chamou acquire
+STACK_DEPTH = 24
+# Uma nova tentativa até este intervalo depois de uma que desistiu continua
+# a mesma espera: é o caso das esperas em fatias (acquire com timeout em
+# loop) da aplicação e da recuperação de deadlock
+RETRY_GAP = 0.01
+
+_SKIPPED_FILES = (threading.__file__, __file__)
+
+
+def _stack_key(frame):
+    """Pilha da thread atual, da raiz para a folha, sem os quadros do threading e deste módulo."""
+    names = []
+    while frame is not None and len(names) < STACK_DEPTH:
+        code = frame.f_code
+        if code.co_filename not in _SKIPPED_FILES:
+            module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            names.append(f"{module}:{code.co_name}")
+        frame = frame.f_back
+    names.append(threading.current_thread().name)
+    return ";".join(reversed(names))
+
+
+class ProfiledLock:
+    """
+    Lock com contadores. A aquisição sem disputa só marca o dono e o
+    instante; os números de posse são atualizados na liberação, ainda com o
+    lock na mão, e por isso não precisam de outra trava. Só o caminho lento
+    (quem esperou ou desistiu) usa uma trava interna.
+    """
+    kind = "lock"
+
+    def __init__(self, name, lock=None, history=HISTORY, clock=time.perf_counter):
+        self.name = name
+        self._lock = threading.Lock() if lock is None else lock
+        self._clock = clock
+        self.acquisitions = 0
+        self.contended = 0
+        self.abandoned = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.hold_total = 0.0
+        self.hold_max = 0.0
+        # (dono, instante da aquisição, tempo de posse)
+        self.owners = deque(maxlen=history)
+        # Espera acumulada (segundos) por pilha de chamadas
+        self.stacks = defaultdict(float)
+        self._owner = None
+        self._since = 0.0
+        # Threads que desistiram há pouco: id -> (início da espera, fim da última tentativa, pilha)
+        self._pending = {}
+        self._side = threading.Lock()
+
+    @property
+    def attempts(self):
+        return self.acquisitions + self.abandoned
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self._lock.acquire(False):
+            if self._pending:
+                self._slow_path(self._clock(), True, False)
+            self._acquired()
+            return True
+        start = self._clock()
+        ok = self._blocking_acquire(timeout) if blocking else False
+        self._slow_path(start, ok, True)
+        if ok:
+            self._acquired()
+        return ok
+
+    def _blocking_acquire(self, timeout):
+        return self._lock.acquire(True, timeout)
+
+    def _slow_path(self, start, ok, waited):
+        now = self._clock()
+        ident = threading.get_ident()
+        with self._side:
+            key = None
+            previous = self._pending.pop(ident, None)
+            if previous is not None:
+                first, last, key = previous
+                if start - last <= RETRY_GAP:
+                    # Continua a espera que começou na primeira fatia
+                    start, waited = first, True
+                else:
+                    self._record_wait(last - first, key)
+                    self.abandoned += 1
+                    key = None
+            if not ok:
+                self._pending[ident] = (start, now, key or _stack_key(sys._getframe()))
+            elif waited:
+                self.contended += 1
+                self._record_wait(now - start, key or _stack_key(sys._getframe()))
+
+    def _record_wait(self, wait, key):
+        self.wait_total += wait
+        if wait > self.wait_max:
+            self.wait_max = wait
+        self.stacks[key] += wait
+
+    def _acquired(self):
+        self.acquisitions += 1
+        self._owner = threading.current_thread().name
+        self._since = self._clock()
+
+    def release(self):
+        hold = self._clock() - self._since
+        self.hold_total += hold
+        if hold > self.hold_max:
+            self.hold_max = hold
+        self.owners.append((self._owner, self._since, hold))
+        self._owner = None
+        self._lock.release()
+
+    def locked(self):
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def waiting(self):
+        """Threads que desistiram há pouco e ainda podem voltar a tentar."""
+        return len(self._pending)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name!r} {'locked' if self.locked() else 'unlocked'}>"
+
+
+class ProfiledSemaphore(ProfiledLock):
+    """
+    Semáforo com os mesmos contadores. Como várias threads podem estar
+    dentro ao mesmo tempo, a posse é guardada por thread e atualizada com a
+    trava interna.
+    """
+    kind = "semáforo"
+
+    def __init__(self, name, value=1, **options):
+        super().__init__(name, lock=threading.Semaphore(value), **options)
+        self._holders = {}
+
+    def _blocking_acquire(self, timeout):
+        # Semaphore usa None, e não -1, para "sem limite"
+        return self._lock.acquire(True, None if timeout < 0 else timeout)
+
+    def _acquired(self):
+        with self._side:
+            self.acquisitions += 1
+            self._holders[threading.get_ident()] = (threading.current_thread().name, self._clock())
+
+    def release(self):
+        now = self._clock()
+        with self._side:
+            # O porteiro é liberado por quem entrou; se não, a posse fica sem registro
+            owner = self._holders.pop(threading.get_ident(), None)
+            if owner is not None:
+                hold = now - owner[1]
+                self.hold_total += hold
+                if hold > self.hold_max:
+                    self.hold_max = hold
+                self.owners.append((owner[0], owner[1], hold))
+        self._lock.release()
+
+    def locked(self):
+        return bool(self._holders)
+
+
+class ProfiledBarrier:
+    """
+    Barreira que mede quanto cada thread esperou nela. Não tem dono nem
+    posse: cada passagem conta como uma aquisição, disputada para todos
+    menos o último a chegar.
+    """
+    kind = "barreira"
+
+    def __init__(self, name, parties, clock=time.perf_counter):
+        self.name = name
+        self._barrier = threading.Barrier(parties)
+        self._clock = clock
+        self.acquisitions = 0
+        self.contended = 0
+        self.abandoned = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.hold_total = self.hold_max = 0.0
+        self.owners = ()
+        self.stacks = defaultdict(float)
+        self._side = threading.Lock()
+
+    attempts = ProfiledLock.attempts
+
+    def wait(self, timeout=None):
+        start = self._clock()
+        try:
+            index = self._barrier.wait(timeout)
+        except threading.BrokenBarrierError:
+            with self._side:
+                self.abandoned += 1
+            raise
+        wait = self._clock() - start
+        with self._side:
+            self.acquisitions += 1
+            # O último a chegar (índice parties - 1) não esperou ninguém
+            if index != self._barrier.parties - 1:
+                self.contended += 1
+            self.wait_total += wait
+            if wait > self.wait_max:
+                self.wait_max = wait
+            self.stacks[_stack_key(sys._getframe())] += wait
+        return index
+
+    def abort(self):
+        self._barrier.abort()
+
+    def reset(self):
+        self._barrier.reset()
+
+    @property
+    def parties(self):
+        return self._barrier.parties
+
+    @property
+    def n_waiting(self):
+        return self._barrier.n_waiting
+
+    @property
+    def broken(self):
+        return self._barrier.broken
+
+    def waiting(self):
+        return self._barrier.n_waiting
+
+
+class LockProfiler:
+    """
+    Fábrica e registro dos locks perfilados de uma mesa. Com enabled=False
+    devolve threading.Lock, Semaphore e Barrier comuns e não registra nada.
+    """
+    def __init__(self, enabled=True, history=HISTORY):
+        self.enabled = enabled
+        self.history = history
+        self.locks = []
+        self.started = time.perf_counter()
+
+    def lock(self, name):
+        if not self.enabled:
+            return threading.Lock()
+        lock = ProfiledLock(name, history=self.history)
+        self.locks.append(lock)
+        return lock
+
+    def semaphore(self, name, value=1):
+        if not self.enabled:
+            return threading.Semaphore(value)
+        sem = ProfiledSemaphore(name, value, history=self.history)
+        self.locks.append(sem)
+        return sem
+
+    def barrier(self, name, parties):
+        if not self.enabled:
+            return threading.Barrier(parties)
+        barrier = ProfiledBarrier(name, parties)
+        self.locks.append(barrier)
+        return barrier
+
+    def stats(self):
+        """Uma linha por lock, da maior espera total para a menor."""
+        rows = []
+        for lock in self.locks:
+            n = lock.acquisitions
+            rows.append({
+                'name': lock.name,
+                'kind': lock.kind,
+                'attempts': lock.attempts,
+                'acquisitions': n,
+                'contended': lock.contended,
+                'abandoned': lock.abandoned,
+                'contention': (lock.contended + lock.abandoned) / lock.attempts if lock.attempts else 0.0,
+                'wait_total': lock.wait_total,
+                'wait_max': lock.wait_max,
+                'hold_total': lock.hold_total,
+                'hold_mean': lock.hold_total / n if n else 0.0,
+                'hold_max': lock.hold_max,
+                'owners': list(lock.owners),
+            })
+        rows.sort(key=lambda r: r['wait_total'], reverse=True)
+        return rows
+
+    def report(self, top=None, owners=5):
+        """Relatório de disputa em texto, dos locks com mais espera para os com menos."""
+        elapsed = time.perf_counter() - self.started
+        rows = self.stats()[:top]
+        lines = [f"Perfil dos locks: {len(self.locks)} locks em {elapsed:.1f}s",
+                 f"{'lock':<20} {'tentativas':>10} {'disputadas':>10} {'desistências':>12} "
+                 f"{'espera total':>12} {'espera máx':>10} {'posse média':>11} {'posse máx':>9}"]
+        for r in rows:
+            lines.append(f"{r['name']:<20} {r['attempts']:>10} {r['contended']:>10} {r['abandoned']:>12} "
+                         f"{r['wait_total']:>11.3f}s {r['wait_max']:>9.3f}s {r['hold_mean']:>10.3f}s "
+                         f"{r['hold_max']:>8.3f}s")
+        if owners:
+            lines.append("")
+            lines.append(f"Últimos donos (até {owners} por lock):")
+            for r in rows:
+                if r['owners']:
+                    recent = ", ".join(f"{name} {hold:.3f}s" for name, _, hold in r['owners'][-owners:])
+                    lines.append(f"  {r['name']}: {recent}")
+        return "\n".join(lines)
+
+    def collapsed(self):
+        """
+        Esperas no formato "collapsed" dos flame graphs: uma linha por pilha,
+        com o lock como último quadro e a espera em microssegundos.
+        """
+        totals = defaultdict(float)
+        for lock in self.locks:
+            for key, wait in list(lock.stacks.items()):
+                totals[f"{key};{lock.kind} {lock.name}"] += wait
+        return "".join(f"{key} {round(wait * 1e6)}\n" for key, wait in sorted(totals.items()) if wait >= 1e-6)
+
+    def save(self, prefix):
+        """Grava prefix.txt (relatório) e prefix.folded (flame graph) e devolve os caminhos."""
+        paths = (f"{prefix}.txt", f"{prefix}.folded")
+        with open(paths[0], "w", encoding="utf-8") as out:
+            out.write(self.report() + "\n")
+        with open(paths[1], "w", encoding="utf-8") as out:
+            out.write(self.collapsed())
+        return paths
@@ -0,0 +1,426 @@
+"""
+Perfis de carga: de onde vêm os tempos de pensar e de comer.
+
+Cada perfil sorteia os tempos em lotes grandes (vetorizados com NumPy quando
+ele está instalado, em Python puro caso contrário) e os entrega um a um a
+partir de um buffer. O caminho quente dos filósofos faz só um list.pop(), em
+vez de uma chamada ao gerador aleatório a cada transição.
+
+Com NumPy e sem ele os sorteios vêm de geradores diferentes: a mesma
+semente reproduz a mesma execução só entre máquinas com a mesma escolha.
+Distribuições dadas por uma função não são vetorizáveis e usam sempre o
+gerador do Python.
+
+Perfis registrados. As médias são as da aplicação, 2 s pensando e 3 s
+comendo, exceto em dois: no assimetrico os fatores de cada filósofo mudam
+as médias da mesa, que mean_times() calcula, e o registro repete os tempos
+gravados.
+    uniforme     1-3 s pensando, 2-4 s comendo
+    exponencial  sem memória, como chegadas de Poisson
+    pareto       cauda pesada: a maioria curta, algumas muito longas
+    bimodal      quase sempre curto, às vezes longo
+    assimetrico  cada filósofo tem o próprio fator: uns pensam pouco e comem muito
+    constante    sempre 2 s e 3 s
+    registro     repete os tempos de um registro de eventos (registro_eventos.py)
+
+Para ver as estatísticas de um perfil:
+    python3 perfis_carga.py pareto --amostras 100000
+"""
+import argparse
+import math
+import random
+import time
+from array import array
+from functools import partial
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from registro_eventos import EventLogReader, EV_PENSANDO, EV_COM_FOME, EV_COMENDO
+
+# Amostras sorteadas de uma vez para cada buffer
+CHUNK = 4096
+
+PROFILES = {}
+
+
+def register_profile(cls):
+    PROFILES[cls.name] = cls
+    return cls
+
+
+def get_profile(name):
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Perfil de carga desconhecido: {name}") from None
+
+
+# ---- Distribuições ----
+
+class Uniform:
+    def __init__(self, low, high):
+        self.low, self.high = low, high
+        self.mean = (low + high) / 2
+
+    def draw(self, rng, k, scale):
+        low, width, r = self.low * scale, (self.high - self.low) * scale, rng.random
+        return [low + width * r() for _ in range(k)]
+
+    def draw_numpy(self, gen, k, scale):
+        return gen.uniform(self.low * scale, self.high * scale, k)
+
+
+class Exponential:
+    def __init__(self, mean):
+        self.mean = mean
+
+    def draw(self, rng, k, scale):
+        mean, r = self.mean * scale, rng.random
+        return [-mean * math.log(1.0 - r()) for _ in range(k)]
+
+    def draw_numpy(self, gen, k, scale):
+        return gen.exponential(self.mean * scale, k)
+
+
+class Pareto:
+    """Pareto com a média pedida; 'alpha' perto de 1 deixa a cauda mais pesada."""
+    def __init__(self, mean, alpha=1.5):
+        if alpha <= 1:
+            raise ValueError("A Pareto só tem média finita com alpha > 1")
+        self.mean, self.alpha = mean, alpha
+        self.minimum = mean * (alpha - 1) / alpha
+
+    def draw(self, rng, k, scale):
+        xm, inv, r = self.minimum * scale, -1.0 / self.alpha, rng.random
+        return [xm * (1.0 - r()) ** inv for _ in range(k)]
+
+    def draw_numpy(self, gen, k, scale):
+        # gen.pareto é a Lomax (começa em 0); somar 1 dá a Pareto clássica
+        return (gen.pareto(self.alpha, k) + 1.0) * (self.minimum * scale)
+
+
+class Bimodal:
+    """Mistura de dois intervalos uniformes: 'long' com probabilidade 'p_long'."""
+    def __init__(self, short, long, p_long):
+        self.short, self.long, self.p_long = short, long, p_long
+        self.mean = (1 - p_long) * short.mean + p_long * long.mean
+
+    def draw(self, rng, k, scale):
+        short = self.short.draw(rng, k, scale)
+        long = self.long.draw(rng, k, scale)
+        p, r = self.p_long, rng.random
+        return [l if r() < p else s for s, l in zip(short, long)]
+
+    def draw_numpy(self, gen, k, scale):
+        return np.where(gen.random(k) < self.p_long,
+                        self.long.draw_numpy(gen, k, scale), self.short.draw_numpy(gen, k, scale))
+
+
+class Constant:
+    def __init__(self, value):
+        self.mean = value
+
+    def draw(self, rng, k, scale):
+        return [self.mean * scale] * k
+
+    def draw_numpy(self, gen, k, scale):
+        return np.full(k, self.mean * scale)
+
+
+class Function:
+    """Função que recebe o gerador aleatório; não é vetorizável."""
+    vectorized = False
+    # Amostras usadas para estimar a média, que a função não informa
+    MEAN_SAMPLES = 1000
+
+    def __init__(self, func):
+        self.func = func
+        self._mean = None
+
+    @property
+    def mean(self):
+        if self._mean is None:
+            rng = random.Random(0)
+            self._mean = sum(self.func(rng) for _ in range(self.MEAN_SAMPLES)) / self.MEAN_SAMPLES
+        return self._mean
+
+    def draw(self, rng, k, scale):
+        f = self.func
+        return [f(rng) * scale for _ in range(k)]
+
+
+def distribution(spec):
+    # Intervalo (a, b) para a uniforme, ou função que recebe o gerador
+    return Function(spec) if callable(spec) else Uniform(*spec)
+
+
+def _draw_numpy(dist, gen, scale, k):
+    return dist.draw_numpy(gen, k, scale).tolist()
+
+
+class ChunkedSampler:
+    """
+    Devolve amostras de um lote já sorteado; draw(k) sorteia o próximo.
+    list.pop() é atômico, então várias threads podem usar o mesmo amostrador
+    sem lock; se duas reabastecerem juntas, um lote a mais é descartado.
+
+    Recebe o índice do filósofo só para ter a forma de think/eat: todos
+    dividem o mesmo lote, já que as amostras são independentes.
+    """
+    def __init__(self, draw, chunk=CHUNK):
+        self._draw = draw
+        self.chunk = chunk
+        self._buffer = []
+
+    def __call__(self, p_id=None):
+        try:
+            return self._buffer.pop()
+        except IndexError:
+            self._buffer = self._draw(self.chunk)
+            return self._buffer.pop()
+
+
+# ---- Perfis ----
+
+class WorkloadProfile:
+    """
+    Tempos de pensar e de comer de uma mesa com 'num_philosophers' lugares.
+    think(p_id) e eat(p_id) devolvem segundos, multiplicados por 'scale'.
+
+    Sem lambdas no estado: um perfil pode ser copiado com pickle junto com a
+    simulação (salvamento.py), desde que as distribuições também possam.
+    """
+    name = None
+    label = "Personalizado"
+    think_dist = Uniform(1, 3)
+    eat_dist = Uniform(2, 4)
+
+    def __init__(self, num_philosophers, seed=None, scale=1.0, chunk=CHUNK,
+                 think_dist=None, eat_dist=None, **options):
+        self.num_philosophers = num_philosophers
+        self.think_dist = think_dist or self.think_dist
+        self.eat_dist = eat_dist or self.eat_dist
+        self.seed = seed
+        self.scale = scale
+        # Semente própria, para não repetir a sequência do gerador da simulação
+        self.rng = random.Random(None if seed is None else f"carga-{seed}")
+        self._gen = np.random.default_rng(seed) if np is not None else None
+        self.think = self._sampler(self.think_dist, chunk)
+        self.eat = self._sampler(self.eat_dist, chunk)
+        self._samplers = (self.think, self.eat)
+
+    def _sampler(self, dist, chunk):
+        if self._gen is not None and getattr(dist, 'vectorized', True):
+            return ChunkedSampler(partial(_draw_numpy, dist, self._gen, self.scale), chunk)
+        return ChunkedSampler(partial(dist.draw, self.rng, scale=self.scale), chunk)
+
+    def reseed(self, seed):
+        """
+        Troca a semente dos próximos sorteios e descarta os lotes já
+        sorteados: é o que separa dois ramos de um mesmo checkpoint.
+        """
+        self.rng.seed(f"carga-{seed}")
+        if self._gen is not None:
+            self._gen.bit_generator.state = np.random.default_rng(seed).bit_generator.state
+        for sampler in self._samplers:
+            sampler._buffer = []
+
+    def add_philosopher(self):
+        """Mais um lugar na mesa (mesa.Table.join); devolve o seu índice."""
+        self.num_philosophers += 1
+        return self.num_philosophers - 1
+
+    def mean_times(self):
+        """Médias de pensar e de comer, em segundos de simulação."""
+        return self.think_dist.mean * self.scale, self.eat_dist.mean * self.scale
+
+    def describe(self):
+        think, eat = self.mean_times()
+        return f"{self.label} (médias {think:.2f}s / {eat:.2f}s)"
+
+
+@register_profile
+class UniformProfile(WorkloadProfile):
+    name = "uniforme"
+    label = "Uniforme"
+
+
+@register_profile
+class ExponentialProfile(WorkloadProfile):
+    name = "exponencial"
+    label = "Exponencial"
+    think_dist = Exponential(2)
+    eat_dist = Exponential(3)
+
+
+@register_profile
+class ParetoProfile(WorkloadProfile):
+    name = "pareto"
+    label = "Pareto (cauda pesada)"
+
+    def __init__(self, num_philosophers, alpha=1.5, **options):
+        super().__init__(num_philosophers, think_dist=Pareto(2, alpha), eat_dist=Pareto(3, alpha), **options)
+
+
+@register_profile
+class BimodalProfile(WorkloadProfile):
+    name = "bimodal"
+    label = "Bimodal"
+    # 80% curtos e 20% longos, com as mesmas médias de 2 s e 3 s
+    think_dist = Bimodal(Uniform(0.5, 1.5), Uniform(5, 7), 0.2)
+    eat_dist = Bimodal(Uniform(1, 3), Uniform(6, 8), 0.2)
+
+
+@register_profile
+class SkewedProfile(WorkloadProfile):
+    """
+    Tempos uniformes multiplicados por um fator de cada filósofo, sorteado de
+    uma lognormal com desvio 'skew'. Um fator alto é um glutão: pensa pouco
+    (tempo dividido pelo fator) e come muito (tempo multiplicado).
+    """
+    name = "assimetrico"
+    label = "Assimétrico por filósofo"
+
+    def __init__(self, num_philosophers, skew=0.5, **options):
+        super().__init__(num_philosophers, **options)
+        rng = self.rng
+        self.factor = array('d', (rng.lognormvariate(0, skew) for _ in range(num_philosophers)))
+        self._think, self._eat = self.think, self.eat
+        self.think, self.eat = self._skewed_think, self._skewed_eat
+        self.skew = skew
+
+    def _skewed_think(self, p_id):
+        return self._think(p_id) / self.factor[p_id]
+
+    def _skewed_eat(self, p_id):
+        return self._eat(p_id) * self.factor[p_id]
+
+    def add_philosopher(self):
+        self.factor.append(self.rng.lognormvariate(0, self.skew))
+        return super().add_philosopher()
+
+    def mean_times(self):
+        # Os fatores não têm média 1 (nem os seus inversos): as médias da
+        # mesa são as das distribuições corrigidas pelos fatores sorteados
+        think, eat = super().mean_times()
+        n = len(self.factor)
+        return think * sum(1 / f for f in self.factor) / n, eat * sum(self.factor) / n
+
+
+@register_profile
+class ConstantProfile(WorkloadProfile):
+    name = "constante"
+    label = "Constante"
+    think_dist = Constant(2)
+    eat_dist = Constant(3)
+
+
+@register_profile
+class TraceProfile(WorkloadProfile):
+    """
+    Repete os tempos gravados em um registro de eventos: pensar vai de
+    'pensando' a 'com fome' e comer de 'comendo' ao próximo 'pensando'. O
+    filósofo p repete, em ciclo, os tempos do filósofo p % n do registro;
+    quem não tem tempos gravados usa os de toda a mesa.
+    """
+    name = "registro"
+    label = "Registro gravado"
+    requires_path = True
+
+    def __init__(self, num_philosophers, path=None, seed=None, scale=1.0, **options):
+        if path is None:
+            raise ValueError("O perfil 'registro' precisa do caminho de um registro de eventos")
+        self.num_philosophers = num_philosophers
+        self.seed, self.scale, self.path = seed, scale, path
+        self._replays = []
+        reader = EventLogReader(path)
+        recorded = reader.num_philosophers
+        think = [array('d') for _ in range(recorded)]
+        eat = [array('d') for _ in range(recorded)]
+        since = [None] * recorded
+        status = [None] * recorded
+        for t, p_id, event, _ in reader:
+            if event > EV_COMENDO:
+                continue
+            if since[p_id] is not None:
+                if status[p_id] == EV_PENSANDO and event == EV_COM_FOME:
+                    think[p_id].append((t - since[p_id]) * scale)
+                elif status[p_id] == EV_COMENDO and event == EV_PENSANDO:
+                    eat[p_id].append((t - since[p_id]) * scale)
+            status[p_id], since[p_id] = event, t
+        self.think = self._replay(think, recorded, "pensar")
+        self.eat = self._replay(eat, recorded, "comer")
+
+    def _replay(self, traces, recorded, what):
+        pooled = array('d')
+        for trace in traces:
+            pooled.extend(trace)
+        if not pooled:
+            raise ValueError(f"{self.path} não tem tempos de {what} completos")
+        replay = _Replay([traces[p % recorded] or pooled for p in range(self.num_philosophers)], traces, pooled)
+        self._replays.append(replay)
+        return replay
+
+    def add_philosopher(self):
+        p_id = super().add_philosopher()
+        for replay in self._replays:
+            replay.mine.append(replay.traces[p_id % len(replay.traces)] or replay.pooled)
+            replay.position.append(0)
+        return p_id
+
+    def reseed(self, seed):
+        """O registro não tem sorteio: os ramos repetem os mesmos tempos."""
+
+    def mean_times(self):
+        return tuple(sum(r.pooled) / len(r.pooled) for r in (self.think, self.eat))
+
+    def describe(self):
+        return f"{self.label} ({self.path})"
+
+
+class _Replay:
+    """Tempos gravados de cada filósofo, repetidos em ciclo."""
+    def __init__(self, mine, traces, pooled):
+        self.mine, self.traces, self.pooled = mine, traces, pooled
+        # Cada filósofo tem a própria posição: threads diferentes não disputam o índice
+        self.position = array('q', [0]) * len(mine)
+
+    def __call__(self, p_id):
+        trace, i = self.mine[p_id], self.position[p_id]
+        self.position[p_id] = i + 1
+        return trace[i % len(trace)]
+
+
+def profile_from_timings(num_philosophers, think_time, eat_time, seed=None, scale=1.0):
+    """Perfil a partir de intervalos (a, b) uniformes ou funções que recebem o gerador."""
+    return WorkloadProfile(num_philosophers, seed=seed, scale=scale,
+                           think_dist=distribution(think_time), eat_dist=distribution(eat_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estatísticas de um perfil de carga.")
+    parser.add_argument("perfil", choices=PROFILES)
+    parser.add_argument("--amostras", type=int, default=100000)
+    parser.add_argument("--filosofos", type=int, default=5)
+    parser.add_argument("--registro", default=None, help="registro de eventos para o perfil 'registro'")
+    parser.add_argument("--semente", type=int, default=None)
+    args = parser.parse_args()
+
+    options = {'path': args.registro} if args.registro else {}
+    profile = get_profile(args.perfil)(args.filosofos, seed=args.semente, **options)
+    print(f"Perfil: {profile.describe()} | NumPy: {'sim' if np is not None else 'não'}")
+    for what, sample in (("pensar", profile.think), ("comer", profile.eat)):
+        start = time.perf_counter()
+        values = [sample(i % args.filosofos) for i in range(args.amostras)]
+        elapsed = time.perf_counter() - start
+        values.sort()
+        k = len(values)
+        print(f"{what:7s} média {sum(values) / k:7.3f}s | p50 {values[k // 2]:7.3f}s | "
+              f"p99 {values[int(k * 0.99)]:7.3f}s | máx {values[-1]:9.3f}s | "
+              f"{elapsed / k * 1e9:.0f} ns/amostra")
+
+if __name__ == "__main__":
+    main()
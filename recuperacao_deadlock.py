@@ -0,0 +1,150 @@
+"""
+Recuperação de deadlock: detectar e desfazer, em vez de prevenir.
+
+Quando o detector (detector_deadlock.WaitForGraph) encontra um ciclo, ou
+quando um filósofo espera um garfo por mais de 'acquire_timeout' segundos,
+uma política escolhe uma vítima entre os filósofos envolvidos. A vítima
+desiste da espera, larga o que pegou nesta tentativa (ela mesma, na própria
+thread, sem quebrar a posse dos locks), espera um recuo aleatório e tenta
+de novo. O resto da mesa continua comendo.
+
+Políticas de escolha da vítima:
+    mais_novo        quem ficou com fome por último (perde menos espera)
+    menos_refeicoes  quem comeu menos até agora (favorece quem já está à frente)
+    menor_custo      quem segura garfos há menos tempo (menos trabalho perdido)
+
+As recuperações e o tempo de garfo perdido entram no MetricsCollector, o
+que permite comparar detectar-e-recuperar com as estratégias de prevenção:
+
+    python3 simulacao_eventos.py deadlock_rapido --filosofos 20 --tempo 5000 --recuperacao mais_novo
+    python3 benchmark.py --estrategias deadlock_rapido solucao_hierarquia --recuperacao menor_custo
+"""
+import random
+import threading
+import time
+from collections import namedtuple
+
+# Intervalo das esperas em fatias: é o atraso máximo para a vítima (ou uma
+# thread parada) perceber que deve desistir
+POLL_INTERVAL = 0.05
+ACQUIRE_TIMEOUT = 10.0
+MAX_BACKOFF = 1.0
+
+# Dados de um filósofo envolvido no deadlock: instante em que ficou com
+# fome, refeições feitas e custo de desfazer (segundos de garfo que serão
+# devolvidos sem refeição)
+Candidate = namedtuple('Candidate', 'p_id hungry_since meals cost')
+
+
+class RollbackRequested(Exception):
+    """A espera foi interrompida: o filósofo deve largar os garfos e recuar."""
+
+
+# Empates são sorteados com o gerador da recuperação: desempatar pelo
+# índice faria o mesmo filósofo perder sempre (no deadlock_rapido todos
+# pegam o primeiro garfo no mesmo instante)
+VICTIM_POLICIES = {
+    'mais_novo': lambda candidates, rng: max(candidates, key=lambda c: (c.hungry_since, rng.random())),
+    'menos_refeicoes': lambda candidates, rng: min(candidates, key=lambda c: (c.meals, rng.random())),
+    'menor_custo': lambda candidates, rng: min(candidates, key=lambda c: (c.cost, rng.random())),
+}
+
+
+class DeadlockRecovery:
+    """
+    Escolhe vítimas e conta as recuperações. Serve às threads (wait() e
+    on_deadlock()) e ao simulador por eventos (choose() e backoff()).
+    """
+    def __init__(self, policy="mais_novo", acquire_timeout=ACQUIRE_TIMEOUT, max_backoff=MAX_BACKOFF,
+                 metrics=None, rng=None):
+        if policy not in VICTIM_POLICIES:
+            raise ValueError(f"Política de vítima desconhecida: {policy}")
+        self.policy = policy
+        self.choose_victim = VICTIM_POLICIES[policy]
+        self.acquire_timeout = acquire_timeout
+        self.max_backoff = max_backoff
+        self.metrics = metrics
+        self.rng = rng or random.Random()
+        self.recoveries = 0
+        self.timeouts = 0
+        # Threads: filósofos parados em um garfo segurando outro recurso
+        self.philosophers = {}
+        self.blocked = set()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Checkpoint (salvamento.py): o lock e a política não são copiados;
+        # quem carrega cria outro lock e busca a política pelo nome
+        state = self.__dict__.copy()
+        del state['_lock'], state['choose_victim']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.choose_victim = VICTIM_POLICIES[self.policy]
+        self._lock = threading.Lock()
+
+    def choose(self, candidates):
+        return self.choose_victim(candidates, self.rng).p_id
+
+    def backoff(self):
+        return self.rng.uniform(0, self.max_backoff)
+
+    def on_rollback(self, p_id, lost, now=None):
+        """A vítima largou tudo; 'lost' são os segundos de garfo desperdiçados."""
+        with self._lock:
+            self.recoveries += 1
+        if self.metrics:
+            self.metrics.on_recovery(p_id, lost, now)
+
+    # ---- Threads (ControllablePhilosopher) ----
+
+    def register(self, ph):
+        self.philosophers[ph.p_id] = ph
+
+    def unregister(self, p_id):
+        """O filósofo saiu da mesa (mesa.Table.leave)."""
+        with self._lock:
+            self.philosophers.pop(p_id, None)
+            self.blocked.discard(p_id)
+
+    def on_deadlock(self, report):
+        """Chamado com o ciclo do detector; interrompe a espera da vítima e a devolve."""
+        with self._lock:
+            candidates = [self.philosophers[p].candidate() for p in report.philosophers if p in self.philosophers]
+            if not candidates:
+                return None
+            victim = self.choose(candidates)
+            self.philosophers[victim].abort_requested = True
+            return victim
+
+    def wait(self, ph, lock):
+        """
+        Espera o lock em fatias de POLL_INTERVAL. Levanta RollbackRequested
+        se o filósofo foi escolhido como vítima ou parado; depois de
+        acquire_timeout segundos, escolhe uma vítima entre os que estão
+        parados segurando algo (que pode ser ele mesmo).
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._lock:
+            self.blocked.add(ph.p_id)
+        try:
+            while not lock.acquire(timeout=POLL_INTERVAL):
+                if ph.abort_requested or not ph.running:
+                    ph.abort_requested = False
+                    raise RollbackRequested()
+                if time.monotonic() >= deadline:
+                    deadline = time.monotonic() + self.acquire_timeout
+                    self._on_timeout(ph)
+        finally:
+            with self._lock:
+                self.blocked.discard(ph.p_id)
+
+    def _on_timeout(self, ph):
+        with self._lock:
+            self.timeouts += 1
+            candidates = [self.philosophers[p].candidate() for p in self.blocked
+                          if p in self.philosophers and self.philosophers[p].held]
+            if ph.p_id not in self.blocked or not candidates:
+                return
+            self.philosophers[self.choose(candidates)].abort_requested = True
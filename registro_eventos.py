@@ -0,0 +1,246 @@
+"""
+Registro binário de eventos do Jantar dos Filósofos.
+
+Cada evento ocupa 17 bytes: instante (double), filósofo (int32), tipo do
+evento (int8) e garfo (int32, -1 quando não se aplica). O caminho quente só
+acrescenta uma tupla a uma deque; uma thread de fundo empacota os eventos
+em lotes e grava no arquivo com buffer, então os filósofos nunca esperam
+por E/S como acontece com um print a cada mudança de estado.
+
+O arquivo começa com um cabeçalho (assinatura, número de filósofos e nome
+da estratégia), o que permite reproduzir a execução depois na aplicação
+gráfica (LogReplayer) ou convertê-la em texto:
+
+    python3 registro_eventos.py execucao.jlog
+"""
+import argparse
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+from detector_deadlock import WAITER, DeadlockReport
+
+MAGIC = b"JANTAR\x01\n"
+HEADER = struct.Struct('<8sIH')     # assinatura, filósofos, tamanho do nome
+RECORD = struct.Struct('<dibi')     # instante, filósofo, evento, garfo
+
+# Tipos de evento. Os três primeiros são os códigos de estado de
+# simulacao_eventos (PENSANDO, COM_FOME, COMENDO)
+EV_PENSANDO, EV_COM_FOME, EV_COMENDO = 0, 1, 2
+EV_FORK_TAKEN = 3
+EV_FORK_RELEASED = 4
+EV_WAITER_CALL = 5
+EV_WAITER_END = 6
+EV_DEADLOCK = 7     # uma aresta do ciclo: o filósofo espera o recurso 'garfo'
+EVENT_NAMES = ("pensando", "com fome", "comendo", "pega", "larga",
+               "chama garçom", "sai do garçom", "deadlock")
+STATUS_EVENTS = {"pensando": EV_PENSANDO, "com fome": EV_COM_FOME, "comendo": EV_COMENDO}
+
+NO_FORK = -1
+# O garçom não é um garfo; no campo de garfo ele vira este código
+WAITER_ID = -2
+
+
+def _resource_id(resource):
+    if resource is None:
+        return NO_FORK
+    if resource == WAITER:
+        return WAITER_ID
+    return resource
+
+
+class EventLogWriter:
+    """
+    Grava eventos em segundo plano. record() pode ser chamado de qualquer
+    thread; close() (ou o fim do bloco with) espera a gravação terminar.
+    Sem 'now', o instante é contado a partir da criação do registro.
+    """
+    def __init__(self, path, num_philosophers, sim_type, clock=None, flush_interval=0.05):
+        if clock is None:
+            start = time.perf_counter()
+            clock = lambda: time.perf_counter() - start
+        self.clock = clock
+        self.path = path
+        self.count = 0
+        self._file = open(path, "wb")
+        name = sim_type.encode("utf-8")
+        self._file.write(HEADER.pack(MAGIC, num_philosophers, len(name)) + name)
+        self._pending = deque()
+        self._flush_interval = flush_interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="registro-eventos", daemon=True)
+        self._thread.start()
+
+    def record(self, p_id, event, fork=NO_FORK, now=None):
+        # deque.append é atômico, então não há lock no caminho quente
+        self._pending.append((self.clock() if now is None else now, p_id, event, fork))
+
+    def record_status(self, p_id, status, now=None):
+        self.record(p_id, STATUS_EVENTS[status], NO_FORK, now)
+
+    def record_deadlock(self, report):
+        for p_id, resource in report.cycle:
+            self.record(p_id, EV_DEADLOCK, _resource_id(resource), report.time)
+
+    def _write_pending(self):
+        pending, pack = self._pending, RECORD.pack
+        batch = []
+        while pending:
+            batch.append(pack(*pending.popleft()))
+        if batch:
+            self._file.write(b"".join(batch))
+            # Um lote por intervalo: se o processo for interrompido (Ctrl+C
+            # num deadlock), perde-se no máximo o último intervalo
+            self._file.flush()
+            self.count += len(batch)
+
+    def _run(self):
+        while not self._stop.wait(self._flush_interval):
+            self._write_pending()
+        self._write_pending()
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record_or_print(log, p_id, message, *events):
+    """
+    Saída dos scripts de terminal: com registro, grava os eventos (pares
+    (evento, garfo)) em segundo plano; sem ele, imprime a mensagem.
+    """
+    if log:
+        for event, fork in events:
+            log.record(p_id, event, fork)
+    else:
+        print(message)
+
+
+class EventLogReader:
+    """Lê um registro gravado; iterar devolve tuplas (instante, filósofo, evento, garfo)."""
+    def __init__(self, path, chunk_records=4096):
+        self.path = path
+        self._chunk = chunk_records * RECORD.size
+        with open(path, "rb") as f:
+            magic, self.num_philosophers, name_len = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} não é um registro de eventos do jantar")
+            self.sim_type = f.read(name_len).decode("utf-8")
+            self._offset = f.tell()
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            while True:
+                data = f.read(self._chunk)
+                # Um registro incompleto no fim (gravação interrompida) é ignorado
+                usable = len(data) - len(data) % RECORD.size
+                if not usable:
+                    return
+                yield from RECORD.iter_unpack(data[:usable])
+
+
+class LogReplayer(threading.Thread):
+    """
+    Reproduz um registro como se fosse uma execução ao vivo: converte os
+    eventos nas mensagens do canal de atualizações da GUI e respeita os
+    intervalos gravados, divididos por 'speed' (que pode mudar durante a
+    reprodução). O coletor de métricas, se informado, recebe os eventos
+    com o instante gravado.
+    """
+    def __init__(self, reader, put, speed=1.0, pause_event=None, metrics=None):
+        super().__init__(name="reproducao", daemon=True)
+        self.reader = reader
+        self.put = put
+        self.speed = speed
+        self.pause_event = pause_event
+        self.metrics = metrics
+        self.running = True
+        self.finished = False
+        self._wake = threading.Event()
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+
+    def _messages(self, record, status, fork_count, cycle):
+        t, p_id, event, fork = record
+        if event == EV_DEADLOCK:
+            cycle.append((p_id, WAITER if fork == WAITER_ID else fork))
+            self._cycle_time = t
+            return
+        if cycle:
+            self._deadlock(cycle)
+        if event <= EV_COMENDO:
+            status[p_id] = EVENT_NAMES[event]
+            if self.metrics: self.metrics.on_status(p_id, status[p_id], t)
+            self.put(('status_update', p_id, status[p_id], fork_count[p_id]))
+        elif event == EV_FORK_TAKEN:
+            fork_count[p_id] += 1
+            if self.metrics: self.metrics.on_fork_acquired(p_id, fork, t)
+            self.put(('fork_update', fork, p_id))
+            self.put(('status_update', p_id, status[p_id], fork_count[p_id]))
+        elif event == EV_FORK_RELEASED:
+            fork_count[p_id] -= 1
+            if self.metrics: self.metrics.on_fork_released(p_id, fork, t)
+            self.put(('fork_update', fork, None))
+            self.put(('status_update', p_id, status[p_id], fork_count[p_id]))
+        elif event == EV_WAITER_CALL:
+            self.put(('call_waiter', p_id))
+        elif event == EV_WAITER_END:
+            self.put(('end_call', p_id))
+
+    def _deadlock(self, cycle):
+        report = DeadlockReport(list(cycle), self._cycle_time, [])
+        cycle.clear()
+        if self.metrics: self.metrics.on_deadlock(report)
+        self.put(('deadlock', None, report.describe()))
+
+    def run(self):
+        n = self.reader.num_philosophers
+        status, fork_count = ["pensando"] * n, [0] * n
+        cycle = []
+        last_time = None
+        due = 0.0
+        for record in self.reader:
+            if not self.running:
+                return
+            if self.pause_event:
+                self.pause_event.wait()
+            t = record[0]
+            if last_time is not None:
+                due += (t - last_time) / self.speed
+                # Acumula os intervalos pequenos para não dormir a cada evento
+                if due > 0.005:
+                    self._wake.wait(due)
+                    due = 0.0
+            last_time = t
+            self._messages(record, status, fork_count, cycle)
+        if cycle:
+            self._deadlock(cycle)
+        self.finished = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converte um registro binário de eventos em texto.")
+    parser.add_argument("arquivo")
+    args = parser.parse_args()
+    reader = EventLogReader(args.arquivo)
+    out = sys.stdout
+    out.write(f"# estratégia={reader.sim_type} filósofos={reader.num_philosophers}\n")
+    for t, p_id, event, fork in reader:
+        out.write(f"{t:.6f}\t{p_id}\t{EVENT_NAMES[event]}\t{fork}\n")
+
+if __name__ == "__main__":
+    main()
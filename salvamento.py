@@ -0,0 +1,215 @@
+"""
+Checkpoints da simulação por eventos: salvar, retomar e ramificar.
+
+Um checkpoint guarda o estado inteiro de uma DiscreteEventSimulation:
+estados dos filósofos, donos e filas de espera dos garfos, estado das
+estratégias (fila do garçom, fichas, garfos sujos...), fila de eventos,
+relógio virtual, geradores aleatórios, perfil de carga, métricas,
+detector e recuperação de deadlock. Retomar em outro processo continua
+exatamente a mesma execução: o resultado é igual ao de uma execução sem
+interrupção.
+
+O arquivo é o estado em pickle, comprimido com zlib, depois de um
+cabeçalho com a versão. Como todo pickle, só deve ser carregado se veio
+de uma fonte confiável. O registro de eventos (um arquivo aberto) não vai
+junto.
+
+Um ramo é uma cópia do estado com outra semente ou com a recuperação de
+deadlock ligada: serve para perguntar "e se" a partir de um estado
+interessante, como o último antes de um deadlock.
+
+    python3 simulacao_eventos.py deadlock_lento --filosofos 50 --tempo 100000 --salvar estado.ckpt --salvar-a-cada 500
+    python3 salvamento.py info estado.ckpt
+    python3 salvamento.py retomar estado.ckpt --tempo 200000 --salvar estado.ckpt
+    python3 salvamento.py retomar estado.ckpt --tempo 300000 --recuperacao mais_novo --semente 7
+"""
+import argparse
+import os
+import pickle
+import random
+import time
+import zlib
+
+from recuperacao_deadlock import DeadlockRecovery, VICTIM_POLICIES
+
+MAGIC = b"JANTAR-CKPT"
+VERSION = 1
+
+
+def dumps(sim, wall_time=0.0):
+    """
+    Estado da simulação em bytes. 'wall_time' é o tempo real já gasto na
+    execução, somado ao das próximas sessões.
+    """
+    info = {
+        'sim_type': sim.sim_type,
+        'num_philosophers': sim.num_philosophers,
+        'clock': sim.clock,
+        'total_meals': sim.total_meals,
+        'deadlock_time': sim.deadlock_time,
+        'wall_time': wall_time,
+        'saved_at': time.time(),
+    }
+    data = zlib.compress(pickle.dumps((info, sim), protocol=pickle.HIGHEST_PROTOCOL))
+    return MAGIC + bytes([VERSION]) + data
+
+
+def loads(data):
+    """Devolve (info, simulação) de bytes gravados por dumps."""
+    if not data.startswith(MAGIC):
+        raise ValueError("Não é um checkpoint da simulação")
+    version = data[len(MAGIC)]
+    if version != VERSION:
+        raise ValueError(f"Checkpoint na versão {version}; esta é a {VERSION}")
+    return pickle.loads(zlib.decompress(data[len(MAGIC) + 1:]))
+
+
+def save(sim, path, wall_time=0.0):
+    # Grava ao lado e troca de uma vez: uma interrupção no meio não estraga o
+    # checkpoint anterior
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(dumps(sim, wall_time))
+    os.replace(tmp, path)
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def branch(sim, seed=None, recovery=None):
+    """
+    Cópia independente da simulação. Com 'seed', a cópia sorteia outros
+    tempos e outros recuos a partir daqui; com 'recovery' (uma política de
+    recuperacao_deadlock), os deadlocks passam a ser desfeitos, inclusive
+    um que já tenha travado a cópia.
+    """
+    sim = loads(dumps(sim))[1]
+    if seed is not None:
+        # A estratégia usa o mesmo gerador da simulação
+        sim.rng.seed(seed)
+        sim.workload.reseed(seed)
+        if sim.recovery:
+            sim.recovery.rng.seed(seed)
+    if recovery is not None:
+        if not sim.detector:
+            raise ValueError("O checkpoint foi salvo sem detector de deadlock")
+        if sim.recovery:
+            sim.recovery.policy = recovery
+            sim.recovery.choose_victim = VICTIM_POLICIES[recovery]
+        else:
+            sim.recovery = DeadlockRecovery(recovery, metrics=sim.metrics, rng=random.Random(seed))
+        if sim.deadlock_time is not None and sim.detector.deadlocks:
+            sim.deadlock_time = None
+            sim._recover(sim.detector.deadlocks[-1])
+    return sim
+
+
+def run_with_checkpoints(sim, path, every=None, max_meals=None, max_time=None, wall_time=0.0):
+    """
+    Executa como sim.run e grava o estado em 'path' no início, no fim e, com
+    'every', a cada 'every' segundos de tempo virtual. Se a execução termina
+    em deadlock, o arquivo fica com o último estado gravado antes dele (o do
+    início, sem 'every'). 'checkpoint_clock' no resultado é o instante do
+    estado gravado, ou None se nada foi gravado porque a simulação já
+    estava em deadlock.
+    """
+    start = time.perf_counter()
+    saved = None
+    if sim.deadlock_time is None:
+        save(sim, path, wall_time)
+        saved = sim.clock
+    while True:
+        stop = max_time if every is None else sim.clock + every
+        if max_time is not None:
+            stop = min(stop, max_time)
+        r = sim.run(max_meals=max_meals, max_time=stop)
+        if r['deadlock']:
+            break
+        save(sim, path, wall_time + time.perf_counter() - start)
+        saved = sim.clock
+        if stop == max_time or (max_meals is not None and sim.total_meals >= max_meals):
+            break
+    r['wall_time'] = time.perf_counter() - start
+    r['checkpoint_clock'] = saved
+    return r
+
+
+def report_save(path, r):
+    """Linha do terminal sobre o checkpoint gravado por run_with_checkpoints."""
+    if r['checkpoint_clock'] is None:
+        print(f"Nada foi gravado em {path}: a simulação já estava em deadlock")
+        return
+    last = ", o último antes do deadlock" if r['deadlock'] else ""
+    print(f"Estado salvo em {path} (t={r['checkpoint_clock']:.2f}s{last})")
+
+
+def describe(info, sim):
+    state = f"deadlock em t={info['deadlock_time']:.2f}s" if info['deadlock_time'] is not None else "rodando"
+    saved = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(info['saved_at']))
+    lines = [
+        f"Estratégia: {info['sim_type']} | {info['num_philosophers']} filósofos | Carga: {sim.workload.describe()}",
+        f"Tempo virtual: {info['clock']:.2f}s | Refeições: {info['total_meals']} | {state}",
+        f"Tempo real acumulado: {info['wall_time']:.3f}s | Salvo em {saved}",
+        f"Detector: {'sim' if sim.detector else 'não'} | "
+        f"Recuperação: {sim.recovery.policy if sim.recovery else 'não'} | Eventos pendentes: {len(sim._events)}",
+    ]
+    if sim.topology is not None:
+        lines.insert(1, sim.topology.describe())
+    return "\n".join(lines)
+
+
+def main():
+    # Aqui, e não no topo: simulacao_eventos importa este módulo
+    from simulacao_eventos import print_report
+
+    parser = argparse.ArgumentParser(description="Checkpoints da simulação por eventos.")
+    commands = parser.add_subparsers(dest="comando", required=True)
+    info_parser = commands.add_parser("info", help="mostra o que um checkpoint guarda")
+    info_parser.add_argument("arquivo")
+    resume = commands.add_parser("retomar", help="continua uma simulação salva")
+    resume.add_argument("arquivo")
+    resume.add_argument("--refeicoes", type=int, default=None, help="continua até este total de refeições")
+    resume.add_argument("--tempo", type=float, default=None, help="continua até este tempo virtual, em segundos")
+    resume.add_argument("--salvar", default=None, metavar="ARQUIVO", help="grava o estado ao fim")
+    resume.add_argument("--salvar-a-cada", type=float, default=None, metavar="SEGUNDOS",
+                        help="com --salvar, grava também a cada SEGUNDOS de tempo virtual")
+    resume.add_argument("--semente", type=int, default=None, help="ramo: sorteios diferentes daqui em diante")
+    resume.add_argument("--recuperacao", choices=VICTIM_POLICIES, default=None,
+                        help="ramo: desfaz os deadlocks com esta política")
+    args = parser.parse_args()
+
+    try:
+        info, sim = load(args.arquivo)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.comando == "info":
+        print(describe(info, sim))
+        return
+
+    if args.refeicoes is None and args.tempo is None:
+        parser.error("informe --refeicoes ou --tempo (totais, contando o que já foi simulado)")
+    if args.salvar_a_cada is not None and (not args.salvar or args.salvar_a_cada <= 0):
+        parser.error("--salvar-a-cada precisa de --salvar e de um intervalo positivo")
+    if args.tempo is not None and args.tempo <= info['clock']:
+        parser.error(f"a simulação salva já está em t={info['clock']:.2f}s")
+    if args.semente is not None or args.recuperacao:
+        try:
+            sim = branch(sim, seed=args.semente, recovery=args.recuperacao)
+        except ValueError as e:
+            parser.error(str(e))
+    if sim.deadlock_time is not None:
+        print(f"O estado salvo já está em deadlock (t={sim.deadlock_time:.2f}s); use --recuperacao para seguir")
+    print(f"Retomando de t={info['clock']:.2f}s ({info['total_meals']} refeições)")
+    if args.salvar:
+        r = run_with_checkpoints(sim, args.salvar, args.salvar_a_cada, max_meals=args.refeicoes,
+                                 max_time=args.tempo, wall_time=info['wall_time'])
+    else:
+        r = sim.run(max_meals=args.refeicoes, max_time=args.tempo)
+    print_report(sim, r)
+    if args.salvar:
+        report_save(args.salvar, r)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Simulação do Jantar dos Filósofos com asyncio: cada filósofo é uma corrotina
+e os garfos são asyncio.Lock, em vez de uma thread do sistema por filósofo.
+
+Todas as corrotinas rodam em uma única thread, sem trocas de contexto do
+sistema operacional, e cada filósofo custa só alguns KB de memória. Assim
+dá para ter mais de 100 mil filósofos à mesa em um único núcleo.
+
+As durações de pensar e comer são multiplicadas por time_scale, de forma
+que uma execução longa pode ser acelerada sem mudar as proporções. Uma
+única thread dá conta de algo como 15 a 20 mil refeições por segundo; se a
+mesa pede mais que isso, os timers atrasam e a execução mede o loop, não a
+estratégia. Por isso a escala padrão cresce com a mesa (default_time_scale)
+e o resultado traz o atraso do loop.
+"""
+import argparse
+import asyncio
+import gc
+import time
+from array import array
+
+from metricas import MetricsCollector, format_summary
+from estrategias import get_strategy
+from simulacao_eventos import THINK_TIME, EAT_TIME, PENSANDO, COM_FOME, COMENDO
+from perfis_carga import PROFILES, get_profile, profile_from_timings
+from painel_metricas import RollingWindow, MetricsServer
+
+# Estratégias que este runtime sabe executar com primitivas do asyncio
+SIM_TYPES = ("deadlock_lento", "deadlock_rapido", "solucao_hierarquia", "solucao_garcom")
+# Atraso do loop que ainda é só a granularidade dos timers, em segundos
+LAG_FLOOR = 0.005
+
+
+def default_time_scale(num_philosophers):
+    """
+    Escala em que a mesa não satura o loop: 0.01 até mil filósofos e tempos
+    reais (1.0) com 100 mil, quando cada um come uma vez a cada ~5s.
+    """
+    return max(0.01, num_philosophers / 100_000)
+
+
+class AsyncBarrier:
+    """Barreira reutilizável para corrotinas (equivalente a threading.Barrier)."""
+    def __init__(self, parties):
+        self.parties = parties
+        self._count = 0
+        self._event = asyncio.Event()
+
+    async def wait(self):
+        event = self._event
+        self._count += 1
+        if self._count == self.parties:
+            # Último a chegar libera todos e prepara a próxima rodada
+            self._count = 0
+            self._event = asyncio.Event()
+            event.set()
+        else:
+            await event.wait()
+
+
+class AsyncTable:
+    """
+    Mesa compartilhada pelas corrotinas. Guarda os garfos, o garçom ou a
+    barreira da estratégia escolhida e o estado de cada filósofo em arrays.
+    Deve ser criada dentro do loop de eventos que vai executá-la.
+    """
+    def __init__(self, sim_type, num_philosophers=5, seed=None, time_scale=None, **kwargs):
+        if sim_type not in SIM_TYPES:
+            raise ValueError(f"Tipo de simulação desconhecido: {sim_type}")
+        if num_philosophers < 2:
+            raise ValueError("A mesa precisa de pelo menos 2 filósofos")
+        self.sim_type = sim_type
+        self.num_philosophers = n = num_philosophers
+        self.seed = seed
+        self.time_scale = default_time_scale(n) if time_scale is None else time_scale
+        # Perfil de carga (perfis_carga.py), ou intervalos e funções do gerador
+        self.workload = kwargs.get('workload') or profile_from_timings(
+            n, kwargs.get('think_time', THINK_TIME), kwargs.get('eat_time', EAT_TIME), seed=seed)
+
+        # Ordem dos garfos e pausa entre eles vêm do registro de estratégias
+        self.strategy = get_strategy(sim_type)(n, **kwargs)
+        self.sleep_between_forks = self.strategy.sleep_between_forks
+        self.forks = [asyncio.Lock() for _ in range(n)]
+        self.waiter = asyncio.Lock() if sim_type == "solucao_garcom" else None
+        self.barrier = AsyncBarrier(n) if sim_type == "deadlock_rapido" else None
+
+        self.status = array('b', [PENSANDO]) * n
+        self.fork_count = array('b', [0]) * n
+        self.meals = array('q', [0]) * n
+        self.total_meals = 0
+        # Filósofos parados no segundo garfo segurando o primeiro
+        self.blocked_on_second = 0
+        # Coletor de métricas opcional (metricas.MetricsCollector)
+        self.metrics = kwargs.get('metrics')
+        self.running = True
+        self.max_meals = None
+        self._deadline = float('inf')
+
+    def is_deadlocked(self):
+        return self.blocked_on_second == self.num_philosophers
+
+    async def _sleep(self, seconds):
+        await asyncio.sleep(seconds * self.time_scale)
+
+    async def _acquire_first(self, p_id, first, first_idx):
+        if first.locked() and self.metrics:
+            self.metrics.on_fork_contended(p_id, first_idx)
+        await first.acquire(); self.fork_count[p_id] = 1
+
+    async def _acquire_second(self, p_id, second, second_idx):
+        if second.locked():
+            if self.metrics: self.metrics.on_fork_contended(p_id, second_idx)
+            self.blocked_on_second += 1
+            # Na mesa em anel, o deadlock é todos segurando um garfo e
+            # esperando o outro: quem fecha o ciclo encerra a execução
+            if self.blocked_on_second == self.num_philosophers: self._finish(deadlock=True)
+            try: await second.acquire()
+            finally: self.blocked_on_second -= 1
+        else:
+            await second.acquire()
+        self.fork_count[p_id] = 2
+
+    async def _pickup_forks(self, p_id, first_idx, second_idx):
+        m = self.metrics
+        first, second = self.forks[first_idx], self.forks[second_idx]
+        if self.waiter:
+            if m: m.on_waiter_enter(p_id)
+            async with self.waiter:
+                if m: m.on_waiter_leave(p_id)
+                await self._acquire_first(p_id, first, first_idx)
+                if m: m.on_fork_acquired(p_id, first_idx)
+                await self._acquire_second(p_id, second, second_idx)
+                if m: m.on_fork_acquired(p_id, second_idx)
+        else:
+            if self.barrier:
+                await self.barrier.wait()
+            await self._acquire_first(p_id, first, first_idx)
+            if m: m.on_fork_acquired(p_id, first_idx)
+            if self.sleep_between_forks:
+                await asyncio.sleep(self.sleep_between_forks * self.time_scale)
+            await self._acquire_second(p_id, second, second_idx)
+            if m: m.on_fork_acquired(p_id, second_idx)
+
+    async def philosopher(self, p_id):
+        """Corrotina com o mesmo ciclo de ControllablePhilosopher.run."""
+        first_idx, second_idx = self.strategy.fork_order(p_id)
+        first, second = self.forks[first_idx], self.forks[second_idx]
+        m = self.metrics
+        clock = time.perf_counter
+        # Depois do fim, cada um para no próximo passo em vez de seguir
+        # ocupando o loop até ser cancelado. O prazo também é conferido aqui:
+        # com o loop saturado, uma volta dele passa por quase todos os
+        # filósofos, e o timer da duração só dispararia depois dela
+        while self.running:
+            await self._sleep(self.workload.think(p_id))
+            if not self.running or clock() >= self._deadline: self._finish(); break
+            self.status[p_id] = COM_FOME
+            if m: m.on_status(p_id, "com fome")
+            await self._pickup_forks(p_id, first_idx, second_idx)
+            self.status[p_id] = COMENDO
+            if m: m.on_status(p_id, "comendo")
+            await self._sleep(self.workload.eat(p_id))
+            if not self.running or clock() >= self._deadline: self._finish(); break
+            second.release(); self.fork_count[p_id] = 1
+            if m: m.on_fork_released(p_id, second_idx)
+            first.release(); self.fork_count[p_id] = 0
+            if m: m.on_fork_released(p_id, first_idx)
+            self.status[p_id] = PENSANDO
+            if m: m.on_status(p_id, "pensando")
+            self.meals[p_id] += 1
+            self.total_meals += 1
+            if self.max_meals is not None and self.total_meals >= self.max_meals: self._finish()
+
+    def _finish(self, deadlock=False):
+        # Chamada pelo timer da duração, pela refeição que atinge max_meals ou
+        # pelo filósofo que fecha o deadlock: o fim vale a partir daqui, e não
+        # de quando o loop voltar a olhar
+        self.running = False
+        if not self._stop.done():
+            self._end = time.perf_counter()
+            self._stop.set_result(deadlock)
+
+    def lag_budget(self):
+        """
+        Atraso médio do loop a partir do qual os tempos deixam de ser os da
+        estratégia: 10% do tempo médio de pensar, e nunca menos que
+        LAG_FLOOR, que é a folga normal dos timers.
+        """
+        think, _ = self.workload.mean_times()
+        return max(LAG_FLOOR, 0.1 * think * self.time_scale)
+
+    async def _probe_lag(self, interval):
+        # Atraso do loop: quanto um timer dispara depois da hora marcada. Com
+        # atraso alto, a mesa está limitada pelo loop e não pelos tempos
+        loop = asyncio.get_running_loop()
+        while True:
+            due = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = loop.time() - due
+            self.max_lag = max(self.max_lag, lag)
+            self._lag_total += lag; self._lag_samples += 1
+
+    async def run(self, max_meals=None, duration=None, lag_interval=0.1, pause_gc=False):
+        """
+        Executa até max_meals refeições, até duration segundos reais ou até
+        todos ficarem presos em deadlock. A duração conta a partir de quando
+        todos os filósofos estão sentados; preparar e desmontar a mesa
+        aparecem à parte em 'setup_time' e 'teardown_time'. Com pause_gc, os
+        objetos da mesa ficam fora das coletas do gc durante a execução.
+        """
+        if max_meals is None and duration is None:
+            raise ValueError("Informe max_meals ou duration")
+        if max_meals is not None and max_meals <= 0:
+            raise ValueError("max_meals deve ser positivo")
+        loop = asyncio.get_running_loop()
+        self.max_meals = max_meals
+        self._stop = loop.create_future()
+        self.max_lag, self._lag_total, self._lag_samples = 0.0, 0.0, 0
+        setup_start = time.perf_counter()
+        tasks, timer, frozen = [], None, False
+        try:
+            tasks.extend(loop.create_task(self.philosopher(i)) for i in range(self.num_philosophers))
+            tasks.append(loop.create_task(self._probe_lag(lag_interval)))
+            # O coletor de ciclos percorre todas as corrotinas, garfos e timers
+            # a cada coleta: com 100 mil filósofos isso atrasa o loop em até 1s.
+            # gc.freeze tira da coleta o que já existe depois de montar a mesa,
+            # sem desligar o coletor para as outras mesas do processo
+            if pause_gc:
+                gc.freeze(); frozen = True
+            start = time.perf_counter()
+            if duration is not None:
+                self._deadline = start + duration
+                timer = loop.call_later(duration, self._finish)
+            deadlock = await self._stop
+        finally:
+            if timer: timer.cancel()
+            teardown_start = time.perf_counter()
+            for t in tasks:
+                t.cancel()
+            if tasks: await asyncio.wait(tasks)
+            if frozen: gc.unfreeze()
+        mean_lag = self._lag_total / self._lag_samples if self._lag_samples else 0.0
+        r = {
+            'sim_type': self.sim_type,
+            'num_philosophers': self.num_philosophers,
+            'seed': self.seed,
+            'time_scale': self.time_scale,
+            'wall_time': self._end - start,
+            'setup_time': start - setup_start,
+            'teardown_time': time.perf_counter() - teardown_start,
+            'total_meals': self.total_meals,
+            'meals': self.meals.tolist(),
+            'deadlock': deadlock,
+            'deadlock_time': self._end - start if deadlock else None,
+            'max_loop_lag': self.max_lag,
+            'mean_loop_lag': mean_lag,
+            'loop_saturated': mean_lag > self.lag_budget(),
+        }
+        if self.metrics:
+            r['metrics'] = self.metrics.summary()
+        return r
+
+
+def run_simulation(sim_type, num_philosophers=5, max_meals=None, duration=None, pause_gc=False, **kwargs):
+    """Cria uma mesa em um loop de eventos novo e a executa até o fim."""
+    async def _main():
+        table = AsyncTable(sim_type, num_philosophers, **kwargs)
+        return await table.run(max_meals=max_meals, duration=duration, pause_gc=pause_gc)
+    return asyncio.run(_main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulação do Jantar dos Filósofos com corrotinas asyncio.")
+    parser.add_argument("sim_type", choices=SIM_TYPES)
+    parser.add_argument("--filosofos", type=int, default=5, help="número de filósofos na mesa")
+    parser.add_argument("--refeicoes", type=int, default=None, help="número de refeições a simular")
+    parser.add_argument("--duracao", type=float, default=None, help="tempo real máximo, em segundos")
+    parser.add_argument("--escala", type=float, default=None,
+                        help="fator aplicado aos tempos de pensar e comer (padrão: 0.01, ou filósofos/100000 em mesas maiores)")
+    parser.add_argument("--semente", type=int, default=None, help="semente do gerador aleatório")
+    parser.add_argument("--carga", choices=PROFILES, default="uniforme", help="perfil dos tempos de pensar e comer")
+    parser.add_argument("--carga-registro", default=None, help="registro de eventos repetido pelo perfil 'registro'")
+    parser.add_argument("--metricas", type=int, default=None, metavar="PORTA",
+                        help="publica as métricas no formato do Prometheus em http://127.0.0.1:PORTA/metrics")
+    parser.add_argument("--congelar-gc", action="store_true",
+                        help="tira os objetos da mesa das coletas do gc durante a execução (mesas grandes)")
+    args = parser.parse_args()
+    if args.refeicoes is None and args.duracao is None:
+        args.duracao = 5.0
+
+    options = {'path': args.carga_registro} if args.carga_registro else {}
+    workload = get_profile(args.carga)(args.filosofos, seed=args.semente, **options)
+
+    metrics = MetricsCollector(args.filosofos)
+    server = None
+    if args.metricas is not None:
+        window = RollingWindow(metrics, args.sim_type)
+        server = MetricsServer(lambda: window, args.metricas)
+        print(f"Métricas em http://127.0.0.1:{server.port}/metrics")
+    try:
+        r = run_simulation(args.sim_type, args.filosofos, max_meals=args.refeicoes, duration=args.duracao,
+                           seed=args.semente, time_scale=args.escala, workload=workload, metrics=metrics,
+                           pause_gc=args.congelar_gc)
+    finally:
+        if server: server.close()
+
+    print(f"Estratégia: {r['sim_type']} | Filósofos: {r['num_philosophers']} | Carga: {workload.describe()}")
+    meals = r['meals']
+    if len(meals) <= 10:
+        print(f"Refeições: {r['total_meals']} {meals}")
+    else:
+        print(f"Refeições: {r['total_meals']} (mín {min(meals)}, máx {max(meals)} por filósofo)")
+    print(f"Tempo real: {r['wall_time']:.2f}s (escala {r['time_scale']:g}) | "
+          f"Preparação: {r['setup_time']:.2f}s | Desmontagem: {r['teardown_time']:.2f}s")
+    print(f"Atraso do loop: médio {r['mean_loop_lag'] * 1000:.1f}ms, máx {r['max_loop_lag'] * 1000:.1f}ms")
+    if r['loop_saturated']:
+        print("Aviso: o loop está saturado e os tempos medidos são do loop, não da estratégia; aumente --escala")
+    # summary() divide pelo intervalo entre o primeiro e o último evento
+    # registrado; a vazão da execução é sobre o tempo medido em 'wall_time'
+    summary = dict(r['metrics'], meals_per_second=r['total_meals'] / r['wall_time'] if r['wall_time'] else 0.0)
+    print(format_summary(summary))
+    if r['deadlock']:
+        print(f"DEADLOCK em t={r['deadlock_time']:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,531 @@
+"""
+Simulação do Jantar dos Filósofos por eventos discretos, sem interface gráfica.
+
+Em vez de uma thread por filósofo e chamadas a time.sleep, o motor mantém um
+relógio virtual e uma fila de prioridade de eventos. Cada evento avança o
+relógio direto para o próximo instante interessante, então milhares de
+refeições são simuladas em frações de segundo. O gerador aleatório aceita uma
+semente, de modo que uma execução pode ser reproduzida exatamente.
+
+Todas as estratégias registradas em estrategias.py são suportadas; o
+motor oferece as operações sobre garfos e a estratégia decide a ordem.
+Com uma topologia (topologias.py), a mesa deixa de ser um anel: cada
+filósofo pode precisar de qualquer conjunto de recursos, e as estratégias
+com 'general_topology' pegam todos eles na ordem que escolherem.
+"""
+import argparse
+import heapq
+import random
+import time
+from array import array
+from collections import deque
+
+from metricas import MetricsCollector, format_summary
+from detector_deadlock import WaitForGraph
+from estrategias import STRATEGIES, get_strategy
+from registro_eventos import EventLogWriter, EV_FORK_TAKEN, EV_FORK_RELEASED
+from perfis_carga import PROFILES, get_profile, profile_from_timings
+from recuperacao_deadlock import DeadlockRecovery, Candidate, VICTIM_POLICIES
+from topologias import TOPOLOGIES, get_topology, topology_options
+from salvamento import report_save, run_with_checkpoints
+
+SIM_TYPES = tuple(STRATEGIES)
+
+# Mesmos intervalos usados em ControllablePhilosopher.run
+THINK_TIME = (1, 3)
+EAT_TIME = (2, 4)
+
+# Códigos de estado guardados nos arrays (índice em STATUS_NAMES)
+PENSANDO, COM_FOME, COMENDO = 0, 1, 2
+STATUS_NAMES = ("pensando", "com fome", "comendo")
+
+# Marca de "ninguém" nos arrays de donos e de espera dos garfos
+FREE = -1
+
+# Tipos de evento da fila de prioridade
+EV_HUNGRY = 0        # terminou de pensar
+EV_TIMER = 1         # temporizador da estratégia (pausa entre garfos, recuo)
+EV_GRANTED = 2       # recebeu um garfo (ou o garçom) que estava esperando
+EV_DONE_EATING = 3   # terminou de comer
+EV_RETRY = 4         # vítima de deadlock terminou o recuo e tenta de novo
+
+
+class DiscreteEventSimulation:
+    """
+    Executa uma estratégia com relógio virtual. O estado de cada filósofo
+    segue as mesmas transições de ControllablePhilosopher:
+    pensando -> com fome -> comendo -> pensando.
+
+    O estado da mesa fica em arrays compactos (códigos de estado, dono e
+    espera de cada garfo, contadores de refeições), sem um objeto por
+    filósofo, o que permite mesas com dezenas de milhares de lugares.
+
+    'topology' (topologias.Topology) troca o anel por outra mesa; a ordem
+    de aquisição de cada filósofo é calculada uma vez, então pegar e
+    largar custam O(recursos do filósofo).
+    """
+    def __init__(self, sim_type, num_philosophers=5, seed=None, **kwargs):
+        if num_philosophers < 2:
+            raise ValueError("A mesa precisa de pelo menos 2 filósofos")
+        self.sim_type = sim_type
+        self.num_philosophers = n = num_philosophers
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # Perfil de carga (perfis_carga.py) que sorteia os tempos em lotes;
+        # sem ele, think_time e eat_time são intervalos ou funções do gerador
+        self.workload = kwargs.get('workload') or profile_from_timings(
+            n, kwargs.get('think_time', THINK_TIME), kwargs.get('eat_time', EAT_TIME), seed=seed)
+
+        # A estratégia decide como os garfos são pedidos e liberados
+        self.strategy = get_strategy(sim_type)(n, rng=self.rng, **kwargs)
+        self.sleep_between_forks = self.strategy.sleep_between_forks
+        # None é o anel, também quando a topologia pedida é 'anel'
+        self.topology = self.strategy.topology
+        if self.topology is not None and self.topology.num_philosophers != n:
+            raise ValueError("A topologia tem outro número de filósofos")
+        self.ring = self.topology is None
+        # Poucos atributos por instância: passar de ~30 deixa o acesso a
+        # eles (e o laço principal) uns 10% mais lento no CPython 3.11
+        if self.ring:
+            # Ordem de aquisição: primeiro e segundo garfo de cada filósofo
+            num_forks = n
+            self.first_fork = array('i', [0]) * n
+            self.second_fork = array('i', [0]) * n
+            for i in range(n):
+                self.first_fork[i], self.second_fork[i] = self.strategy.fork_order(i)
+        else:
+            # Ordem de aquisição de todos, em um array só: os garfos de p_id
+            # são order[order_start[p_id]:order_start[p_id + 1]], em ordem
+            num_forks = self.topology.num_resources
+            self.order_start = array('i', [0]) * (n + 1)
+            self.order = array('i')
+            for i in range(n):
+                self.order.extend(self.strategy.resource_order(i))
+                self.order_start[i + 1] = len(self.order)
+
+        self.clock = 0.0
+        self._events = []
+        self._seq = 0
+
+        self.status = array('b', [PENSANDO]) * n
+        self.fork_count = array('b', [0]) * n
+        self.meals = array('q', [0]) * n
+        self.fork_holder = array('i', [FREE]) * num_forks
+        # No anel e nos grafos cada garfo é disputado só pelos dois
+        # vizinhos, então basta um lugar de espera por garfo; num conjunto
+        # de recursos, os demais esperam em fila (garfo -> deque)
+        self.fork_waiter = array('i', [FREE]) * num_forks
+        self.fork_queue = None if self.ring or self.topology.is_graph else {}
+
+        self.total_meals = 0
+        self.deadlock_time = None
+        # Coletor de métricas opcional (metricas.MetricsCollector)
+        self.metrics = kwargs.get('metrics')
+        # Detector opcional (detector_deadlock.WaitForGraph); sem ele, o
+        # deadlock só é percebido quando a fila de eventos esvazia
+        self.detector = kwargs.get('detector')
+        # Registro binário opcional (registro_eventos.EventLogWriter), gravado
+        # com o relógio virtual
+        self.event_log = kwargs.get('event_log')
+        # Recuperação opcional (recuperacao_deadlock.DeadlockRecovery): cada
+        # ciclo encontrado pelo detector desfaz uma vítima e a simulação segue
+        self.recovery = kwargs.get('recovery')
+        if self.recovery and not self.detector:
+            self.detector = WaitForGraph(metrics=self.metrics)
+        self._handled_deadlocks = 0
+        # Instante em que cada um ficou com fome e em que cada garfo foi pego,
+        # para a política de escolha da vítima
+        self.hungry_at = array('d', [0.0]) * n
+        self.fork_taken_at = array('d', [0.0]) * num_forks
+
+        self.strategy.setup_events(self)
+        for p_id in range(n):
+            self._schedule(self.workload.think(p_id), EV_HUNGRY, p_id)
+
+    def __getstate__(self):
+        # Checkpoint (salvamento.py): o registro de eventos é um arquivo
+        # aberto neste processo e não vai junto
+        state = self.__dict__.copy()
+        state['event_log'] = None
+        return state
+
+    # ---- Fila de eventos ----
+
+    def _schedule(self, delay, kind, p_id):
+        self._seq += 1
+        heapq.heappush(self._events, (self.clock + delay, self._seq, kind, p_id))
+
+    def grant(self, p_id):
+        """Avisa o filósofo (no mesmo instante) que recebeu o que esperava."""
+        self._schedule(0, EV_GRANTED, p_id)
+
+    def set_timer(self, delay, p_id):
+        """Chama strategy.on_timer para o filósofo depois de 'delay' segundos."""
+        self._schedule(delay, EV_TIMER, p_id)
+
+    # ---- Garfos (usados pelas estratégias) ----
+
+    def forks_of(self, p_id):
+        """Garfos do filósofo, na ordem de aquisição."""
+        if self.ring:
+            return self.first_fork[p_id], self.second_fork[p_id]
+        return self.order[self.order_start[p_id]:self.order_start[p_id + 1]]
+
+    def is_free(self, fork):
+        return self.fork_holder[fork] == FREE
+
+    def is_hungry(self, p_id):
+        return self.status[p_id] == COM_FOME
+
+    def is_eating(self, p_id):
+        return self.status[p_id] == COMENDO
+
+    def take_fork(self, p_id, fork):
+        self.fork_holder[fork] = p_id
+        self.fork_taken_at[fork] = self.clock
+        self.fork_count[p_id] += 1
+        if self.metrics:
+            self.metrics.on_fork_acquired(p_id, fork, self.clock)
+        if self.detector:
+            self.detector.on_acquire(p_id, fork, self.clock)
+        if self.event_log:
+            self.event_log.record(p_id, EV_FORK_TAKEN, fork, self.clock)
+
+    def wait_fork(self, p_id, fork):
+        if self.fork_queue is None or self.fork_waiter[fork] in (FREE, p_id):
+            self.fork_waiter[fork] = p_id
+        else:
+            queue = self.fork_queue.setdefault(fork, deque())
+            if p_id not in queue:
+                queue.append(p_id)
+        if self.metrics:
+            self.metrics.on_fork_contended(p_id, fork, self.clock)
+        if self.detector:
+            self.detector.on_request(p_id, fork, self.clock)
+
+    def _next_waiter(self, fork):
+        """Passa a vez de esperar o garfo para o próximo da fila, se houver."""
+        queue = self.fork_queue.get(fork) if self.fork_queue is not None else None
+        self.fork_waiter[fork] = queue.popleft() if queue else FREE
+
+    def release_fork(self, p_id, fork):
+        """Larga o garfo; se o vizinho o esperava, entrega direto a ele."""
+        self.fork_count[p_id] -= 1
+        if self.metrics:
+            self.metrics.on_fork_released(p_id, fork, self.clock)
+        if self.detector:
+            self.detector.on_release(p_id, fork, self.clock)
+        if self.event_log:
+            self.event_log.record(p_id, EV_FORK_RELEASED, fork, self.clock)
+        q = self.fork_waiter[fork]
+        if q != FREE:
+            if self.fork_queue is not None:
+                self._next_waiter(fork)
+            else:
+                self.fork_waiter[fork] = FREE
+            self.take_fork(q, fork)
+            self.grant(q)
+        else:
+            self.fork_holder[fork] = FREE
+
+    def transfer_fork(self, from_id, to_id, fork):
+        """Passa o garfo de um dono para outro sem que ele fique livre."""
+        self.fork_count[from_id] -= 1
+        if self.metrics:
+            self.metrics.on_fork_released(from_id, fork, self.clock)
+        if self.detector:
+            self.detector.on_release(from_id, fork, self.clock)
+        if self.event_log:
+            self.event_log.record(from_id, EV_FORK_RELEASED, fork, self.clock)
+        if self.fork_waiter[fork] == to_id:
+            self._next_waiter(fork)
+        self.take_fork(to_id, fork)
+
+    def release_all(self, p_id):
+        """Larga todos os garfos do filósofo, do último pego ao primeiro."""
+        order, start = self.order, self.order_start[p_id]
+        for i in range(self.order_start[p_id + 1] - 1, start - 1, -1):
+            self.release_fork(p_id, order[i])
+
+    # ---- Sequência padrão: primeiro garfo, pausa, segundo garfo ----
+
+    def acquire_first(self, p_id):
+        fork = self.first_fork[p_id] if self.ring else self.order[self.order_start[p_id]]
+        if self.fork_holder[fork] == FREE:
+            self.take_fork(p_id, fork)
+            self.got_first(p_id)
+        else:
+            self.wait_fork(p_id, fork)
+
+    def got_first(self, p_id):
+        if self.sleep_between_forks:
+            self.set_timer(self.sleep_between_forks, p_id)
+        else:
+            self.acquire_second(p_id)
+
+    def acquire_second(self, p_id):
+        if self.ring:
+            fork = self.second_fork[p_id]
+            if self.fork_holder[fork] == FREE:
+                self.take_fork(p_id, fork)
+                self.start_eating(p_id)
+            else:
+                self.wait_fork(p_id, fork)
+            return
+        # Do segundo garfo em diante, parando no primeiro ocupado; o número
+        # de garfos na mão diz onde recomeçar
+        i, end = self.order_start[p_id] + self.fork_count[p_id], self.order_start[p_id + 1]
+        while i < end:
+            fork = self.order[i]
+            if self.fork_holder[fork] != FREE:
+                self.wait_fork(p_id, fork)
+                return
+            self.take_fork(p_id, fork)
+            i += 1
+        self.start_eating(p_id)
+
+    # ---- Transições dos filósofos ----
+
+    def _become_hungry(self, p_id):
+        self.status[p_id] = COM_FOME
+        self.hungry_at[p_id] = self.clock
+        if self.metrics:
+            self.metrics.on_status(p_id, "com fome", self.clock)
+        if self.event_log:
+            self.event_log.record(p_id, COM_FOME, now=self.clock)
+        self.strategy.on_hungry(self, p_id)
+
+    def start_eating(self, p_id):
+        self.status[p_id] = COMENDO
+        if self.metrics:
+            self.metrics.on_status(p_id, "comendo", self.clock)
+        if self.event_log:
+            self.event_log.record(p_id, COMENDO, now=self.clock)
+        self.strategy.on_eating(self, p_id)
+        self._schedule(self.workload.eat(p_id), EV_DONE_EATING, p_id)
+
+    def _finish_eating(self, p_id):
+        self.status[p_id] = PENSANDO
+        self.strategy.on_done_eating(self, p_id)
+        if self.metrics:
+            self.metrics.on_status(p_id, "pensando", self.clock)
+        if self.event_log:
+            self.event_log.record(p_id, PENSANDO, now=self.clock)
+        self.meals[p_id] += 1
+        self.total_meals += 1
+        self._schedule(self.workload.think(p_id), EV_HUNGRY, p_id)
+
+    # ---- Execução ----
+
+    def step(self):
+        """Processa o próximo evento. Retorna False se não há mais eventos."""
+        if not self._events:
+            return False
+        t, _, kind, p_id = heapq.heappop(self._events)
+        self.clock = t
+        if kind == EV_HUNGRY:
+            self._become_hungry(p_id)
+        elif kind == EV_TIMER:
+            self.strategy.on_timer(self, p_id)
+        elif kind == EV_GRANTED:
+            self.strategy.on_granted(self, p_id)
+        elif kind == EV_DONE_EATING:
+            self._finish_eating(p_id)
+        elif kind == EV_RETRY:
+            self.strategy.on_hungry(self, p_id)
+        return True
+
+    # ---- Recuperação de deadlock ----
+
+    def _held_forks(self, p_id):
+        return [f for f in reversed(self.forks_of(p_id)) if self.fork_holder[f] == p_id]
+
+    def _recover(self, report):
+        """Escolhe a vítima do ciclo, desfaz a tentativa dela e agenda o recuo."""
+        waiting = self.detector.waiting_for
+        candidates = [
+            Candidate(p, self.hungry_at[p], self.meals[p],
+                      sum(self.clock - self.fork_taken_at[f] for f in self._held_forks(p)))
+            for p in report.philosophers if p in waiting
+        ]
+        # Outra vítima do mesmo ciclo já pode tê-lo desfeito
+        if not candidates:
+            return
+        victim = self.recovery.choose(candidates)
+        self.rollback(victim)
+
+    def rollback(self, p_id):
+        """A vítima desiste da espera e larga os garfos; continua com fome."""
+        for fork in self.forks_of(p_id):
+            if self.fork_waiter[fork] == p_id:
+                self._next_waiter(fork)
+            elif self.fork_queue and p_id in self.fork_queue.get(fork, ()):
+                self.fork_queue[fork].remove(p_id)
+        self.detector.on_cancel(p_id, self.clock)
+        lost = 0.0
+        for fork in self._held_forks(p_id):
+            lost += self.clock - self.fork_taken_at[fork]
+            self.release_fork(p_id, fork)
+        self.recovery.on_rollback(p_id, lost, self.clock)
+        self._schedule(self.recovery.backoff(), EV_RETRY, p_id)
+
+    def run(self, max_meals=None, max_time=None):
+        """
+        Executa até atingir max_meals refeições, o tempo virtual max_time
+        ou um deadlock (fila de eventos vazia com filósofos esperando).
+        Pode ser chamado de novo para continuar, exceto depois do deadlock.
+        """
+        if max_meals is None and max_time is None:
+            raise ValueError("Informe max_meals ou max_time")
+        wall_start = time.perf_counter()
+        if self.deadlock_time is not None:
+            return self.results(0.0)
+        while True:
+            if max_meals is not None and self.total_meals >= max_meals:
+                break
+            if max_time is not None and self._events and self._events[0][0] > max_time:
+                self.clock = max_time
+                break
+            if not self.step():
+                # Ninguém pode progredir: todos estão presos esperando
+                self.deadlock_time = self.clock
+                break
+            if self.detector and len(self.detector.deadlocks) > self._handled_deadlocks:
+                # O ciclo foi encontrado no instante em que se formou
+                report = self.detector.deadlocks[self._handled_deadlocks]
+                self._handled_deadlocks += 1
+                if self.event_log:
+                    self.event_log.record_deadlock(report)
+                if self.recovery:
+                    self._recover(report)
+                    # Só o primeiro relatório fica guardado; numa execução
+                    # longa podem ser milhares de ciclos desfeitos
+                    if self._handled_deadlocks == len(self.detector.deadlocks) > 1:
+                        del self.detector.deadlocks[1:]
+                        self._handled_deadlocks = 1
+                    continue
+                self.deadlock_time = report.time
+                break
+        return self.results(time.perf_counter() - wall_start)
+
+    def results(self, wall_time=0.0):
+        r = {
+            'sim_type': self.sim_type,
+            'num_philosophers': self.num_philosophers,
+            'topology': self.topology.name if self.topology else "anel",
+            'seed': self.seed,
+            'virtual_time': self.clock,
+            'wall_time': wall_time,
+            'total_meals': self.total_meals,
+            'meals': self.meals.tolist(),
+            'deadlock': self.deadlock_time is not None,
+            'deadlock_time': self.deadlock_time,
+            'recoveries': self.recovery.recoveries if self.recovery else 0,
+        }
+        if self.detector and self.detector.deadlocks:
+            r['deadlock_cycle'] = self.detector.deadlocks[0].cycle
+        if self.metrics:
+            r['metrics'] = self.metrics.summary()
+        return r
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulação do Jantar dos Filósofos por eventos discretos (sem GUI).")
+    parser.add_argument("sim_type", choices=SIM_TYPES)
+    parser.add_argument("--filosofos", type=int, default=5, help="número de filósofos na mesa")
+    parser.add_argument("--refeicoes", type=int, default=None, help="número de refeições a simular")
+    parser.add_argument("--tempo", type=float, default=None, help="tempo virtual máximo, em segundos")
+    parser.add_argument("--semente", type=int, default=None, help="semente do gerador aleatório")
+    parser.add_argument("--registro", default=None, help="grava os eventos neste arquivo (registro_eventos.py)")
+    parser.add_argument("--alarme-fome", type=float, default=None,
+                        help="alarme de inanição após esta espera, em segundos")
+    parser.add_argument("--alarme-ultrapassagens", type=int, default=None,
+                        help="alarme de inanição após os vizinhos comerem esta quantidade de vezes durante a espera")
+    parser.add_argument("--recuperacao", choices=VICTIM_POLICIES, default=None,
+                        help="desfaz cada deadlock escolhendo uma vítima por esta política")
+    parser.add_argument("--carga", choices=PROFILES, default="uniforme", help="perfil dos tempos de pensar e comer")
+    parser.add_argument("--carga-registro", default=None, help="registro de eventos repetido pelo perfil 'registro'")
+    parser.add_argument("--topologia", choices=TOPOLOGIES, default="anel", help="quais recursos cada filósofo precisa")
+    parser.add_argument("--colunas", type=int, default=None, help="colunas da grade e do toro")
+    parser.add_argument("--grau", type=int, default=None, help="recursos por refeição (aleatoria, conjunto)")
+    parser.add_argument("--recursos", type=int, default=None, help="tamanho do conjunto de recursos")
+    parser.add_argument("--salvar", default=None, metavar="ARQUIVO",
+                        help="grava o estado da simulação para retomá-la depois (salvamento.py)")
+    parser.add_argument("--salvar-a-cada", type=float, default=None, metavar="SEGUNDOS",
+                        help="com --salvar, grava também a cada SEGUNDOS de tempo virtual")
+    args = parser.parse_args()
+    if args.refeicoes is None and args.tempo is None:
+        args.refeicoes = 10000
+    if args.salvar_a_cada is not None and (not args.salvar or args.salvar_a_cada <= 0):
+        parser.error("--salvar-a-cada precisa de --salvar e de um intervalo positivo")
+    try:
+        topology = get_topology(args.topologia)(args.filosofos, **topology_options(args))
+    except ValueError as e:
+        parser.error(str(e))
+    if args.registro and not topology.ring:
+        parser.error("o registro de eventos só grava mesas em anel")
+
+    metrics = MetricsCollector(args.filosofos, clock=None, starvation_age=args.alarme_fome,
+                               starvation_overtakes=args.alarme_ultrapassagens, num_forks=topology.num_resources)
+    if not topology.ring:
+        metrics.set_neighbors(topology.conflicts)
+    detector = WaitForGraph(metrics=metrics)
+    event_log = EventLogWriter(args.registro, args.filosofos, args.sim_type) if args.registro else None
+    options = {'path': args.carga_registro} if args.carga_registro else {}
+    workload = get_profile(args.carga)(args.filosofos, seed=args.semente, **options)
+    recovery = DeadlockRecovery(args.recuperacao, metrics=metrics, rng=random.Random(args.semente)) \
+        if args.recuperacao else None
+    try:
+        sim = DiscreteEventSimulation(args.sim_type, args.filosofos, seed=args.semente, workload=workload,
+                                      metrics=metrics, detector=detector, event_log=event_log, recovery=recovery,
+                                      topology=topology)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.salvar:
+        r = run_with_checkpoints(sim, args.salvar, args.salvar_a_cada, max_meals=args.refeicoes, max_time=args.tempo)
+    else:
+        r = sim.run(max_meals=args.refeicoes, max_time=args.tempo)
+    if event_log:
+        event_log.close()
+    print_report(sim, r)
+    if args.salvar:
+        report_save(args.salvar, r)
+
+
+def print_report(sim, r):
+    """Resumo de uma execução no terminal (também usado por salvamento.py)."""
+    metrics, detector, recovery = sim.metrics, sim.detector, sim.recovery
+    print(f"Estratégia: {r['sim_type']} | Carga: {sim.workload.describe()}")
+    if sim.topology is not None:
+        print(sim.topology.describe())
+    meals = r['meals']
+    if len(meals) <= 10:
+        print(f"Refeições: {r['total_meals']} {meals}")
+    else:
+        print(f"Refeições: {r['total_meals']} (mín {min(meals)}, máx {max(meals)} por filósofo)")
+    print(f"Tempo virtual: {r['virtual_time']:.2f}s | Tempo real: {r['wall_time']:.3f}s")
+    print(format_summary(r['metrics']))
+    m = r['metrics']
+    print(f"Espera máxima: {m['wait']['max']:.2f}s | Ultrapassagens máx.: {m['overtakes_max']} | "
+          f"Alarmes de inanição: {m['starvation_alarms']}")
+    for t, p_id, age, overtakes in metrics.starvation_alarms[:5]:
+        print(f"  t={t:.2f}s: F{p_id} com fome há {age:.2f}s, ultrapassado {overtakes} vez(es)")
+    if recovery:
+        print(f"Recuperações ({recovery.policy}): {m['recoveries']} | "
+              f"Tempo de garfo perdido: {m['recovery_lost_time']:.2f}s | Deadlocks: {m['deadlocks']}")
+    # O ciclo só é o fim da execução se ela terminou travada nele; os
+    # desfeitos pela recuperação já estão contados acima
+    if r['deadlock']:
+        last = detector.deadlocks[-1] if detector and detector.deadlocks else None
+        if last is not None and last.time == r['deadlock_time']:
+            print(last.describe())
+        else:
+            print(f"DEADLOCK em t={r['deadlock_time']:.2f}s")
+    elif detector and detector.deadlocks:
+        print(f"{detector.deadlocks[0].describe()} (o primeiro, recuperado)")
+
+if __name__ == "__main__":
+    # Pelo nome do módulo, e não como __main__: os checkpoints guardam as
+    # classes pelo módulo, e quem os carrega não tem este __main__
+    import simulacao_eventos
+    simulacao_eventos.main()
@@ -0,0 +1,269 @@
+"""
+Simulação do Jantar dos Filósofos dividida entre vários processos.
+
+A mesa é cortada em arcos contíguos de filósofos, um por processo. O estado
+dos garfos (quem está com cada um) e os contadores de refeições ficam em um
+bloco de multiprocessing.shared_memory, visível por todos os processos.
+
+Um garfo no meio de um arco só é usado por filósofos do mesmo processo, então
+é pego e largado com uma simples leitura e escrita no array. Só o garfo no
+início de cada arco, dividido com o último filósofo do arco anterior, é
+disputado entre processos; ele é protegido por um multiprocessing.Lock
+próprio. Fora dessas fronteiras os processos não se coordenam, e a vazão
+cresce com o número de núcleos.
+
+Cada processo avança seus filósofos em passos (ticks), sem sleep: pensar e
+comer duram os tempos de um perfil de carga (perfis_carga.py) convertidos em
+passos. Por isso a medida é de refeições por segundo de relógio real,
+limitada só pela CPU.
+
+Exemplo (compara 1, 2 e 4 processos na mesma mesa):
+    python3 simulacao_multiprocesso.py --filosofos 200000 --processos 1 2 4 --duracao 5
+"""
+import argparse
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+from estrategias import get_strategy
+from perfis_carga import PROFILES, get_profile
+
+# Estratégias sem bloqueio que este modo sabe executar: a hierarquia segura
+# o primeiro garfo até conseguir o segundo; a tentativa pega os dois ou nenhum
+SIM_TYPES = ("solucao_hierarquia", "tentativa_recuo")
+
+# Passos por segundo dos tempos do perfil de carga (no perfil uniforme,
+# 10-30 passos pensando e 20-40 comendo)
+TICKS_PER_SECOND = 10
+
+PENSANDO, COM_FOME, COMENDO = 0, 1, 2
+FREE = -1
+# Estatísticas de cada processo no bloco compartilhado
+STATS = ('sweeps', 'boundary_conflicts')
+
+
+def split_arcs(num_philosophers, processes):
+    """Divide 0..n-1 em 'processes' arcos contíguos de tamanhos parecidos."""
+    bounds = [num_philosophers * k // processes for k in range(processes + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+class SharedTable:
+    """
+    Bloco de memória compartilhada com as refeições (int64), as estatísticas
+    dos processos (int64) e o dono de cada garfo (int32), nessa ordem para
+    manter o alinhamento de cada array.
+    """
+    def __init__(self, num_philosophers, processes, name=None):
+        self.num_philosophers = n = num_philosophers
+        self.processes = processes
+        self._stats_offset = 8 * n
+        self._holder_offset = self._stats_offset + 8 * len(STATS) * processes
+        size = self._holder_offset + 4 * n
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        buf = self.shm.buf
+        self.meals = buf[:self._stats_offset].cast('q')
+        self.stats = buf[self._stats_offset:self._holder_offset].cast('q')
+        self.fork_holder = buf[self._holder_offset:size].cast('i')
+        if self.owner:
+            for i in range(n):
+                self.meals[i] = 0
+                self.fork_holder[i] = FREE
+            for i in range(len(self.stats)):
+                self.stats[i] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        # As views precisam ser liberadas antes de fechar o bloco
+        for view in (self.meals, self.stats, self.fork_holder):
+            view.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _worker(shm_name, num_philosophers, processes, worker, arc, boundary_locks,
+            sim_type, duration, seed, workload, workload_options):
+    """Executa os filósofos de um arco até o fim do tempo."""
+    table = SharedTable(num_philosophers, processes, name=shm_name)
+    try:
+        # Cada processo sorteia os próprios lotes, com a semente do processo
+        profile = get_profile(workload)(num_philosophers, seed=seed, scale=TICKS_PER_SECOND, **workload_options)
+        _run_arc(table, worker, arc, boundary_locks, sim_type, duration, profile)
+    finally:
+        table.close()
+
+
+def _run_arc(table, worker, arc, boundary_locks, sim_type, duration, profile):
+    start, end = arc
+    holder, meals = table.fork_holder, table.meals
+    think, eat = profile.think, profile.eat
+    strategy = get_strategy(sim_type)(table.num_philosophers)
+    all_or_nothing = sim_type == "tentativa_recuo"
+
+    size = end - start
+    first, second, first_lock, second_lock = [], [], [], []
+    for p_id in range(start, end):
+        a, b = strategy.fork_order(p_id)
+        first.append(a); second.append(b)
+        first_lock.append(boundary_locks.get(a)); second_lock.append(boundary_locks.get(b))
+    state = [PENSANDO] * size
+    # Tempos em passos; um filósofo nunca fica menos de um passo em um estado
+    timer = [think(p_id) for p_id in range(start, end)]
+    has_first = [False] * size
+    # Conflito é um período de fome em que o filósofo esbarrou em um garfo
+    # de fronteira ocupado, e não cada passo que ele passa esperando
+    blocked = [False] * size
+    conflicts = 0
+
+    def claim(fork, p_id, lock):
+        # Garfo interno: só este processo escreve nele
+        if lock is None:
+            if holder[fork] == FREE:
+                holder[fork] = p_id
+                return True
+            return False
+        with lock:
+            if holder[fork] == FREE:
+                holder[fork] = p_id
+                return True
+        return False
+
+    def drop(fork, lock):
+        if lock is None:
+            holder[fork] = FREE
+        else:
+            with lock:
+                holder[fork] = FREE
+
+    sweeps = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        sweeps += 1
+        for i in range(size):
+            st = state[i]
+            if st == PENSANDO:
+                timer[i] -= 1
+                if timer[i] <= 0:
+                    state[i] = COM_FOME
+            elif st == COM_FOME:
+                p_id = start + i
+                if not has_first[i]:
+                    if not claim(first[i], p_id, first_lock[i]):
+                        if first_lock[i] is not None and not blocked[i]:
+                            blocked[i] = True; conflicts += 1
+                        continue
+                    has_first[i] = True
+                if claim(second[i], p_id, second_lock[i]):
+                    state[i] = COMENDO
+                    timer[i] = eat(p_id)
+                    blocked[i] = False
+                else:
+                    if second_lock[i] is not None and not blocked[i]:
+                        blocked[i] = True; conflicts += 1
+                    if all_or_nothing:
+                        drop(first[i], first_lock[i])
+                        has_first[i] = False
+            else:
+                timer[i] -= 1
+                if timer[i] <= 0:
+                    drop(second[i], second_lock[i])
+                    drop(first[i], first_lock[i])
+                    has_first[i] = False
+                    meals[start + i] += 1
+                    state[i] = PENSANDO
+                    timer[i] = think(start + i)
+
+    base = worker * len(STATS)
+    table.stats[base] = sweeps
+    table.stats[base + 1] = conflicts
+
+
+def run_partitioned(sim_type, num_philosophers, processes, duration=5.0, seed=0,
+                    workload="uniforme", workload_options=None):
+    """
+    Executa a mesa dividida em 'processes' arcos por 'duration' segundos e
+    devolve as refeições, a vazão e as estatísticas de cada processo.
+    'workload' é o nome de um perfil de perfis_carga e 'workload_options'
+    suas opções (como o caminho do perfil 'registro').
+    """
+    get_profile(workload)
+    if sim_type not in SIM_TYPES:
+        raise ValueError(f"Tipo de simulação desconhecido: {sim_type}")
+    if num_philosophers < 2:
+        raise ValueError("A mesa precisa de pelo menos 2 filósofos")
+    if not 1 <= processes <= num_philosophers:
+        raise ValueError("O número de processos deve estar entre 1 e o número de filósofos")
+    arcs = split_arcs(num_philosophers, processes)
+    # O garfo no início de cada arco é dividido com o arco anterior; com um
+    # único processo nenhum garfo é disputado
+    boundary_locks = {s: mp.Lock() for s, _ in arcs} if processes > 1 else {}
+
+    table = SharedTable(num_philosophers, processes)
+    try:
+        workers = [
+            mp.Process(target=_worker, args=(table.name, num_philosophers, processes, k, arc,
+                                             boundary_locks, sim_type, duration, seed + k,
+                                             workload, workload_options or {}))
+            for k, arc in enumerate(arcs)
+        ]
+        wall_start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        wall_time = time.perf_counter() - wall_start
+        failed = [w.exitcode for w in workers if w.exitcode]
+        if failed:
+            raise RuntimeError(f"Processos terminaram com erro: {failed}")
+
+        meals = table.meals.tolist()
+        stats = table.stats.tolist()
+    finally:
+        table.close()
+    total = sum(meals)
+    return {
+        'sim_type': sim_type,
+        'num_philosophers': num_philosophers,
+        'processes': processes,
+        'workload': workload,
+        'duration': duration,
+        'wall_time': wall_time,
+        'total_meals': total,
+        'meals_per_second': total / duration,
+        'min_meals': min(meals),
+        'max_meals': max(meals),
+        'workers': [dict(zip(STATS, stats[k * len(STATS):(k + 1) * len(STATS)])) for k in range(processes)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jantar dos Filósofos dividido entre vários processos.")
+    parser.add_argument("--estrategia", choices=SIM_TYPES, default="tentativa_recuo")
+    parser.add_argument("--filosofos", type=int, default=100000)
+    parser.add_argument("--processos", nargs="+", type=int, default=[1, mp.cpu_count()],
+                        help="um ou mais números de processos, para comparar a escala")
+    parser.add_argument("--duracao", type=float, default=5.0, help="segundos de execução por medida")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--carga", choices=PROFILES, default="uniforme", help="perfil dos tempos de pensar e comer")
+    parser.add_argument("--carga-registro", default=None, help="registro de eventos repetido pelo perfil 'registro'")
+    args = parser.parse_args()
+    options = {'path': args.carga_registro} if args.carga_registro else {}
+
+    baseline = None
+    print(f"Estratégia: {args.estrategia} | Filósofos: {args.filosofos} | Carga: {args.carga}")
+    for processes in args.processos:
+        r = run_partitioned(args.estrategia, args.filosofos, processes, args.duracao, args.semente,
+                            args.carga, options)
+        rate = r['meals_per_second']
+        baseline = baseline or rate
+        conflicts = sum(w['boundary_conflicts'] for w in r['workers'])
+        print(f"{processes:3d} processo(s): {rate:12.1f} refeições/s | "
+              f"x{rate / baseline:.2f} | conflitos na fronteira: {conflicts}")
+
+if __name__ == "__main__":
+    main()
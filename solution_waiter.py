@@ -1,57 +1,85 @@
+import sys
 import threading
 import time
 import random
 
+from estrategias import get_strategy
+from perfil_locks import LockProfiler
+from registro_eventos import (EventLogWriter, record_or_print, NO_FORK, EV_PENSANDO, EV_COM_FOME,
+                              EV_COMENDO, EV_FORK_TAKEN, EV_FORK_RELEASED, EV_WAITER_CALL, EV_WAITER_END)
+
 class Philosopher(threading.Thread):
-    def __init__(self, name, left_fork, right_fork, waiter):
+    def __init__(self, name, left_fork, right_fork, waiter, p_id=0, fork_ids=(NO_FORK, NO_FORK), log=None):
         super().__init__()
         self.name = name
         self.left_fork = left_fork
         self.right_fork = right_fork
         self.waiter = waiter # O garçom (um Lock central)
+        # Índice na mesa e dos garfos, e registro de eventos opcional
+        self.p_id, (self.left_fork_id, self.right_fork_id) = p_id, fork_ids
+        self.log = log
 
     def run(self):
         while True:
-            print(f'{self.name} está pensando.')
+            record_or_print(self.log, self.p_id, f'{self.name} está pensando.', (EV_PENSANDO, NO_FORK))
             time.sleep(random.uniform(1, 3))
             
-            print(f'{self.name} está com fome e vai pedir permissão ao garçom.')
+            record_or_print(self.log, self.p_id, f'{self.name} está com fome e vai pedir permissão ao garçom.',
+                            (EV_COM_FOME, NO_FORK), (EV_WAITER_CALL, NO_FORK))
             
             # Pede permissão ao garçom antes de tocar nos garfos
             with self.waiter:
-                print(f'{self.name} recebeu permissão. Vai pegar os garfos.')
+                record_or_print(self.log, self.p_id, f'{self.name} recebeu permissão. Vai pegar os garfos.', (EV_WAITER_END, NO_FORK))
                 self.left_fork.acquire()
                 self.right_fork.acquire()
                 # Uma vez que ele tem os garfos, o garçom é liberado pelo 'with'
                 # e outros podem pedir permissão.
             
-            print(f'{self.name} está comendo.')
+            record_or_print(self.log, self.p_id, f'{self.name} está comendo.',
+                            (EV_FORK_TAKEN, self.left_fork_id), (EV_FORK_TAKEN, self.right_fork_id), (EV_COMENDO, NO_FORK))
             time.sleep(random.uniform(2, 4))
 
             # Libera os garfos após comer
             self.left_fork.release()
             self.right_fork.release()
-            print(f'{self.name} terminou de comer e largou os garfos.')
+            record_or_print(self.log, self.p_id, f'{self.name} terminou de comer e largou os garfos.',
+                            (EV_FORK_RELEASED, self.left_fork_id), (EV_FORK_RELEASED, self.right_fork_id))
 
 def main():
-    num_philosophers = 5
-    forks = [threading.Lock() for _ in range(num_philosophers)]
+    # O número de filósofos pode ser passado na linha de comando (padrão: 5)
+    num_philosophers = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    # Um segundo argumento grava os eventos nesse arquivo em vez de imprimi-los ('-': sem registro)
+    log = EventLogWriter(sys.argv[2], num_philosophers, "solucao_garcom") if len(sys.argv) > 2 and sys.argv[2] != "-" else None
+    # Um terceiro liga o perfil dos locks, gravado com esse prefixo ao interromper (Ctrl+C)
+    profiler = LockProfiler(enabled=len(sys.argv) > 3)
+    forks = [profiler.lock(f"garfo {i}") for i in range(num_philosophers)]
     
-    # O garçom é um único Lock para toda a mesa
-    waiter = threading.Lock() 
+    # O garçom é um único Lock para toda a mesa, criado pela estratégia
+    strategy = get_strategy("solucao_garcom")(num_philosophers, locks=profiler)
+    strategy.setup_threads()
+    waiter = strategy.waiter
     
     philosophers = []
     for i in range(num_philosophers):
-        left_fork = forks[i]
-        right_fork = forks[(i + 1) % num_philosophers]
-        philosopher = Philosopher(f'Filósofo {i}', left_fork, right_fork, waiter)
+        left_fork_index, right_fork_index = strategy.fork_order(i)
+        left_fork = forks[left_fork_index]
+        right_fork = forks[right_fork_index]
+        philosopher = Philosopher(f'Filósofo {i}', left_fork, right_fork, waiter,
+                                  p_id=i, fork_ids=(left_fork_index, right_fork_index), log=log)
         philosophers.append(philosopher)
 
     for p in philosophers:
         p.start()
 
-    for p in philosophers:
-        p.join()
+    try:
+        for p in philosophers:
+            p.join()
+    except KeyboardInterrupt:
+        # Grava o que ainda está na fila do registro antes de sair
+        if log: log.close()
+        if profiler.enabled:
+            print("Perfil dos locks gravado em", " e ".join(profiler.save(sys.argv[3])))
+        raise
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
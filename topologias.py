@@ -0,0 +1,254 @@
+"""
+Topologias: quais recursos (garfos) cada filósofo precisa para comer.
+
+O jantar clássico é um anel: o filósofo i precisa dos garfos i e i+1, e
+cada garfo é dividido por dois vizinhos. Aqui a mesa é descrita de forma
+geral, como a lista dos recursos de cada filósofo, e tudo o que as
+estratégias consultam em cada decisão é pré-calculado uma vez:
+  - needs[p]: os recursos do filósofo p;
+  - users[r]: quem disputa o recurso r;
+  - conflicts[p]: quem divide algum recurso com p (os "vizinhos").
+Assim pegar, largar e escolher quem recebe um recurso custa O(grau do
+filósofo), e não uma varredura da mesa.
+
+Topologias registradas:
+    anel       o jantar clássico: N filósofos e N garfos
+    grade      filósofos nas casas de uma grade, um garfo entre casas
+               vizinhas (2 a 4 garfos por refeição)
+    toro       a grade com as bordas ligadas: sempre 4 garfos
+    aleatoria  grafo aleatório com grau médio 'degree' (garfos nas arestas)
+    conjunto   cada um precisa de 'degree' recursos sorteados de um conjunto
+               de 'resources', que podem ter mais de dois usuários
+
+    python3 simulacao_eventos.py solucao_hierarquia --filosofos 400 --topologia toro --tempo 1000
+    python3 topologias.py grade --filosofos 12
+"""
+import argparse
+import math
+import random
+
+TOPOLOGIES = {}
+
+
+def register_topology(cls):
+    TOPOLOGIES[cls.name] = cls
+    return cls
+
+
+def get_topology(name):
+    try:
+        return TOPOLOGIES[name]
+    except KeyError:
+        raise ValueError(f"Topologia desconhecida: {name}") from None
+
+
+class Topology:
+    """
+    Recursos de cada filósofo. 'needs' é uma sequência com os índices dos
+    recursos de cada filósofo; os recursos são numerados de 0 a
+    num_resources-1.
+    """
+    name = None
+    label = "Personalizada"
+    # O anel de sempre: as estratégias e os motores usam o caminho próprio dele
+    ring = False
+
+    def __init__(self, needs, num_resources=None):
+        self.needs = tuple(tuple(resources) for resources in needs)
+        self.num_philosophers = len(self.needs)
+        if self.num_philosophers < 2:
+            raise ValueError("A mesa precisa de pelo menos 2 filósofos")
+        for p_id, resources in enumerate(self.needs):
+            if not resources:
+                raise ValueError(f"F{p_id} não precisa de nenhum recurso")
+            if len(set(resources)) != len(resources):
+                raise ValueError(f"F{p_id} pede o mesmo recurso duas vezes")
+        if num_resources is None:
+            num_resources = 1 + max(max(resources) for resources in self.needs)
+        self.num_resources = num_resources
+
+        users = [[] for _ in range(num_resources)]
+        for p_id, resources in enumerate(self.needs):
+            for r in resources:
+                users[r].append(p_id)
+        self.users = tuple(tuple(u) for u in users)
+        self.conflicts = tuple(
+            tuple(sorted({q for r in resources for q in self.users[r] if q != p_id}))
+            for p_id, resources in enumerate(self.needs)
+        )
+        # Cada recurso entre no máximo dois filósofos: é um grafo, com os
+        # garfos nas arestas (o caso em que Chandy–Misra se aplica)
+        self.is_graph = all(len(u) <= 2 for u in self.users)
+
+    @property
+    def max_degree(self):
+        return max(len(resources) for resources in self.needs)
+
+    def describe(self):
+        sizes = [len(resources) for resources in self.needs]
+        shared = max(len(u) for u in self.users)
+        return (f"{self.label}: {self.num_philosophers} filósofos, {self.num_resources} recursos, "
+                f"{min(sizes)}-{max(sizes)} por refeição, até {shared} usuários por recurso")
+
+
+def _from_edges(num_philosophers, edges):
+    """
+    Um garfo por aresta (a, b); o garfo k é o da k-ésima aresta. Os garfos
+    saem na ordem das arestas, que é a mesma para todos; cada filósofo p
+    começa do garfo p % grau, como no anel cada um começa do próprio lado.
+    Assim a ordem de cada um é só dele, e só as estratégias com 'ordered'
+    seguem uma ordem global (a crescente).
+    """
+    needs = [[] for _ in range(num_philosophers)]
+    for fork, (a, b) in enumerate(edges):
+        needs[a].append(fork)
+        needs[b].append(fork)
+    for p, resources in enumerate(needs):
+        if resources:
+            start = p % len(resources)
+            needs[p] = resources[start:] + resources[:start]
+    return needs
+
+
+@register_topology
+class RingTopology(Topology):
+    """O anel de sempre: o garfo i fica entre os filósofos i-1 e i."""
+    name = "anel"
+    label = "Anel"
+    ring = True
+
+    def __init__(self, num_philosophers, **options):
+        n = num_philosophers
+        super().__init__([(i, (i + 1) % n) for i in range(n)], n)
+
+
+def _grid_columns(num_philosophers, columns):
+    if columns is None:
+        columns = max(1, math.isqrt(num_philosophers))
+    if columns < 1:
+        raise ValueError("A grade precisa de pelo menos uma coluna")
+    return columns
+
+
+@register_topology
+class GridTopology(Topology):
+    """
+    Filósofos nas casas de uma grade de 'columns' colunas, em ordem de
+    linha (a última linha pode ficar incompleta). Cada par de casas
+    vizinhas divide um garfo: 2 nos cantos, 3 nas bordas e 4 no meio.
+    """
+    name = "grade"
+    label = "Grade"
+
+    def __init__(self, num_philosophers, columns=None, **options):
+        n = num_philosophers
+        columns = _grid_columns(n, columns)
+        edges = []
+        for p in range(n):
+            if (p + 1) % columns and p + 1 < n:
+                edges.append((p, p + 1))
+            if p + columns < n:
+                edges.append((p, p + columns))
+        super().__init__(_from_edges(n, edges), len(edges))
+        self.columns = columns
+
+
+@register_topology
+class TorusTopology(Topology):
+    """A grade com a última coluna ligada à primeira e a última linha à primeira."""
+    name = "toro"
+    label = "Toro"
+
+    def __init__(self, num_philosophers, columns=None, **options):
+        n = num_philosophers
+        columns = _grid_columns(n, columns)
+        rows = n // columns
+        if rows * columns != n or rows < 3 or columns < 3:
+            raise ValueError("O toro precisa de linhas x colunas filósofos, com pelo menos 3 de cada")
+        edges = []
+        for p in range(n):
+            row, col = divmod(p, columns)
+            edges.append((p, row * columns + (col + 1) % columns))
+            edges.append((p, (p + columns) % n))
+        super().__init__(_from_edges(n, edges), len(edges))
+        self.columns = columns
+
+
+@register_topology
+class RandomGraphTopology(Topology):
+    """
+    Grafo aleatório com grau médio 'degree': arestas sorteadas entre pares
+    distintos, e quem ficou sem nenhuma ganha uma.
+    """
+    name = "aleatoria"
+    label = "Grafo aleatório"
+
+    def __init__(self, num_philosophers, degree=3, seed=None, **options):
+        n = num_philosophers
+        if n < 2:
+            raise ValueError("A mesa precisa de pelo menos 2 filósofos")
+        rng = random.Random(None if seed is None else f"topologia-{seed}")
+        target = min(n * (n - 1) // 2, max(1, round(n * degree / 2)))
+        pairs, edges = set(), []
+
+        def add(a, b):
+            pair = (min(a, b), max(a, b))
+            if a != b and pair not in pairs:
+                pairs.add(pair); edges.append(pair)
+
+        while len(edges) < target:
+            add(rng.randrange(n), rng.randrange(n))
+        degree_of = [0] * n
+        for a, b in edges:
+            degree_of[a] += 1; degree_of[b] += 1
+        for p in range(n):
+            while not degree_of[p]:
+                q = rng.randrange(n)
+                if q != p:
+                    add(p, q); degree_of[p] += 1; degree_of[q] += 1
+        super().__init__(_from_edges(n, edges), len(edges))
+
+
+@register_topology
+class PoolTopology(Topology):
+    """
+    Um conjunto de 'resources' recursos; cada filósofo precisa de 'degree'
+    deles, sorteados. Um recurso pode ser disputado por muitos.
+    """
+    name = "conjunto"
+    label = "Conjunto de recursos"
+
+    def __init__(self, num_philosophers, degree=2, resources=None, seed=None, **options):
+        resources = num_philosophers if resources is None else resources
+        if not 1 <= degree <= resources:
+            raise ValueError("Cada refeição precisa de 1 a 'resources' recursos")
+        rng = random.Random(None if seed is None else f"topologia-{seed}")
+        super().__init__([rng.sample(range(resources), degree) for _ in range(num_philosophers)], resources)
+
+
+def topology_options(args):
+    """Opções da linha de comando (--colunas, --grau, --recursos, --semente) para get_topology."""
+    options = {'seed': args.semente}
+    if args.colunas is not None: options['columns'] = args.colunas
+    if args.grau is not None: options['degree'] = args.grau
+    if args.recursos is not None: options['resources'] = args.recursos
+    return options
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mostra uma topologia de recursos.")
+    parser.add_argument("topologia", choices=TOPOLOGIES)
+    parser.add_argument("--filosofos", type=int, default=9)
+    parser.add_argument("--colunas", type=int, default=None, help="colunas da grade e do toro")
+    parser.add_argument("--grau", type=int, default=None, help="recursos por refeição (aleatoria, conjunto)")
+    parser.add_argument("--recursos", type=int, default=None, help="tamanho do conjunto de recursos")
+    parser.add_argument("--semente", type=int, default=None)
+    args = parser.parse_args()
+    topology = get_topology(args.topologia)(args.filosofos, **topology_options(args))
+    print(topology.describe())
+    for p_id, resources in enumerate(topology.needs[:20]):
+        print(f"  F{p_id}: recursos {list(resources)} | conflitos {list(topology.conflicts[p_id])}")
+
+
+if __name__ == "__main__":
+    main()